@@ -0,0 +1,44 @@
+"""
+Пропускная способность Detector.detect_batch при разных размерах батча
+в сравнении с последовательными вызовами detect_phone.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_batch --model models/model.onnx
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    detector = Detector(args.model)
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (640, 640, 3), dtype=np.uint8) for _ in range(max(args.sizes))]
+
+    rows = []
+    for size in args.sizes:
+        batch = frames[:size]
+        sequential = measure(lambda: [detector.detect_phone(f, swap_rb=True) for f in batch], repeat=args.repeat, warmup=1)
+        batched = measure(lambda: detector.detect_batch(batch, swap_rb=True), repeat=args.repeat, warmup=1)
+        rows.append({
+            "batch": size,
+            "sequential_fps": size * 1000 / sequential["mean"],
+            "batched_fps": size * 1000 / batched["mean"],
+            "batched_ms_per_frame": batched["mean"] / size,
+            "speedup": sequential["mean"] / batched["mean"],
+        })
+    note = "динамическая" if detector.max_batch is None else f"фиксированная ({detector.max_batch})"
+    print_table(f"detect_batch, ось батча модели: {note}", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+detect_phone в процессе приложения и через DetectorService (отдельный процесс,
+кадр в слоте разделяемой памяти).
+
+Замеры идут без нагрузки и с --busy-threads потоками Python, которые держат GIL,
+как потоки журнала, уведомлений и интерфейса в приложении. Последний замер -
+несколько клиентов (камер) на одном процессе детектора.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_detector_service --model models/model.onnx
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+from src.core.detector_service import DetectorService
+
+
+def _busy(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--busy-threads", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+
+    detector = Detector(args.model)
+    detector.warmup()
+    service = DetectorService(args.model, slots=max(4, args.clients))
+    service.start()
+    client = service.client()
+    client.wait_warm(60)
+
+    image, _ = detector.letterbox(frame)
+    same = np.array_equal(detector.detect_phone(image, swap_rb=True).array, client.detect_phone(image, swap_rb=True).array)
+    print(f"Результаты в процессе и через сервис совпадают: {'да' if same else 'нет'}")
+
+    rows = []
+    for busy in (0, args.busy_threads):
+        stop = threading.Event()
+        threads = [threading.Thread(target=_busy, args=(stop,), daemon=True) for _ in range(busy)]
+        for thread in threads:
+            thread.start()
+        for name, target in (("в процессе", detector), ("DetectorService", client)):
+            stats = measure(lambda: target.detect_phone(image, swap_rb=True), repeat=args.repeat)
+            rows.append({"mode": name, "busy_threads": busy, **stats})
+        stop.set()
+        for thread in threads:
+            thread.join()
+    print_table("detect_phone, мс", rows)
+
+    clients = [service.client() for _ in range(args.clients)]
+    counts = [0] * args.clients
+
+    def run(index: int) -> None:
+        canvas, _ = clients[index].letterbox(frame)
+        for _ in range(args.repeat):
+            clients[index].detect_phone(canvas, swap_rb=True)
+            counts[index] += 1
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(args.clients)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    print_table(f"{args.clients} клиентов на одном процессе детектора", [
+        {"clients": args.clients, "requests": sum(counts), "requests_per_s": sum(counts) / elapsed},
+    ])
+    service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Задержка detect_phone с постобработкой в NumPy и с NMS + TopK,
+встроенными в граф (src.tools.embed_nms).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_embedded_nms --model models/model.onnx
+"""
+import argparse
+import os
+
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    root, ext = os.path.splitext(args.model)
+    embedded_path = f"{root}_nms{ext}"
+    if not os.path.exists(embedded_path):
+        raise SystemExit(f"Нет {embedded_path}: сначала запустите python -m src.tools.embed_nms --model {args.model}")
+
+    frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    rows = []
+    for name, path in (("numpy", args.model), ("в графе", embedded_path)):
+        detector = Detector(path)
+        image, _ = detector.letterbox(frame)
+        input_data = detector.make_input(image, swap_rb=True)
+        outputs = detector._run(input_data, args.conf).copy()
+        post_stats = measure(lambda: detector.postprocess(outputs, args.conf), repeat=args.repeat)
+        total_stats = measure(lambda: detector.detect_phone(image, conf=args.conf, swap_rb=True), repeat=args.repeat, warmup=10)
+        rows.append({
+            "postprocessing": name,
+            "output_shape": "x".join(map(str, outputs.shape)),
+            "postprocess_ms": post_stats["median"],
+            "detect_phone_ms": total_stats["median"],
+            "p99_ms": total_stats["p99"],
+        })
+    print_table(f"detect_phone, conf={args.conf}, {args.repeat} прогонов", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Задержка detect_phone с нормализацией в NumPy и с предобработкой,
+встроенной в граф (src.tools.embed_preprocessing).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_embedded_preprocessing --model models/model.onnx
+"""
+import argparse
+import os
+
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    root, ext = os.path.splitext(args.model)
+    embedded_path = f"{root}_uint8{ext}"
+    if not os.path.exists(embedded_path):
+        raise SystemExit(f"Нет {embedded_path}: сначала запустите python -m src.tools.embed_preprocessing --model {args.model}")
+
+    frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    rows = []
+    for name, path in (("numpy", args.model), ("в графе", embedded_path)):
+        detector = Detector(path)
+        image, _ = detector.letterbox(frame)
+        input_stats = measure(lambda: detector.make_input(image, swap_rb=True), repeat=args.repeat)
+        total_stats = measure(lambda: detector.detect_phone(image, swap_rb=True), repeat=args.repeat, warmup=10)
+        rows.append({
+            "preprocessing": name,
+            "make_input_ms": input_stats["median"],
+            "detect_phone_ms": total_stats["median"],
+            "p99_ms": total_stats["p99"],
+        })
+    print_table(f"detect_phone на кадре после letterbox, {args.repeat} прогонов", rows)
+
+
+if __name__ == "__main__":
+    main()
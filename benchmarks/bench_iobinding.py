@@ -0,0 +1,38 @@
+"""
+Разброс задержки detect_phone с обычным session.run и с IOBinding
+(постоянные входной и выходной буферы).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_iobinding --model models/model.onnx
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    rows = []
+    for use_io_binding in (False, True):
+        detector = Detector(args.model, inference_config={"use_io_binding": use_io_binding})
+        image, _ = detector.letterbox(frame)
+        stats = measure(lambda: detector.detect_phone(image, swap_rb=True), repeat=args.repeat, warmup=10)
+        rows.append({
+            "mode": "iobinding" if use_io_binding else "session.run",
+            "bound": detector.backend.binding is not None,
+            **{f"{key}_ms": value for key, value in stats.items()},
+            "cv": stats["std"] / stats["mean"],
+        })
+    print_table(f"detect_phone, {args.repeat} прогонов", rows)
+
+
+if __name__ == "__main__":
+    main()
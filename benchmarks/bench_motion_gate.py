@@ -0,0 +1,84 @@
+"""
+Экономия инференса затвором движения (MotionGate) на синтетической сцене:
+неподвижный стол с шумом матрицы, в середине - движущийся предмет.
+
+Печатает, сколько кадров ушло в детектор, сколько пропущено, суммарное
+время детекции с затвором и без, и на скольких кадрах с движением
+детектор всё же запускался.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_motion_gate --model models/model.onnx
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table
+from src.core.detector import Detector
+from src.core.motion import MotionGate
+
+
+def synthetic_scene(frames: int, moving: int, noise: float, seed: int = 0):
+    """Кадры 720x1280: шум вокруг одного фона, на moving центральных кадрах по кадру едет прямоугольник."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(60, 200, (720, 1280, 3), dtype=np.uint8)
+    start = (frames - moving) // 2
+    for i in range(frames):
+        frame = np.clip(background + rng.normal(0, noise, background.shape), 0, 255).astype(np.uint8)
+        is_moving = start <= i < start + moving
+        if is_moving:
+            x = 100 + (i - start) * 20
+            frame[300:420, x:x + 70] = (20, 20, 20)
+        yield frame, is_moving
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--moving", type=int, default=40)
+    parser.add_argument("--noise", type=float, default=4.0, help="СКО шума матрицы")
+    parser.add_argument("--fps", type=float, default=15.0, help="Частота кадров для таймера принудительного запуска")
+    parser.add_argument("--max-skip-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    detector = Detector(args.model)
+    detector.warmup()
+    gate = MotionGate(max_skip_seconds=args.max_skip_seconds)
+
+    def detect(frame):
+        image, _ = detector.letterbox(frame)
+        return detector.detect_phone(image, swap_rb=True)
+
+    rows = []
+    for gated in (False, True):
+        detect_seconds = gate_seconds = 0.0
+        moving_detected = 0
+        for i, (frame, is_moving) in enumerate(synthetic_scene(args.frames, args.moving, args.noise)):
+            run = True
+            if gated:
+                start = time.perf_counter()
+                run = gate.should_run(frame, now=i / args.fps)
+                gate_seconds += time.perf_counter() - start
+            if run:
+                start = time.perf_counter()
+                result = detect(frame)
+                detect_seconds += time.perf_counter() - start
+                if gated:
+                    gate.update(result)
+                moving_detected += is_moving
+        rows.append({
+            "mode": "MotionGate" if gated else "без затвора",
+            "executed": gate.executed if gated else args.frames,
+            "skipped": gate.skipped if gated else 0,
+            "moving_inferred": f"{moving_detected}/{args.moving}",
+            "detect_s": detect_seconds,
+            "gate_s": gate_seconds,
+        })
+
+    print_table(f"{args.frames} кадров, {args.moving} с движением, шум {args.noise}", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Пропускная способность последовательного цикла (проверки кадра + детекция)
+и конвейера, где детекция идёт в отдельной стадии.
+
+Захват камеры и проверки кадра (is_uniform, is_similar_frame) имитируются
+задержками --capture-ms и --checks-ms на кадр.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_pipeline --model models/model.onnx
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table
+from src.core.detector import Detector
+from src.core.pipeline import Pipeline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--capture-ms", type=float, default=10.0)
+    parser.add_argument("--checks-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) for _ in range(4)]
+    detector = Detector(args.model)
+    detector.warmup()
+
+    def capture(i):
+        time.sleep(args.capture_ms / 1000)
+        return frames[i % len(frames)]
+
+    def checks(frame):
+        time.sleep(args.checks_ms / 1000)
+
+    def detect(frame):
+        image, _ = detector.letterbox(frame)
+        return detector.detect_phone(image, swap_rb=True)
+
+    start = time.perf_counter()
+    for i in range(args.frames):
+        frame = capture(i)
+        checks(frame)
+        detect(frame)
+    serial_fps = args.frames / (time.perf_counter() - start)
+
+    pipeline = Pipeline()
+    inference = pipeline.add_stage("inference", detect)
+    pipeline.start()
+    start = time.perf_counter()
+    for i in range(args.frames):
+        frame = capture(i)
+        checks(frame)
+        pipeline.submit(frame)
+    while len(inference.inbox):
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    time.sleep(0.1)
+    pipeline.stop()
+    stats = pipeline.stats()
+
+    print_table(f"{args.frames} кадров, захват {args.capture_ms} мс, проверки {args.checks_ms} мс", [
+        {"mode": "последовательно", "capture_fps": serial_fps, "inference_fps": serial_fps, "dropped": 0},
+        {
+            "mode": "конвейер",
+            "capture_fps": args.frames / elapsed,
+            "inference_fps": stats[1]["processed"] / elapsed,
+            "dropped": stats[1]["dropped"],
+        },
+    ])
+
+
+if __name__ == "__main__":
+    main()
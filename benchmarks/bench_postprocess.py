@@ -0,0 +1,65 @@
+"""
+Микробенчмарк постобработки YOLO: прежний цикл по якорям против векторизованной версии.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_postprocess
+"""
+import argparse
+
+import cv2
+import numpy as np
+
+from benchmarks.common import measure, print_table, synthetic_yolo_output
+from src.core.detector import Detector
+
+
+def postprocess_loop(outputs: np.ndarray, conf_thres: float = 0.25, iou_thres: float = 0.45):
+    """Прежняя реализация Detector.postprocess_output (цикл Python + cv2.dnn.NMSBoxes)."""
+    boxes = outputs[0]
+    detections = []
+    for i in range(boxes.shape[-1]):
+        box = boxes[:, i]
+        x, y, w, h, conf = box[:5]
+        if conf < conf_thres:
+            continue
+        detections.append((x - w / 2, y - h / 2, x + w / 2, y + h / 2, conf, 0))
+    if detections:
+        boxes = np.array([[x1, y1, x2, y2] for x1, y1, x2, y2, _, _ in detections])
+        scores = np.array([conf for _, _, _, _, conf, _ in detections])
+        indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(), conf_thres, iou_thres)
+        detections = [detections[i] for i in indices.flatten()]
+    return detections
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--conf", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rows = []
+    for num_objects in (0, 3, 20):
+        outputs = synthetic_yolo_output(num_objects=num_objects)
+        loop = measure(lambda: postprocess_loop(outputs, args.conf), repeat=args.repeat)
+        vectorized = measure(lambda: Detector.postprocess_output(outputs, args.conf), repeat=args.repeat)
+
+        reference = postprocess_loop(outputs, args.conf)
+        result = Detector.postprocess_output(outputs, args.conf)
+        top_match = (not reference and not len(result)) or (
+            bool(reference) and len(result) > 0
+            and np.isclose(float(reference[0][4]), float(result[0]["confidence"]))
+        )
+        rows.append({
+            "objects": num_objects,
+            "loop_ms": loop["mean"],
+            "vectorized_ms": vectorized["mean"],
+            "speedup": loop["mean"] / vectorized["mean"],
+            "loop_boxes": len(reference),
+            "vectorized_boxes": len(result),
+            "top_match": top_match,
+        })
+    print_table(f"postprocess_output, 8400 якорей, conf={args.conf}", rows)
+
+
+if __name__ == "__main__":
+    main()
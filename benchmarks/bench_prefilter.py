@@ -0,0 +1,88 @@
+"""
+Полнота и экономия предфильтра (PrefilterCascade) относительно детектора.
+
+Кадры размечаются детектором на рабочем пороге; затем кадры идут по порядку
+через каскад (как в приложении, с --fps для страховочных прогонов).
+Печатает полноту классификатора и каскада на кадрах с телефоном, номера
+пропущенных кадров, долю отсеянных кадров и среднее время на кадр.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_prefilter --video desk.mp4 --model models/model.onnx
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table
+from src.core.detector import Detector
+from src.core.prefilter import PrefilterCascade, load_prefilter
+from src.tools.train_prefilter import collect_frames, label_frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--prefilter", default="models/prefilter.npz")
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--logs", default="logs")
+    parser.add_argument("--every", type=int, default=1)
+    parser.add_argument("--max-frames", type=int, default=1000)
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--safety-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    frames = collect_frames(args.video, args.logs, args.every, args.max_frames)
+    if not frames:
+        raise SystemExit("Нет кадров: укажите --video или --logs")
+    detector = Detector(args.model)
+    detector.warmup()
+    labels = label_frames(detector, frames, args.conf)
+    classifier = load_prefilter(args.prefilter)
+    cascade = PrefilterCascade(classifier, safety_interval=args.safety_interval)
+
+    def detect(frame):
+        image, _ = detector.letterbox(frame)
+        return detector.detect_phone(image, conf=args.conf, swap_rb=True).found
+
+    fired = np.zeros(len(frames), dtype=bool)
+    cascade_found = np.zeros(len(frames), dtype=bool)
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        fired[i] = classifier.score(frame) >= classifier.threshold
+        if cascade.should_detect(frame, now=i / args.fps):
+            cascade_found[i] = detect(frame)
+            cascade.update(cascade_found[i])
+    cascade_ms = (time.perf_counter() - start) * 1000 / len(frames)
+
+    start = time.perf_counter()
+    for frame in frames:
+        detect(frame)
+    detector_ms = (time.perf_counter() - start) * 1000 / len(frames)
+
+    # Классификатор вызывается в цикле каскада ещё раз - вычитаем его время отдельно
+    start = time.perf_counter()
+    for frame in frames:
+        classifier.score(frame)
+    score_ms = (time.perf_counter() - start) * 1000 / len(frames)
+
+    positives = labels.sum()
+    print_table(f"{len(frames)} кадров, с телефоном {positives}", [
+        {
+            "classifier_recall": float(fired[labels].mean()) if positives else float("nan"),
+            "cascade_recall": float(cascade_found[labels].mean()) if positives else float("nan"),
+            "rejected": cascade.rejected,
+            "safety_scans": cascade.safety_scans,
+            "score_ms": score_ms,
+            "detector_ms": detector_ms,
+            "cascade_ms": cascade_ms - score_ms,
+        },
+    ])
+    missed = np.flatnonzero(labels & ~cascade_found)
+    if missed.size:
+        print(f"Кадры с телефоном, пропущенные каскадом: {missed.tolist()}")
+
+
+if __name__ == "__main__":
+    main()
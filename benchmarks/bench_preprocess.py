@@ -0,0 +1,64 @@
+"""
+Предобработка кадра: прежняя цепочка (prepreprocess + cvtColor + preprocess_image)
+против LetterboxPreprocessor с постоянным холстом и входным буфером.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_preprocess
+"""
+import argparse
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+from src.core.preprocessing import LetterboxPreprocessor
+
+
+def allocated_kb(fn) -> float:
+    """Пик памяти, выделенной за один вызов функции, в КБ (NumPy и OpenCV учитываются tracemalloc)."""
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        return (tracemalloc.get_traced_memory()[1] - baseline) / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    preprocessor = LetterboxPreprocessor(size=640)
+    rows = []
+    for h, w in ((480, 640), (720, 1280), (1080, 1920)):
+        frame = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+        def legacy():
+            return Detector.preprocess_image(cv2.cvtColor(Detector.prepreprocess(frame), cv2.COLOR_RGB2BGR))
+
+        def buffered():
+            return preprocessor(frame, swap_rb=True)
+
+        assert np.array_equal(legacy(), buffered())
+        legacy_stats = measure(legacy, repeat=args.repeat)
+        buffered_stats = measure(buffered, repeat=args.repeat)
+        rows.append({
+            "frame": f"{w}x{h}",
+            "legacy_ms": legacy_stats["mean"],
+            "buffered_ms": buffered_stats["mean"],
+            "speedup": legacy_stats["mean"] / buffered_stats["mean"],
+            "legacy_alloc_kb": allocated_kb(legacy),
+            "buffered_alloc_kb": allocated_kb(buffered),
+        })
+    print_table("Предобработка кадра до тензора 1x3x640x640", rows)
+
+
+if __name__ == "__main__":
+    main()
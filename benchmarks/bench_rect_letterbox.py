@@ -0,0 +1,69 @@
+"""
+Квадратный и прямоугольный letterbox на кадре камеры 1280x720.
+
+Сравнивается letterbox + detect_phone: исходная модель на холсте 640x640
+и модель с динамическими H и W (src.tools.make_dynamic_shape) на холсте
+640x640 и на прямоугольном холсте, кратном шагу сетки (640x384).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_rect_letterbox --model models/model.onnx --dynamic models/model_dyn.onnx
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+from src.core.preprocessing import LetterboxPreprocessor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--dynamic", default="models/model_dyn.onnx")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    square = Detector(args.model)
+    dynamic = Detector(args.dynamic)
+    if not dynamic.dynamic_shape:
+        raise SystemExit(f"{args.dynamic}: у входа нет динамических H и W (см. src.tools.make_dynamic_shape)")
+
+    # Та же динамическая модель на квадратном холсте - разница только в полях
+    dynamic_square = Detector(args.dynamic)
+    dynamic_square.preprocessor = LetterboxPreprocessor(size=dynamic_square.input_size)
+
+    rows = []
+    for name, detector in (("исходная, квадрат", square), ("dyn, квадрат", dynamic_square), ("dyn, прямоугольник", dynamic)):
+        canvas, transform = detector.letterbox(frame)
+        content_w, content_h = transform.content_size
+        padding = 1 - content_w * content_h / (canvas.shape[0] * canvas.shape[1])
+
+        def run():
+            image, _ = detector.letterbox(frame)
+            return detector.detect_phone(image, swap_rb=True)
+
+        found = run().found
+        rows.append({
+            "mode": name,
+            "canvas": f"{canvas.shape[1]}x{canvas.shape[0]}",
+            "padding": f"{padding:.0%}",
+            **measure(run, repeat=args.repeat),
+            "found": found,
+        })
+
+    # Выход IOBinding для прямоугольного входа должен совпадать с обычным session.run
+    image, _ = dynamic.letterbox(frame)
+    tensor = dynamic.make_input(image, swap_rb=True)
+    bound = dynamic._run(tensor).copy()
+    plain = dynamic.backend.session.run(None, {dynamic.input_name: tensor})[0]
+    print(f"IOBinding совпадает с session.run на {image.shape[1]}x{image.shape[0]}: {np.allclose(bound, plain)}")
+
+    print_table(f"letterbox + detect_phone, кадр {args.width}x{args.height}, мс", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Зона интереса администратора (RegionMask) на кадре камеры 1280x720.
+
+Сравнивается letterbox + detect_phone по всему кадру, по вырезке
+прямоугольной зоны интереса и по вырезке с залитой исключённой зоной.
+Время сети почти не меняется (холст тот же), выигрыш - в масштабе: scale
+показывает, во сколько раз объект в зоне крупнее на входе модели, чем
+при letterbox всего кадра. mask_ms - стоимость самой вырезки и заливки.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_region_mask --model models/model.onnx
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import measure, print_table
+from src.core.detector import Detector
+from src.core.region_mask import RegionMask
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    detector = Detector(args.model)
+    desk = [[0.25, 0.3], [0.75, 0.3], [0.75, 1.0], [0.25, 1.0]]
+    stand = [[0.6, 0.3], [0.75, 0.3], [0.75, 0.6], [0.6, 0.6]]
+    masks = (
+        ("весь кадр", None),
+        ("зона интереса", RegionMask(include=[desk])),
+        ("зона + исключение", RegionMask(include=[desk], exclude=[stand])),
+    )
+
+    rows = []
+    for name, mask in masks:
+        def crop():
+            return mask.apply(frame)[0] if mask is not None else frame
+
+        def run():
+            image, _ = detector.letterbox(crop())
+            return detector.detect_phone(image, swap_rb=True)
+
+        canvas, transform = detector.letterbox(crop())
+        rows.append({
+            "mode": name,
+            "crop": f"{crop().shape[1]}x{crop().shape[0]}",
+            "canvas": f"{canvas.shape[1]}x{canvas.shape[0]}",
+            "scale": f"{transform.scale:.3f}",
+            "mask_ms": measure(crop, repeat=args.repeat)["median"],
+            **measure(run, repeat=args.repeat),
+        })
+
+    print_table(f"RegionMask + letterbox + detect_phone, кадр {args.width}x{args.height}, мс", rows)
+
+
+if __name__ == "__main__":
+    main()
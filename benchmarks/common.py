@@ -0,0 +1,75 @@
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def measure(fn: Callable[[], object], repeat: int = 100, warmup: int = 5) -> Dict[str, float]:
+    """
+    Замеряет время выполнения функции.
+
+    Args:
+        fn: Функция без аргументов.
+        repeat: Количество замеров.
+        warmup: Количество прогревочных вызовов (не учитываются).
+
+    Returns:
+        Словарь со статистикой в миллисекундах: mean, std, median, p99, min.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = np.empty(repeat, dtype=np.float64)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings[i] = (time.perf_counter() - start) * 1000
+    return {
+        "mean": float(timings.mean()),
+        "std": float(timings.std()),
+        "median": float(np.median(timings)),
+        "p99": float(np.percentile(timings, 99)),
+        "min": float(timings.min()),
+    }
+
+
+def print_table(title: str, rows: List[Dict[str, object]]) -> None:
+    """Печатает список словарей в виде выровненной таблицы."""
+    print(f"\n{title}")
+    if not rows:
+        print("(нет данных)")
+        return
+    columns = list(rows[0].keys())
+    cells = [[f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def synthetic_yolo_output(
+    num_boxes: int = 8400,
+    num_classes: int = 1,
+    num_objects: int = 3,
+    size: int = 640,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Генерирует выход YOLO [1, 4 + num_classes, num_boxes] с фоном низкой уверенности
+    и несколькими кластерами перекрывающихся боксов высокой уверенности.
+    """
+    rng = np.random.default_rng(seed)
+    out = np.empty((1, 4 + num_classes, num_boxes), dtype=np.float32)
+    out[0, 0:2] = rng.uniform(0, size, (2, num_boxes))
+    out[0, 2:4] = rng.uniform(8, size / 4, (2, num_boxes))
+    out[0, 4:] = rng.uniform(0, 0.3, (num_classes, num_boxes))
+    for _ in range(num_objects):
+        idx = rng.choice(num_boxes, 20, replace=False)
+        cx, cy = rng.uniform(100, size - 100, 2)
+        w, h = rng.uniform(40, 160, 2)
+        out[0, 0, idx] = cx + rng.normal(0, 3, idx.size)
+        out[0, 1, idx] = cy + rng.normal(0, 3, idx.size)
+        out[0, 2, idx] = w + rng.normal(0, 3, idx.size)
+        out[0, 3, idx] = h + rng.normal(0, 3, idx.size)
+        out[0, 4 + rng.integers(num_classes), idx] = rng.uniform(0.6, 0.95, idx.size)
+    return out
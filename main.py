@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 import time
@@ -20,4 +21,6 @@ def main():
         app.stop()
 
 if __name__ == "__main__":
+    # Процесс детектора (detector_service) запускается через spawn, в том числе из exe
+    multiprocessing.freeze_support()
     main()
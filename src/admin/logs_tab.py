@@ -116,6 +116,8 @@ class ImageDialog(QDialog):
         """Обновляет отображение диалога с текущим логом."""
         log = self.logs[self.current_index]
         timestamp, event, frame_path, screen_path, confidence, active_apps, username, device = log[1], log[2], log[3], log[4], log[5], log[6], log[7], log[8]
+        track_id = log[9] if len(log) > 9 else None
+        detections_count = log[10] if len(log) > 10 else None
         abs_frame_path = self.logger._get_log_file_path(frame_path) if frame_path else ""
         abs_screen_path = self.logger._get_log_file_path(screen_path) if screen_path else ""
         logger.debug(f"Loading images: frame_path={abs_frame_path}, screen_path={abs_screen_path}")
@@ -163,7 +165,9 @@ class ImageDialog(QDialog):
             f"Время: {timestamp}\n"
             f"Событие: {event}\n"
             f"Уверенность: {confidence_text}\n"
-            f"Запущенные приложения:\n{apps_text}\n"
+            + (f"Трек: {track_id}\n" if track_id is not None else "")
+            + (f"Объектов в кадре: {detections_count}\n" if detections_count is not None else "")
+            + f"Запущенные приложения:\n{apps_text}\n"
             f"Устройство: {device}\n"
             f"Пользователь: {username}"
         )
@@ -363,10 +367,11 @@ class LogsTab(QWidget):
         event_label.setStyleSheet(self.theme_manager.get_label_stylesheet())
         self.event_filter = QComboBox()
         self.event_filter.addItems([
-            "Все события", "Обнаружен мобильный телефон", "Однотонное изображение",
+            "Все события", "Обнаружен мобильный телефон", "Обнаружен планшет", "Обнаружена камера",
+            "Однотонное изображение",
             "После однотонного изображения", "Потеря связи с камерой",
             "Восстановление после \"Потеря связи с камерой\"", "Попытка закрыть приложение",
-            "Зависшее изображение", "Изображение отвисло"
+            "Зависшее изображение", "Изображение отвисло", "Детектор недоступен"
         ])
         self.event_filter.currentTextChanged.connect(self.load_logs)
         self.event_filter.setStyleSheet(self.theme_manager.get_combobox_stylesheet())
@@ -674,12 +679,15 @@ class LogsTab(QWidget):
 
                 event_colors = {
                     "Обнаружен мобильный телефон": "#FFD8E4",
+                    "Обнаружен планшет": "#FFD8E4",
+                    "Обнаружена камера": "#FFD8E4",
                     "Однотонное изображение": "#FFE7C9",
                     "Потеря связи с камерой": "#FFCCBC",
                     "Попытка закрыть приложение": "#F5B7B1",
                     "Восстановление после \"Потеря связи с камерой\"": "#B3E5FC",
                     "Зависшее изображение": "#FFECB3",
-                    "Изображение отвисло": "#C8E6C9"
+                    "Изображение отвисло": "#C8E6C9",
+                    "Детектор недоступен": "#F5B7B1"
                 }
                 item = QTableWidgetItem(event)
                 item.setTextAlignment(Qt.AlignCenter)
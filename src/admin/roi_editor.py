@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QBrush, QColor, QImage, QPainter, QPen, QPixmap, QPolygonF
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+
+class RoiEditor(QWidget):
+    """
+    Редактор зоны интереса поверх снимка камеры.
+
+    Прямоугольник рисуется протяжкой мыши, многоугольник - щелчками по
+    вершинам; правый щелчок или двойной щелчок замыкает многоугольник.
+    Фигуры хранятся в долях кадра (формат секции "roi_mask" конфига):
+    include - зона интереса (зелёная), exclude - исключённые зоны (красные).
+    """
+
+    SECTIONS = ("include", "exclude")
+    COLORS = {"include": QColor(76, 175, 80), "exclude": QColor(229, 57, 53)}
+
+    def __init__(self, width: int = 720, height: int = 405, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.setFixedSize(width, height)
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.setMouseTracking(True)
+        self.regions: Dict[str, List[List[List[float]]]] = {"include": [], "exclude": []}
+        self.section = "include"
+        self.shape = "rect"  # rect | polygon
+        self._pixmap: Optional[QPixmap] = None
+        self._aspect = 16 / 9
+        self._drag_start: Optional[QPointF] = None
+        self._points: List[QPointF] = []
+        self._cursor: Optional[QPointF] = None
+
+    def set_frame(self, frame: np.ndarray) -> None:
+        """Фон редактора - кадр камеры BGR; фигуры масштабируются вместе с ним."""
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        height, width = rgb.shape[:2]
+        image = QImage(rgb.data, width, height, width * 3, QImage.Format_RGB888)
+        self._pixmap = QPixmap.fromImage(image.copy())
+        self._aspect = width / height
+        self.update()
+
+    def set_regions(self, include, exclude) -> None:
+        self.regions = {"include": [list(map(list, p)) for p in include], "exclude": [list(map(list, p)) for p in exclude]}
+        self._points = []
+        self.update()
+
+    def undo(self) -> None:
+        """Убирает недорисованный многоугольник или последнюю фигуру текущего вида."""
+        if self._points:
+            self._points = []
+        elif self.regions[self.section]:
+            self.regions[self.section].pop()
+        self.update()
+
+    def clear(self) -> None:
+        self.regions = {"include": [], "exclude": []}
+        self._points = []
+        self.update()
+
+    def _frame_rect(self) -> QRectF:
+        """Область виджета, занятая кадром (с сохранением пропорций)."""
+        width, height = self.width(), self.height()
+        if width / height > self._aspect:
+            frame_w, frame_h = height * self._aspect, height
+        else:
+            frame_w, frame_h = width, width / self._aspect
+        return QRectF((width - frame_w) / 2, (height - frame_h) / 2, frame_w, frame_h)
+
+    def _to_norm(self, point: QPointF) -> List[float]:
+        rect = self._frame_rect()
+        x = min(max((point.x() - rect.left()) / rect.width(), 0.0), 1.0)
+        y = min(max((point.y() - rect.top()) / rect.height(), 0.0), 1.0)
+        return [round(x, 4), round(y, 4)]
+
+    def _to_widget(self, point) -> QPointF:
+        rect = self._frame_rect()
+        return QPointF(rect.left() + point[0] * rect.width(), rect.top() + point[1] * rect.height())
+
+    def _close_polygon(self) -> None:
+        if len(self._points) >= 3:
+            self.regions[self.section].append([self._to_norm(point) for point in self._points])
+        self._points = []
+        self.update()
+
+    def mousePressEvent(self, event) -> None:
+        if event.button() == Qt.RightButton:
+            self._close_polygon()
+        elif event.button() == Qt.LeftButton:
+            if self.shape == "rect":
+                self._drag_start = QPointF(event.pos())
+            else:
+                self._points.append(QPointF(event.pos()))
+        self.update()
+
+    def mouseMoveEvent(self, event) -> None:
+        self._cursor = QPointF(event.pos())
+        if self._drag_start is not None or self._points:
+            self.update()
+
+    def mouseReleaseEvent(self, event) -> None:
+        if event.button() != Qt.LeftButton or self._drag_start is None:
+            return
+        (x1, y1), (x2, y2) = self._to_norm(self._drag_start), self._to_norm(QPointF(event.pos()))
+        self._drag_start = None
+        if abs(x2 - x1) > 0.01 and abs(y2 - y1) > 0.01:
+            x1, x2 = sorted((x1, x2))
+            y1, y2 = sorted((y1, y2))
+            self.regions[self.section].append([[x1, y1], [x2, y1], [x2, y2], [x1, y2]])
+        self.update()
+
+    def mouseDoubleClickEvent(self, event) -> None:
+        if self.shape == "polygon":
+            self._close_polygon()
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self._frame_rect()
+        if self._pixmap is not None:
+            painter.drawPixmap(rect, self._pixmap, QRectF(self._pixmap.rect()))
+        else:
+            painter.fillRect(rect, QColor(114, 114, 114))
+            painter.setPen(QColor(255, 255, 255))
+            painter.drawText(rect, Qt.AlignCenter, "Сделайте снимок с камеры")
+
+        for section in self.SECTIONS:
+            color = self.COLORS[section]
+            fill = QColor(color)
+            fill.setAlpha(70)
+            painter.setPen(QPen(color, 2))
+            painter.setBrush(QBrush(fill))
+            for polygon in self.regions[section]:
+                painter.drawPolygon(QPolygonF([self._to_widget(point) for point in polygon]))
+
+        # Фигура в процессе рисования
+        painter.setPen(QPen(self.COLORS[self.section], 2, Qt.DashLine))
+        painter.setBrush(Qt.NoBrush)
+        if self._drag_start is not None and self._cursor is not None:
+            painter.drawRect(QRectF(self._drag_start, self._cursor).normalized())
+        if self._points:
+            points = self._points + ([self._cursor] if self._cursor is not None else [])
+            painter.drawPolyline(QPolygonF(points))
+        painter.end()
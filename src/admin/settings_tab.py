@@ -12,6 +12,7 @@ import numpy as np
 
 from src.core.camera import Camera
 from src.core.config import Config
+from src.admin.roi_editor import RoiEditor
 from src.admin.styles import ThemeManager
 from src.admin.utils import get_resource_path
 
@@ -170,6 +171,57 @@ class SettingsTab(QWidget):
         count_label.setStyleSheet(self.theme_manager.get_label_stylesheet())
         form_layout.addRow(count_label, self.count_spin)
 
+        roi_group = QGroupBox("Зона интереса")
+        roi_layout = QVBoxLayout()
+        roi_layout.setSpacing(5)
+        roi_config = self.config.get("roi_mask")
+        self.roi_enabled = QCheckBox("Искать только в зоне интереса")
+        self.roi_enabled.setChecked(roi_config["enabled"])
+        self.roi_enabled.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
+        roi_layout.addWidget(self.roi_enabled)
+        self.roi_editor = RoiEditor()
+        self.roi_editor.set_regions(roi_config["include"], roi_config["exclude"])
+        roi_layout.addWidget(self.roi_editor, alignment=Qt.AlignHCenter)
+        roi_hint = QLabel(
+            "Прямоугольник - протяжка мышью; многоугольник - щелчки по вершинам, "
+            "правый или двойной щелчок замыкает. Зелёное - зона интереса (пусто - весь кадр), "
+            "красное - исключено."
+        )
+        roi_hint.setWordWrap(True)
+        roi_hint.setStyleSheet(self.theme_manager.get_label_stylesheet())
+        roi_layout.addWidget(roi_hint)
+        roi_controls = QHBoxLayout()
+        roi_controls.setSpacing(5)
+        self.roi_section_combo = QComboBox()
+        self.roi_section_combo.addItems(["Зона интереса", "Исключить"])
+        self.roi_section_combo.setStyleSheet(self.theme_manager.get_combobox_stylesheet())
+        self.roi_section_combo.currentIndexChanged.connect(
+            lambda index: setattr(self.roi_editor, "section", RoiEditor.SECTIONS[index])
+        )
+        roi_controls.addWidget(self.roi_section_combo)
+        self.roi_shape_combo = QComboBox()
+        self.roi_shape_combo.addItems(["Прямоугольник", "Многоугольник"])
+        self.roi_shape_combo.setStyleSheet(self.theme_manager.get_combobox_stylesheet())
+        self.roi_shape_combo.currentIndexChanged.connect(
+            lambda index: setattr(self.roi_editor, "shape", ("rect", "polygon")[index])
+        )
+        roi_controls.addWidget(self.roi_shape_combo)
+        snapshot_button = QPushButton("Снимок с камеры")
+        snapshot_button.setStyleSheet(self.theme_manager.get_button_stylesheet())
+        snapshot_button.clicked.connect(self.capture_roi_frame)
+        roi_controls.addWidget(snapshot_button)
+        undo_button = QPushButton("Отменить")
+        undo_button.setStyleSheet(self.theme_manager.get_button_stylesheet())
+        undo_button.clicked.connect(self.roi_editor.undo)
+        roi_controls.addWidget(undo_button)
+        clear_button = QPushButton("Очистить")
+        clear_button.setStyleSheet(self.theme_manager.get_button_stylesheet("error"))
+        clear_button.clicked.connect(self.roi_editor.clear)
+        roi_controls.addWidget(clear_button)
+        roi_layout.addLayout(roi_controls)
+        roi_group.setLayout(roi_layout)
+        form_layout.addRow(roi_group)
+
         lock_group = QGroupBox("Блокировка экрана")
         lock_group.setStyleSheet(f"""
             QGroupBox {{
@@ -194,6 +246,7 @@ class SettingsTab(QWidget):
         self.lock_phone_detected.setChecked(self.config.get("lock_events")["phone_detected"])
         self.lock_phone_detected.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
         lock_layout.addWidget(self.lock_phone_detected)
+        self.lock_class_events = self._add_class_checkboxes(lock_layout, "lock_events")
         self.lock_camera_lost = QCheckBox("Потеря связи с камерой")
         self.lock_camera_lost.setChecked(self.config.get("lock_events")["camera_lost"])
         self.lock_camera_lost.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
@@ -210,8 +263,13 @@ class SettingsTab(QWidget):
         self.lock_static_img.setChecked(self.config.get("lock_events")["static_img"])
         self.lock_static_img.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
         lock_layout.addWidget(self.lock_static_img)
+        self.lock_detector_unavailable = QCheckBox("Детектор недоступен")
+        self.lock_detector_unavailable.setChecked(self.config.get("lock_events")["detector_unavailable"])
+        self.lock_detector_unavailable.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
+        lock_layout.addWidget(self.lock_detector_unavailable)
         lock_group.setLayout(lock_layout)
         form_layout.addRow(lock_group)
+        roi_group.setStyleSheet(lock_group.styleSheet())
 
         log_group = QGroupBox("Запись в журнал событий")
         log_group.setStyleSheet(lock_group.styleSheet())
@@ -221,6 +279,7 @@ class SettingsTab(QWidget):
         self.log_phone_detected.setChecked(self.config.get("log_events")["phone_detected"])
         self.log_phone_detected.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
         log_layout.addWidget(self.log_phone_detected)
+        self.log_class_events = self._add_class_checkboxes(log_layout, "log_events")
         self.log_camera_lost = QCheckBox("Потеря связи с камерой")
         self.log_camera_lost.setChecked(self.config.get("log_events")["camera_lost"])
         self.log_camera_lost.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
@@ -237,6 +296,10 @@ class SettingsTab(QWidget):
         self.log_static_img.setChecked(self.config.get("log_events")["static_img"])
         self.log_static_img.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
         log_layout.addWidget(self.log_static_img)
+        self.log_detector_unavailable = QCheckBox("Детектор недоступен")
+        self.log_detector_unavailable.setChecked(self.config.get("log_events")["detector_unavailable"])
+        self.log_detector_unavailable.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
+        log_layout.addWidget(self.log_detector_unavailable)
         log_group.setLayout(log_layout)
         form_layout.addRow(log_group)
 
@@ -263,6 +326,7 @@ class SettingsTab(QWidget):
         self.notifications_phone_detected.setChecked(self.config.get("notifications")["phone_detected"])
         self.notifications_phone_detected.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
         notifications_layout.addWidget(self.notifications_phone_detected)
+        self.notifications_class_events = self._add_class_checkboxes(notifications_layout, "notifications")
         self.notifications_camera_lost = QCheckBox("Потеря связи с камерой")
         self.notifications_camera_lost.setChecked(self.config.get("notifications")["camera_lost"])
         self.notifications_camera_lost.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
@@ -279,6 +343,10 @@ class SettingsTab(QWidget):
         self.notifications_static_img.setChecked(self.config.get("notifications")["static_img"])
         self.notifications_static_img.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
         notifications_layout.addWidget(self.notifications_static_img)
+        self.notifications_detector_unavailable = QCheckBox("Детектор недоступен")
+        self.notifications_detector_unavailable.setChecked(self.config.get("notifications")["detector_unavailable"])
+        self.notifications_detector_unavailable.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
+        notifications_layout.addWidget(self.notifications_detector_unavailable)
         notifications_group.setLayout(notifications_layout)
         form_layout.addRow(notifications_group)
 
@@ -384,6 +452,24 @@ class SettingsTab(QWidget):
 
         column_layout.addStretch()
 
+    def _add_class_checkboxes(self, layout: QVBoxLayout, section: str) -> dict:
+        """
+        Флажки событий включённых классов детектора, кроме телефона (detection_classes).
+
+        Returns:
+            Словарь {ключ события: QCheckBox}.
+        """
+        checkboxes = {}
+        for rules in self.config.get("detection_classes").values():
+            if not rules["enabled"] or rules["event"] == "phone_detected":
+                continue
+            checkbox = QCheckBox(rules["title"])
+            checkbox.setChecked(self.config.get(section).get(rules["event"], False))
+            checkbox.setStyleSheet(self.theme_manager.get_checkbox_stylesheet())
+            layout.addWidget(checkbox)
+            checkboxes[rules["event"]] = checkbox
+        return checkboxes
+
     def _scale_pixmap_with_padding(self, pixmap: QPixmap, target_width: int, target_height: int) -> QPixmap:
         """Масштабирует QPixmap с сохранением пропорций, добавляя поля."""
         scaled_pixmap = pixmap.scaled(
@@ -418,6 +504,26 @@ class SettingsTab(QWidget):
         scaled_pixmap = self._scale_pixmap_with_padding(pixmap, target_width, target_height)
         self.preview_label.setPixmap(scaled_pixmap)
 
+    def capture_roi_frame(self) -> None:
+        """Снимок с камеры - фон редактора зоны интереса."""
+        frame = self.camera.get_frame() if self.camera else None
+        if frame is None:
+            selected_index = self.camera_combo.currentIndex()
+            if not self.cameras or selected_index < 0:
+                print("DEBUG: No cameras available for ROI snapshot")
+                return
+            try:
+                camera = Camera(self.cameras[selected_index][0])
+            except Exception as e:
+                print(f"ERROR: Failed to open camera for ROI snapshot: {e}")
+                return
+            try:
+                frame = camera.get_frame()
+            finally:
+                camera.release()
+        if frame is not None:
+            self.roi_editor.set_frame(frame)
+
     def _set_current_camera(self) -> None:
         """Установка текущей камеры в QComboBox."""
         current_camera = self.config.get("camera_id")
@@ -508,32 +614,47 @@ class SettingsTab(QWidget):
             "log_retention": self.retention_combo.currentText(),
             "confidence_threshold": self.confidence_spin.value(),
             "phone_limit": self.count_spin.value(),
+            "roi_mask": {
+                "enabled": self.roi_enabled.isChecked(),
+                "include": self.roi_editor.regions["include"],
+                "exclude": self.roi_editor.regions["exclude"],
+            },
             "autostart": {
                 "on_system_start": self.autostart_system.isChecked(),
             },
             "lock_events": {
+                # Ключи выключенных классов detection_classes сохраняются как были
+                **self.config.get("lock_events"),
                 "phone_detected": self.lock_phone_detected.isChecked(),
+                **{event: checkbox.isChecked() for event, checkbox in self.lock_class_events.items()},
                 "camera_lost": self.lock_camera_lost.isChecked(),
                 "uniform_image": self.lock_uniform_image.isChecked(),
                 "attempt_to_close": self.lock_attempt_to_close.isChecked(),
                 "static_img": self.lock_static_img.isChecked(),
+                "detector_unavailable": self.lock_detector_unavailable.isChecked(),
             },
             "log_events": {
+                **self.config.get("log_events"),
                 "phone_detected": self.log_phone_detected.isChecked(),
+                **{event: checkbox.isChecked() for event, checkbox in self.log_class_events.items()},
                 "camera_lost": self.log_camera_lost.isChecked(),
                 "uniform_image": self.log_uniform_image.isChecked(),
                 "attempt_to_close": self.log_attempt_to_close.isChecked(),
                 "static_img": self.log_static_img.isChecked(),
+                "detector_unavailable": self.log_detector_unavailable.isChecked(),
             },
             "other_events": {
                 "make_screen_enabled": self.make_screen_enabled.isChecked(),
             },
             "notifications": {
+                **self.config.get("notifications"),
                 "phone_detected": self.notifications_phone_detected.isChecked(),
+                **{event: checkbox.isChecked() for event, checkbox in self.notifications_class_events.items()},
                 "camera_lost": self.notifications_camera_lost.isChecked(),
                 "uniform_image": self.notifications_uniform_image.isChecked(),
                 "attempt_to_close": self.notifications_attempt_to_close.isChecked(),
                 "static_img": self.notifications_static_img.isChecked(),
+                "detector_unavailable": self.notifications_detector_unavailable.isChecked(),
             },
             "telegram_ids": [self.telegram_id_list.item(i).text()
                              for i in range(self.telegram_id_list.count())
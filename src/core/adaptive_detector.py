@@ -0,0 +1,192 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.core.detector import Detector
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def find_size_variants(model_path: str, sizes: List[int]) -> Dict[int, str]:
+    """
+    Ищет экспортированные варианты модели с другим размером входа
+    (models/model.onnx -> models/model_320.onnx, models/model_416.onnx, ...).
+    """
+    root, ext = os.path.splitext(model_path)
+    variants = {}
+    for size in sizes:
+        path = f"{root}_{size}{ext}"
+        if os.path.exists(path):
+            variants[int(size)] = path
+    return variants
+
+
+class AdaptiveDetector:
+    """
+    Набор вариантов одной модели с разным размером входа и выбор самого
+    крупного из тех, что укладываются в бюджет задержки на этом хосте.
+
+    Выбор делается после прогрева (warmup) на синтетическом кадре. Дальше
+    учитывается реальная задержка detect_phone: если её скользящее среднее
+    выходит за бюджет, со следующего кадра включается вариант меньше. Раз в
+    recheck_seconds пробуется следующий по размеру вариант - по одному
+    прогону на кадр, чтобы не останавливать поток инференса на весь замер.
+    Интерфейс совпадает с Detector.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        inference_config: dict = None,
+        latency_budget_ms: float = 100.0,
+        sizes: List[int] = (320, 416, 640),
+        recheck_seconds: float = 300.0,
+        probe_runs: int = 5,
+    ) -> None:
+        base = Detector(model_path, inference_config)
+        self.detectors: Dict[int, Detector] = {base.input_size: base}
+        for size, path in find_size_variants(model_path, sizes).items():
+            if size not in self.detectors:
+                self.detectors[size] = Detector(path, inference_config)
+        self.sizes = sorted(self.detectors)
+        self.latency_budget_ms = latency_budget_ms
+        self.recheck_seconds = recheck_seconds
+        self.probe_runs = probe_runs
+        self.active = self.detectors[self.sizes[-1]]
+        self.latency_ema_ms = None
+        self._pending_size = None
+        self._probe_frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+        self._last_check = time.monotonic()
+        # Перепроверка более крупного варианта: размер и задержки его прогонов
+        self._probe_size: Optional[int] = None
+        self._probe_timings: List[float] = []
+        # Готовность: все варианты прогреты и выбран активный
+        self._warm = threading.Event()
+
+    @property
+    def input_size(self) -> int:
+        return self.active.input_size
+
+    @property
+    def preprocessor(self):
+        return self.active.preprocessor
+
+    @property
+    def cold_latency_ms(self):
+        return self.active.cold_latency_ms
+
+    @property
+    def warm_latency_ms(self):
+        return self.active.warm_latency_ms
+
+    def warmup(self, runs: int = 3, frame_shape=(720, 1280, 3)) -> None:
+        """
+        Прогревает все варианты модели (см. Detector.warmup) и выбирает
+        активный: замер холодных сессий завысил бы задержку и испортил
+        cold_latency_ms.
+        """
+        for detector in self.detectors.values():
+            detector.warmup(runs=runs, frame_shape=frame_shape)
+        self.select()
+        self._warm.set()
+
+    def is_warm(self) -> bool:
+        return self._warm.is_set()
+
+    def wait_warm(self, timeout: float = None) -> bool:
+        return self._warm.wait(timeout)
+
+    def _probe(self, detector: Detector) -> float:
+        """Задержка одного прогона letterbox + detect_phone в мс на синтетическом кадре."""
+        start = time.perf_counter()
+        image, _ = detector.letterbox(self._probe_frame)
+        detector.detect_phone(image, swap_rb=True)
+        return (time.perf_counter() - start) * 1000
+
+    def measure(self, detector: Detector) -> float:
+        """Медианная задержка letterbox + detect_phone в мс на синтетическом кадре."""
+        return float(np.median([self._probe(detector) for _ in range(self.probe_runs)]))
+
+    def select(self) -> int:
+        """Замеряет все варианты и активирует самый крупный, укладывающийся в бюджет."""
+        latencies = {size: self.measure(self.detectors[size]) for size in self.sizes}
+        fitting = [size for size in self.sizes if latencies[size] <= self.latency_budget_ms]
+        size = fitting[-1] if fitting else self.sizes[0]
+        self._activate(size)
+        self.latency_ema_ms = latencies[size]
+        self._last_check = time.monotonic()
+        logger.info(f"Задержки вариантов модели, мс: {latencies}; бюджет {self.latency_budget_ms} мс -> {size}")
+        return size
+
+    def _activate(self, size: int) -> None:
+        if self.active.input_size != size:
+            logger.info(f"Переключение модели: {self.active.input_size} -> {size}")
+        self.active = self.detectors[size]
+
+    def begin_frame(self) -> None:
+        """
+        Переключение варианта перед подготовкой очередного кадра: уменьшение
+        входа, запрошенное detect_phone, или шаг плановой перепроверки.
+        Вызывается из letterbox, а RoiInference со своим холстом вызывает его
+        сам, чтобы кадр и его детекция шли через один вариант.
+        """
+        if self._pending_size is not None:
+            self._activate(self._pending_size)
+            self.latency_ema_ms = None
+            self._pending_size = None
+            self._cancel_probe()
+        elif self._probe_size is not None:
+            self._probe_step()
+        elif time.monotonic() - self._last_check > self.recheck_seconds:
+            index = self.sizes.index(self.active.input_size)
+            if index + 1 < len(self.sizes):
+                self._probe_size = self.sizes[index + 1]
+            else:
+                self._last_check = time.monotonic()
+
+    def _probe_step(self) -> None:
+        """
+        Один прогон проверяемого варианта. Первый прогон не учитывается (прогрев
+        после простоя); после probe_runs учтённых вариант включается, если
+        медиана укладывается в бюджет.
+        """
+        latency = self._probe(self.detectors[self._probe_size])
+        self._probe_timings.append(latency)
+        if len(self._probe_timings) <= self.probe_runs:
+            return
+        median = float(np.median(self._probe_timings[1:]))
+        logger.info(f"Перепроверка варианта {self._probe_size}: {median:.1f} мс, бюджет {self.latency_budget_ms} мс")
+        if median <= self.latency_budget_ms:
+            self._activate(self._probe_size)
+            self.latency_ema_ms = median
+        self._cancel_probe()
+
+    def _cancel_probe(self) -> None:
+        self._probe_size = None
+        self._probe_timings = []
+        self._last_check = time.monotonic()
+
+    def letterbox(self, frame: np.ndarray):
+        self.begin_frame()
+        return self.active.letterbox(frame)
+
+    def detect_phone(self, image, conf=0.5, swap_rb=False):
+        start = time.perf_counter()
+        result = self.active.detect_phone(image, conf=conf, swap_rb=swap_rb)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.latency_ema_ms = latency_ms if self.latency_ema_ms is None else \
+            0.9 * self.latency_ema_ms + 0.1 * latency_ms
+
+        index = self.sizes.index(self.active.input_size)
+        if self.latency_ema_ms > self.latency_budget_ms * 1.2 and index > 0:
+            logger.info(f"Средняя задержка {self.latency_ema_ms:.1f} мс выше бюджета, уменьшаем вход")
+            self._pending_size = self.sizes[index - 1]
+        return result
+
+    def detect_batch(self, frames, conf=0.5, swap_rb=False):
+        return self.active.detect_batch(frames, conf=conf, swap_rb=swap_rb)
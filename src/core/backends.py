@@ -0,0 +1,290 @@
+import abc
+import glob
+import hashlib
+import logging
+import os
+import platform
+from typing import Dict
+
+import cv2
+import numpy as np
+import onnx
+import onnxruntime as ort
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def build_session_options(inference_config: dict = None) -> ort.SessionOptions:
+    """
+    Собирает SessionOptions ONNX Runtime из секции "inference" конфига.
+
+    Args:
+        inference_config: Словарь настроек; отсутствующие ключи берут значения ORT по умолчанию.
+
+    Returns:
+        Настроенный ort.SessionOptions.
+    """
+    cfg = inference_config or {}
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = int(cfg.get("intra_op_num_threads", 0))
+    options.inter_op_num_threads = int(cfg.get("inter_op_num_threads", 0))
+    options.execution_mode = EXECUTION_MODES[cfg.get("execution_mode", "sequential")]
+    options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[cfg.get("graph_optimization_level", "all")]
+    spinning = "1" if cfg.get("allow_spinning", True) else "0"
+    options.add_session_config_entry("session.intra_op.allow_spinning", spinning)
+    options.add_session_config_entry("session.inter_op.allow_spinning", spinning)
+    if cfg.get("enable_profiling", False):
+        # Трассировка операторов в JSON (src.tools.profile_model), файл пишет session.end_profiling()
+        options.enable_profiling = True
+        options.profile_file_prefix = cfg.get("profile_file_prefix", "onnxruntime_profile")
+    return options
+
+
+def model_cache_path(model_path: str, inference_config: dict = None) -> str:
+    """
+    Путь к оптимизированной модели в формате ORT рядом с исходной:
+    models/model.onnx -> models/model.<ключ>.ort.
+
+    Ключ - хэш файла модели, версия ONNX Runtime, уровень оптимизации графа
+    и машина: граф после уровня "all" может содержать ядра под конкретный
+    процессор. Потоки и режим выполнения на сохранённый граф не влияют.
+    """
+    cfg = inference_config or {}
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    key_parts = (
+        digest.hexdigest(), ort.__version__, cfg.get("graph_optimization_level", "all"),
+        platform.node(), platform.machine(), platform.processor(),
+    )
+    key = hashlib.sha256("|".join(key_parts).encode()).hexdigest()[:16]
+    return f"{os.path.splitext(model_path)[0]}.{key}.ort"
+
+
+class InferenceBackend(abc.ABC):
+    """
+    Движок, выполняющий модель ONNX для Detector.
+
+    Реализация заполняет описание входа и выхода модели и выполняет прогон.
+    Типы тензоров записываются как в ONNX Runtime ("tensor(float)", "tensor(uint8)"),
+    размерности - целыми числами или строками для динамических осей.
+    """
+
+    name = ""
+
+    def __init__(self, model_path: str, inference_config: dict = None) -> None:
+        self.model_path = model_path
+        self.input_name = ""
+        self.input_shape = []
+        self.input_type = "tensor(float)"
+        self.output_name = ""
+        self.output_shape = []
+        self.output_type = "tensor(float)"
+        self.metadata: Dict[str, str] = {}
+        # Оптимизированный граф из кэша (model_cache_path): "off", "hit", "miss", "unwritable"
+        self.cache_status = "off"
+
+    @abc.abstractmethod
+    def run(self, input_data: np.ndarray, extra_inputs: dict = None, persistent_output: bool = True) -> np.ndarray:
+        """
+        Один прогон модели.
+
+        Args:
+            input_data: Входной тензор кадра (или батча кадров).
+            extra_inputs: Дополнительные входы модели по именам (пороги встроенного NMS).
+            persistent_output: Можно вернуть постоянный выходной буфер, который
+                перезаписывается следующим вызовом. False - вернуть новый массив.
+
+        Returns:
+            Первый выход модели.
+        """
+
+
+class OrtBackend(InferenceBackend):
+    """ONNX Runtime на CPUExecutionProvider с постоянными буферами через IOBinding."""
+
+    name = "onnxruntime"
+
+    def __init__(self, model_path: str, inference_config: dict = None) -> None:
+        super().__init__(model_path, inference_config)
+        inference_config = inference_config or {}
+        self.session, self.cache_status = self._create_session(model_path, inference_config)
+        model_input = self.session.get_inputs()[0]
+        model_output = self.session.get_outputs()[0]
+        self.input_name, self.input_shape, self.input_type = model_input.name, model_input.shape, model_input.type
+        self.output_name, self.output_shape, self.output_type = model_output.name, model_output.shape, model_output.type
+        self.metadata = dict(self.session.get_modelmeta().custom_metadata_map)
+        self.binding = None
+        if inference_config.get("use_io_binding", True):
+            self._init_io_binding()
+
+    @staticmethod
+    def _create_session(model_path: str, inference_config: dict):
+        """
+        Сессия ONNX Runtime; с "model_cache" граф оптимизируется один раз и
+        сохраняется в формате ORT (model_cache_path), следующие запуски грузят
+        готовый граф без повторной оптимизации.
+
+        Returns:
+            (сессия, состояние кэша: "off", "hit", "miss" или "unwritable").
+        """
+        providers = ["CPUExecutionProvider"]
+        if not inference_config.get("model_cache", True):
+            return ort.InferenceSession(model_path, sess_options=build_session_options(inference_config), providers=providers), "off"
+
+        cache_path = model_cache_path(model_path, inference_config)
+        if os.path.exists(cache_path):
+            options = build_session_options(inference_config)
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            options.add_session_config_entry("session.load_model_format", "ORT")
+            try:
+                return ort.InferenceSession(cache_path, sess_options=options, providers=providers), "hit"
+            except Exception as e:
+                logger.warning(f"Кэш модели {cache_path} не загрузился, создаётся заново: {e}")
+
+        options = build_session_options(inference_config)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        options.optimized_model_filepath = temp_path
+        options.add_session_config_entry("session.save_model_format", "ORT")
+        # Предупреждение ORT о графе под конкретный процессор ожидаемо: кэш привязан к машине
+        options.log_severity_level = 3
+        try:
+            session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.debug(f"Кэш модели не записан ({cache_path}): {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            session = ort.InferenceSession(model_path, sess_options=build_session_options(inference_config), providers=providers)
+            return session, "unwritable"
+        # Кэши прежних версий модели, ORT или настроек больше не нужны
+        for stale in glob.glob(f"{glob.escape(os.path.splitext(model_path)[0])}.*.ort"):
+            if stale != cache_path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        return session, "miss"
+
+    def _init_io_binding(self) -> None:
+        """
+        Привязывает постоянный выходной буфер к сессии через IOBinding.
+        Для моделей с не float32 выходом остаётся обычный session.run.
+
+        Если у выхода есть динамические оси (входы разной высоты и ширины),
+        буфер создаётся на каждую форму входа: форма выхода узнаётся первым
+        обычным прогоном, при смене формы выход привязывается заново.
+        """
+        if self.output_type != "tensor(float)":
+            logger.debug(f"IOBinding не используется: выход {self.output_type} {self.output_shape}")
+            return
+        self._static_output = all(isinstance(d, int) for d in self.output_shape)
+        # Форма входа -> выходной буфер (для статического выхода - один буфер на все формы)
+        self._output_buffers = {}
+        self._output_buffer = None
+        self._bound_input = None
+        self._bound_output_shape = None
+        self.binding = self.session.io_binding()
+        if self._static_output:
+            self._bind_output(np.empty(self.output_shape, dtype=np.float32))
+
+    def _bind_output(self, buffer: np.ndarray) -> None:
+        self._output_buffer = buffer
+        self.binding.bind_output(self.output_name, "cpu", 0, np.float32, buffer.shape, buffer.ctypes.data)
+
+    def run(self, input_data: np.ndarray, extra_inputs: dict = None, persistent_output: bool = True) -> np.ndarray:
+        """
+        С IOBinding вход и выход не копируются: возвращается постоянный выходной
+        буфер. Без привязки (или с extra_inputs) - обычный session.run.
+        """
+        if self.binding is None or extra_inputs or not persistent_output:
+            return self.session.run(None, {self.input_name: input_data, **(extra_inputs or {})})[0]
+        if not self._static_output and input_data.shape != self._bound_output_shape:
+            buffer = self._output_buffers.get(input_data.shape)
+            if buffer is None:
+                # Первый вход этой формы: форма выхода известна только после прогона
+                output = self.session.run(None, {self.input_name: input_data})[0]
+                buffer = self._output_buffers[input_data.shape] = np.empty(output.shape, dtype=np.float32)
+                logger.debug(f"IOBinding: вход {input_data.shape} -> выход {output.shape}")
+            self._bind_output(buffer)
+            self._bound_output_shape = input_data.shape
+        input_key = (input_data.ctypes.data, input_data.shape)
+        if input_key != self._bound_input:
+            # Входной буфер привязывается заново только если предобработка его пересоздала
+            self.binding.bind_input(
+                self.input_name, "cpu", 0, input_data.dtype.type, input_data.shape, input_data.ctypes.data
+            )
+            self._bound_input = input_key
+        self.session.run_with_iobinding(self.binding)
+        return self._output_buffer
+
+
+class OpenCVBackend(InferenceBackend):
+    """
+    OpenCV DNN (cv2.dnn.readNetFromONNX) на CPU.
+
+    Поддерживает обычные float-модели; варианты со встроенной предобработкой
+    или NMS (src.tools.embed_*) OpenCV DNN загрузить не может.
+    """
+
+    name = "opencv"
+
+    def __init__(self, model_path: str, inference_config: dict = None) -> None:
+        super().__init__(model_path, inference_config)
+        # Описание входа/выхода и метаданные OpenCV не отдаёт, читаем их из файла
+        model = onnx.load(model_path, load_external_data=False)
+        self.metadata = {prop.key: prop.value for prop in model.metadata_props}
+        if "embedded_preprocessing" in self.metadata or "embedded_nms" in self.metadata:
+            raise ValueError(f"OpenCV DNN не поддерживает модели со встроенной предобработкой или NMS: {model_path}")
+        initializers = {init.name for init in model.graph.initializer}
+        model_input = next(value for value in model.graph.input if value.name not in initializers)
+        model_output = model.graph.output[0]
+        self.input_name, self.input_shape, self.input_type = self._describe(model_input)
+        self.output_name, self.output_shape, self.output_type = self._describe(model_output)
+        del model
+
+        self.net = cv2.dnn.readNetFromONNX(model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    @staticmethod
+    def _describe(value):
+        tensor_type = value.type.tensor_type
+        shape = [dim.dim_value if dim.HasField("dim_value") else (dim.dim_param or None) for dim in tensor_type.shape.dim]
+        type_name = onnx.helper.tensor_dtype_to_np_dtype(tensor_type.elem_type).name
+        return value.name, shape, {"float32": "tensor(float)"}.get(type_name, f"tensor({type_name})")
+
+    def run(self, input_data: np.ndarray, extra_inputs: dict = None, persistent_output: bool = True) -> np.ndarray:
+        self.net.setInput(input_data, self.input_name)
+        for name, value in (extra_inputs or {}).items():
+            self.net.setInput(value, name)
+        return self.net.forward(self.output_name)
+
+
+BACKENDS = {
+    OrtBackend.name: OrtBackend,
+    OpenCVBackend.name: OpenCVBackend,
+}
+
+
+def create_backend(name: str, model_path: str, inference_config: dict = None) -> InferenceBackend:
+    """
+    Создаёт движок по имени из BACKENDS ("onnxruntime", "opencv").
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный движок инференса: {name}. Доступны: {', '.join(BACKENDS)}")
+    return BACKENDS[name](model_path, inference_config)
@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import sys
@@ -22,32 +23,129 @@ class Config:
                 "camera_lost": True,
                 "uniform_image": True,
                 "phone_detected": True,
+                "tablet_detected": True,
+                "camera_detected": True,
                 "attempt_to_close": False,
-                "static_img": True
+                "static_img": True,
+                "detector_unavailable": True  # детектор не отвечает - кадры не проверяются
             },
             "log_events": {
                 "phone_detected": True,
+                "tablet_detected": True,
+                "camera_detected": True,
                 "camera_lost": True,
                 "uniform_image": True,
                 "attempt_to_close": True,
-                "static_img": True
+                "static_img": True,
+                "detector_unavailable": True
             },
             "other_events": {
                 "make_screen_enabled": True
             },
             "notifications": {
                 "phone_detected": True,
+                "tablet_detected": True,
+                "camera_detected": True,
                 "camera_lost": True,
                 "uniform_image": True,
                 "attempt_to_close": True,
-                "static_img": True
+                "static_img": True,
+                "detector_unavailable": True
             },
             "autostart": {
                 "on_system_start": False,
                 "on_program_start": {"enabled": False, "program_path": ""},
                 "on_file_open": {"enabled": False, "file_path": ""}
             },
-            "telegram_ids": []
+            "telegram_ids": [],
+            "detection_classes": {
+                # Номер класса модели -> событие. Блокировка, журнал и оповещения по классу
+                # включаются ключом события в lock_events, log_events и notifications;
+                # confidence: None - общий confidence_threshold
+                "0": {"enabled": True, "event": "phone_detected", "title": "Обнаружен мобильный телефон", "label": "Phone", "confidence": None},
+                "1": {"enabled": False, "event": "tablet_detected", "title": "Обнаружен планшет", "label": "Tablet", "confidence": None},
+                "2": {"enabled": False, "event": "camera_detected", "title": "Обнаружена камера", "label": "Camera", "confidence": None}
+            },
+            "inference": {
+                "backend": "onnxruntime",  # onnxruntime | opencv (python -m src.tools.benchmark_backends)
+                "intra_op_num_threads": 0,  # 0 - решает ONNX Runtime
+                "inter_op_num_threads": 0,
+                "execution_mode": "sequential",  # sequential | parallel
+                "graph_optimization_level": "all",  # disable | basic | extended | all
+                "allow_spinning": True,
+                "cv2_num_threads": -1,  # -1 - не менять настройку OpenCV
+                "model_variant": "fp32",  # fp32 | int8 | uint8 | nms | uint8_nms | dyn (models/model_<вариант>.onnx, fp32 - models/model.onnx)
+                "use_io_binding": True,
+                "model_cache": True,  # оптимизированный граф в models/<модель>.<ключ>.ort
+                "rect_stride": 32,  # кратность прямоугольного холста для модели с динамическими H и W, 0 - квадрат
+                "warmup_runs": 3,  # прогревочные прогоны модели при старте
+                "latency_budget_ms": 0,  # 0 - без автоподбора размера входа
+                "model_sizes": [320, 416, 640],  # models/model_320.onnx, ...
+                "latency_recheck_seconds": 300,
+                "autotune_on_start": True,
+                "autotuned_for": ""
+            },
+            "tracking": {
+                # Телефон подтверждается, если трек найден в phone_limit из последних
+                # confirm_window кадров, уложившихся в window_seconds
+                "confirm_window": 3,
+                "window_seconds": 10,
+                "iou_threshold": 0.1,
+                "max_missed": 3
+            },
+            "detector_service": {
+                # Детектор в отдельном процессе, кадры через разделяемую память
+                "enabled": False,
+                "slots": 4,  # одновременных запросов к процессу
+                "timeout": 2.0,  # секунд ожидания слота и ответа
+                "restart_after_requests": 0,  # плановый перезапуск процесса, 0 - нет
+                "max_rss_mb": 0,  # перезапуск при росте памяти процесса, 0 - нет
+                "startup_timeout": 60,  # секунд на загрузку и прогрев до события detector_unavailable
+                "unavailable_seconds": 10  # столько без ответа детектора - событие detector_unavailable
+            },
+            "pipeline": {
+                "action_queue_size": 4,  # событий в очереди стадии реакции
+                "stats_interval": 60  # секунд между записями статистики стадий, 0 - не писать
+            },
+            "motion_gate": {
+                # Пропуск инференса, пока сцена не изменилась с последнего запуска детектора
+                "enabled": False,
+                "thumbnail_width": 64,
+                "threshold": 15,  # порог разности яркости миниатюр
+                "min_area": 0.002,  # доля изменившихся пикселей миниатюры
+                "max_skip_seconds": 5.0  # принудительный инференс не реже этого
+            },
+            "prefilter": {
+                # Классификатор "телефон возможен" перед детектором (python -m src.tools.train_prefilter)
+                "enabled": False,
+                "model": "prefilter.npz",  # в папке основной модели; .npz (HOG) или .onnx
+                "safety_interval": 2.0  # полный прогон детектора не реже раза в N секунд
+            },
+            "verifier": {
+                # Модель проверки на вырезке кадра перед блокировкой и уведомлением
+                "enabled": False,
+                "model": "verifier.onnx",  # в папке основной модели
+                "conf": 0.5,
+                "margin": 0.5,  # расширение бокса кандидата с каждой стороны
+                "min_crop": 160,  # минимальная сторона вырезки, пикселей кадра
+                "retry_seconds": 2.0  # отклонённый трек проверяется снова не чаще
+            },
+            "roi_mask": {
+                # Зона интереса администратора (редактор во вкладке настроек):
+                # многоугольники в долях кадра [[x, y], ...]
+                "enabled": False,
+                "include": [],  # где искать; пусто - весь кадр
+                "exclude": []  # что не показывать детектору (подставка, окно)
+            },
+            "roi_inference": {
+                "enabled": False,
+                "full_scan_interval": 10,  # полный кадр раз в N кадров
+                "margin": 0.3,
+                "min_roi_size": 320,
+                "max_roi_fraction": 0.6,
+                "motion_threshold": 25,
+                "motion_min_area": 0.002
+            }
         }
         self.config_path = self._get_config_path()
         self.config = self.load_config()
@@ -86,10 +184,13 @@ class Config:
                     config = json.load(f)
                 logger.debug(f"Loaded config from base path: {self.config_path}")
 
-            # Обновляем недостающие ключи из default_config
+            # Обновляем недостающие ключи из default_config, включая вложенные словари
             for key, value in self.default_config.items():
                 if key not in config:
-                    config[key] = value
+                    config[key] = copy.deepcopy(value)
+                elif isinstance(value, dict) and isinstance(config[key], dict):
+                    for sub_key, sub_value in value.items():
+                        config[key].setdefault(sub_key, copy.deepcopy(sub_value))
             logger.debug(f"Loaded and updated config: {config}")
             return config
         except FileNotFoundError:
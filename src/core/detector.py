@@ -1,48 +1,413 @@
-import onnxruntime as ort
+import ast
 import cv2
 import numpy as np
 import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from src.core.backends import create_backend
+from src.core.preprocessing import LetterboxPreprocessor
 
 logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
 logger = logging.getLogger(__name__)
 
+# Одна детекция после NMS; строки массива распаковываются как кортеж
+# (x1, y1, x2, y2, confidence, class_id)
+DETECTION_DTYPE = np.dtype([
+    ("x1", np.float32),
+    ("y1", np.float32),
+    ("x2", np.float32),
+    ("y2", np.float32),
+    ("confidence", np.float32),
+    ("class_id", np.int32),
+])
+
+BOX_FIELDS = ["x1", "y1", "x2", "y2"]
+
+
+class Detections:
+    """
+    Результат детекции кадра: все боксы отслеживаемых классов после NMS
+    в структурированном массиве DETECTION_DTYPE по убыванию уверенности.
+
+    Свойства - представления и векторные выборки из массива, объектов Python
+    на каждый бокс не создаётся. Первый бокс - самый уверенный.
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, array: np.ndarray = None) -> None:
+        self.array = np.empty(0, dtype=DETECTION_DTYPE) if array is None else array
+
+    @property
+    def count(self) -> int:
+        return len(self.array)
+
+    @property
+    def found(self) -> bool:
+        return len(self.array) > 0
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """Боксы [N, 4] int32 (x1, y1, x2, y2)."""
+        return np.stack([self.array[name] for name in BOX_FIELDS], axis=1).astype(np.int32).reshape(-1, 4)
+
+    @property
+    def bbox(self):
+        """Самый уверенный бокс (x1, y1, x2, y2) или None."""
+        return tuple(int(self.array[name][0]) for name in BOX_FIELDS) if self.found else None
+
+    @property
+    def confs(self) -> list:
+        """Уверенности всех боксов (для журнала и уведомлений)."""
+        return self.array["confidence"].tolist()
+
+    @property
+    def class_id(self):
+        """Класс самого уверенного бокса или None."""
+        return int(self.array["class_id"][0]) if self.found else None
+
+    def to_source(self, transform, offset=(0, 0)) -> "Detections":
+        """
+        Боксы с холста в координатах исходного кадра для всех боксов сразу:
+        сдвиг и масштаб LetterboxTransform.to_source с обрезкой по границам
+        кадра, как в to_source_int. Координаты остаются float32; целые пиксели,
+        как у to_source_int, даёт свойство boxes.
+
+        Args:
+            transform: LetterboxTransform холста.
+            offset: (x, y) исходного кадра в большем кадре, если letterbox делался по вырезке.
+        """
+        left, top = transform.offset
+        h, w = transform.src_shape
+        array = self.array.copy()
+        for name, shift, limit, dst in (
+            ("x1", left, w, offset[0]), ("y1", top, h, offset[1]),
+            ("x2", left, w, offset[0]), ("y2", top, h, offset[1]),
+        ):
+            array[name] = np.clip((array[name] - shift) / transform.scale, 0, limit) + dst
+        return Detections(array)
+
+    def translate(self, dx: float, dy: float) -> "Detections":
+        """Боксы, сдвинутые на (dx, dy): из координат вырезки в координаты кадра."""
+        array = self.array.copy()
+        array["x1"] += dx
+        array["x2"] += dx
+        array["y1"] += dy
+        array["y2"] += dy
+        return Detections(array)
+
+    def __repr__(self) -> str:
+        return f"Detections(count={self.count}, bbox={self.bbox}, confs={[round(c, 2) for c in self.confs]})"
+
+
+# Смещение боксов по номеру класса для NMS по классам одним вызовом nms_boxes:
+# боксы разных классов не пересекаются и не подавляют друг друга
+CLASS_OFFSET = 7680.0
+
+
+def nms_boxes(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    iou_thres: float,
+    max_det: int = 300
+) -> np.ndarray:
+    """
+    Жадный NMS на массивах NumPy.
+
+    Args:
+        boxes: Боксы [N, 4] в формате (x1, y1, x2, y2).
+        scores: Уверенности [N].
+        iou_thres: Порог IoU, выше которого бокс подавляется.
+        max_det: Максимальное число оставляемых боксов.
+
+    Returns:
+        Индексы оставленных боксов в порядке убывания уверенности.
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = (np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])).clip(0)
+        inter_h = (np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])).clip(0)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[iou <= iou_thres]
+    return np.asarray(keep, dtype=np.intp)
+
+
+def parse_class_names(names) -> dict:
+    """Имена классов из метаданных модели; пустой словарь, если их нет или они не разбираются."""
+    if not names:
+        return {}
+    try:
+        return {int(class_id): str(name) for class_id, name in ast.literal_eval(names).items()}
+    except (ValueError, SyntaxError, AttributeError):
+        logger.debug(f"Не удалось разобрать имена классов: {names!r}")
+        return {}
+
+
+def resolve_model_path(model_path: str, variant: str = "fp32") -> str:
+    """
+    Возвращает путь к нужному варианту модели.
+
+    Вариант "fp32" - исходный файл, остальные ищутся рядом с суффиксом
+    (models/model.onnx -> models/model_int8.onnx). Если файла варианта нет,
+    используется исходная модель.
+    """
+    if variant in (None, "", "fp32"):
+        return model_path
+    root, ext = os.path.splitext(model_path)
+    variant_path = f"{root}_{variant}{ext}"
+    if os.path.exists(variant_path):
+        return variant_path
+    logger.warning(f"Вариант модели {variant} не найден ({variant_path}), используется {model_path}")
+    return model_path
+
 
 class Detector:
-    def __init__(self, model_path):
+    def __init__(self, model_path, inference_config: dict = None):
         try:
-            self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
-            self.input_name = self.session.get_inputs()[0].name
-            logger.debug(f"Сессия ONNX Runtime создана: {self.session.get_providers()}")
+            inference_config = inference_config or {}
+            cv2_threads = int(inference_config.get("cv2_num_threads", -1))
+            if cv2_threads >= 0:
+                cv2.setNumThreads(cv2_threads)
+            self.model_path = resolve_model_path(model_path, inference_config.get("model_variant", "fp32"))
+            start = time.perf_counter()
+            self.backend = create_backend(
+                inference_config.get("backend", "onnxruntime"), self.model_path, inference_config
+            )
+            self.load_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"Модель {self.model_path} загружена за {self.load_ms:.0f} мс (кэш оптимизированного графа: {self.backend.cache_status})")
+            self.input_name = self.backend.input_name
+            # Фиксированный размер батча модели или None, если ось батча динамическая
+            input_shape = self.backend.input_shape
+            self.max_batch = input_shape[0] if isinstance(input_shape[0], int) else None
+            self.output_name = self.backend.output_name
+            # Модель со встроенной предобработкой (src.tools.embed_preprocessing)
+            # принимает кадр uint8 [1, H, W, 3] и сама приводит тип и порядок осей
+            self.raw_input = self.backend.input_type == "tensor(uint8)"
+            metadata = self.backend.metadata
+            self.embedded_swap_rb = metadata.get("embedded_preprocessing") == "swap_rb"
+            # Модель со встроенным NMS (src.tools.embed_nms) возвращает готовые
+            # детекции [M, 7] и принимает пороги отдельными входами
+            self.embedded_nms = "embedded_nms" in metadata
+            # Сторона квадратного входа модели (для динамических осей - 640)
+            height, width = input_shape[1:3] if self.raw_input else input_shape[2:4]
+            self.input_size = height if isinstance(height, int) else 640
+            # Модель с динамическими H и W (src.tools.make_dynamic_shape) получает
+            # прямоугольный холст, кратный шагу сетки: серые поля не сворачиваются впустую
+            self.dynamic_shape = not isinstance(height, int) and not isinstance(width, int)
+            stride = int(inference_config.get("rect_stride", 32)) if self.dynamic_shape else 0
+            self.preprocessor = LetterboxPreprocessor(size=self.input_size, stride=stride)
+            # Имена классов из метаданных экспорта Ultralytics ("{0: 'phone', 1: 'tablet'}")
+            self.class_names = parse_class_names(metadata.get("names"))
+            # Отслеживаемые классы: номер -> собственный порог уверенности (None - порог вызова)
+            self.classes = {
+                int(class_id): threshold
+                for class_id, threshold in (inference_config.get("classes") or {0: None}).items()
+            }
+            unknown = sorted(set(self.classes) - set(self.class_names)) if self.class_names else []
+            if unknown:
+                logger.warning(f"Классов {unknown} нет в модели {self.model_path}: {self.class_names}")
+            # Готовность после warmup(): первый прогон сессии в разы медленнее установившегося
+            self._warm = threading.Event()
+            self.cold_latency_ms = None
+            self.warm_latency_ms = None
+            logger.debug(f"Детектор создан: {self.model_path}, движок {self.backend.name}, batch={self.max_batch}, uint8-вход={self.raw_input}, NMS в графе={self.embedded_nms}, прямоугольный вход={bool(stride)}")
         except Exception as e:
-            logger.debug(f"Ошибка при создании сессии ONNX: {e}")
+            logger.debug(f"Ошибка при создании детектора: {e}")
             raise
 
-    def detect_phone(self, image, conf=0.5):
+    def class_name(self, class_id: int) -> str:
+        """Имя класса из метаданных модели, для модели без имён - номер."""
+        return self.class_names.get(class_id, str(class_id))
+
+    def _extra_inputs(self, conf: float = 0.5, iou: float = 0.45) -> Optional[Dict[str, np.ndarray]]:
+        """Дополнительные входы модели: пороги для модели со встроенным NMS, для остальных - None."""
+        if not self.embedded_nms:
+            return None
+        return {
+            "conf_threshold": np.array([conf], dtype=np.float32),
+            "iou_threshold": np.array([iou], dtype=np.float32),
+        }
+
+    def _candidate_conf(self, conf: float) -> float:
+        """
+        Порог кандидатов для постобработки и NMS: наименьший из порога вызова и
+        собственных порогов классов, иначе класс с порогом ниже conf отсекался бы
+        до _select_phone.
+        """
+        return min([conf, *(threshold for threshold in self.classes.values() if threshold is not None)])
+
+    def _run(self, input_data: np.ndarray, conf: float = 0.5) -> np.ndarray:
+        """
+        Один прогон модели. Выход может быть постоянным буфером движка
+        (IOBinding), который перезаписывается следующим вызовом.
+        """
+        return self.backend.run(input_data, self._extra_inputs(conf))
+
+    def warmup(self, runs: int = 3, frame_shape=(720, 1280, 3)) -> None:
+        """
+        Прогревочные прогоны на синтетическом кадре: ленивая инициализация ядер,
+        рост арены памяти и привязка буферов IOBinding происходят до первого
+        настоящего кадра. Прогрев идёт через те же буферы, что и detect_phone,
+        поэтому до is_warm() детектор нельзя вызывать из других потоков.
+
+        Args:
+            runs: Число прогонов (первый считается холодным).
+            frame_shape: Размер синтетического кадра камеры.
+        """
+        try:
+            frame = np.random.default_rng(0).integers(0, 256, frame_shape, dtype=np.uint8)
+            timings = []
+            for _ in range(max(1, runs)):
+                start = time.perf_counter()
+                image, _ = self.letterbox(frame)
+                self.detect_phone(image, swap_rb=True)
+                timings.append((time.perf_counter() - start) * 1000)
+            self.cold_latency_ms = timings[0]
+            self.warm_latency_ms = float(np.median(timings[1:])) if len(timings) > 1 else timings[0]
+            logger.debug(f"Прогрев {self.model_path}: холодный прогон {self.cold_latency_ms:.1f} мс, прогретый {self.warm_latency_ms:.1f} мс")
+        except Exception as e:
+            logger.debug(f"Ошибка при прогреве детектора: {e}")
+        finally:
+            # Даже при ошибке не держим основной цикл: детекция просто будет холодной
+            self._warm.set()
+
+    def is_warm(self) -> bool:
+        """Завершён ли прогрев."""
+        return self._warm.is_set()
+
+    def wait_warm(self, timeout: float = None) -> bool:
+        """Ждёт завершения прогрева; возвращает is_warm()."""
+        return self._warm.wait(timeout)
+
+    def begin_frame(self) -> None:
+        """Перед подготовкой кадра: у одной модели переключать нечего (см. AdaptiveDetector)."""
+
+    def letterbox(self, frame: np.ndarray):
+        """
+        Letterbox кадра в постоянный холст размера входа модели без лишних аллокаций.
+
+        Returns:
+            (холст, перезаписываемый следующим вызовом; LetterboxTransform для
+            перевода боксов detect_phone в координаты исходного кадра).
+        """
+        return self.preprocessor.letterbox(frame)
+
+    def detect_phone(self, image, conf=0.5, swap_rb=False):
+        """
+        Детекция телефона (и других отслеживаемых классов self.classes) на кадре
+        размера входа модели за один прогон.
+
+        Args:
+            image: Кадр после letterbox/prepreprocess (для модели с динамическими
+                H и W - холст любого размера, кратного шагу сетки).
+            conf: Порог уверенности для классов без собственного порога.
+            swap_rb: Поменять каналы R и B при нормализации (вместо cv2.cvtColor).
+
+        Returns:
+            Detections: все боксы отслеживаемых классов в координатах холста.
+        """
         try:
-            input_data = self.preprocess_image(image)
-            outputs = self.session.run(None, {self.input_name: input_data})[0]
-            detections = self.postprocess_output(outputs, conf_thres=conf)
-            
-            phones = []
-            confidences = []
-            for x1, y1, x2, y2, conf_value, class_id in detections:
-                class_id = int(class_id)
-                if class_id == 0 and float(conf_value) >= conf:
-                    x1, y1, x2, y2 = map(int, [x1, y1, x2, y2])
-                    logger.debug(f"Обнаружен объект: класс={class_id}, уверенность={conf_value:.2f}, координаты=({x1}, {y1}, {x2}, {y2})")
-                    phones.append((x1, y1, x2, y2))
-                    confidences.append(float(conf_value))
-                    break
-            if phones:
-                return True, phones[0], confidences
-            logger.debug("Телефон не обнаружен в кадре")
-            return False, None, []
+            candidate_conf = self._candidate_conf(conf)
+            outputs = self._run(self.make_input(image, swap_rb=swap_rb), candidate_conf)
+            detections = self.postprocess(outputs, candidate_conf)
+            return self._select_phone(detections, conf)
         except Exception as e:
             logger.debug(f"Ошибка при детекции: {e}")
-            return False, None, []
+            return Detections()
+
+    def make_input(self, image: np.ndarray, swap_rb: bool = False) -> np.ndarray:
+        """
+        Входной тензор модели для кадра размера входа.
+
+        Для float-модели - нормализованный BCHW из LetterboxPreprocessor.to_tensor.
+        Для модели со встроенной предобработкой - сам кадр uint8 с осью батча
+        (без копии); каналы переставляются в NumPy, только если swap_rb
+        не совпадает с перестановкой, встроенной в граф.
+        """
+        if not self.raw_input:
+            return self.preprocessor.to_tensor(image, swap_rb=swap_rb)
+        image = image[..., :3]
+        if swap_rb != self.embedded_swap_rb:
+            image = image[..., ::-1]
+        return np.ascontiguousarray(image)[np.newaxis]
+
+    def detect_batch(self, frames, conf=0.5, swap_rb=False):
+        """
+        Детекция телефона на нескольких кадрах за один вызов ONNX Runtime.
+
+        Args:
+            frames: Последовательность кадров BGR. Кадры, не приведённые к размеру
+                входа модели, проходят prepreprocess.
+            conf: Порог уверенности.
+            swap_rb: Поменять каналы R и B, как в detect_phone (кадры камеры - swap_rb=True).
+
+        Returns:
+            Список Detections, по одному на кадр.
+        """
+        if not len(frames):
+            return []
+        try:
+            images = [
+                frame if frame.shape == (self.input_size, self.input_size, 3)
+                else self.prepreprocess(frame, size=self.input_size)
+                for frame in frames
+            ]
+            images = np.stack(images)
+            if self.raw_input:
+                # Каналы переставляются в NumPy, только если swap_rb не совпадает
+                # с перестановкой, встроенной в граф (как в make_input)
+                input_data = images[..., ::-1].copy() if swap_rb != self.embedded_swap_rb else images
+            else:
+                input_data = self.preprocess_image(images[..., ::-1] if swap_rb else images)
+            # Модель с фиксированной осью батча обрабатываем порциями допустимого размера
+            step = self.max_batch or len(images)
+            candidate_conf = self._candidate_conf(conf)
+            chunks = [
+                self.backend.run(input_data[i:i + step], self._extra_inputs(candidate_conf), persistent_output=False)
+                for i in range(0, len(images), step)
+            ]
+            if self.embedded_nms:
+                # Номер кадра в выходе NMS считается внутри порции
+                return [
+                    self._select_phone(self.postprocess(chunks[i // step], candidate_conf, batch_index=i % step), conf)
+                    for i in range(len(images))
+                ]
+            outputs = np.concatenate(chunks)
+            return [
+                self._select_phone(self.postprocess(outputs[i:i + 1], candidate_conf), conf)
+                for i in range(len(images))
+            ]
+        except Exception as e:
+            logger.debug(f"Ошибка при пакетной детекции: {e}")
+            return [Detections() for _ in frames]
+
+    def _select_phone(self, detections: np.ndarray, conf: float) -> Detections:
+        """
+        Оставляет из результатов postprocess_output боксы отслеживаемых классов,
+        прошедшие порог своего класса; порядок по уверенности сохраняется.
+        """
+        thresholds = np.full(len(detections), np.inf, dtype=np.float32)
+        for class_id, threshold in self.classes.items():
+            thresholds[detections["class_id"] == class_id] = conf if threshold is None else threshold
+        selected = Detections(detections[detections["confidence"] >= thresholds])
+        if selected.found:
+            logger.debug(f"Обнаружено объектов: {selected.count}, лучший: класс={self.class_name(selected.class_id)}, координаты={selected.bbox}")
+        else:
+            logger.debug("Отслеживаемые объекты не обнаружены в кадре")
+        return selected
         
     @staticmethod
-    def prepreprocess(frame: np.ndarray) -> np.ndarray:
+    def prepreprocess(frame: np.ndarray, size: int = 640) -> np.ndarray:
         # 1. rgb to bgr
         img = frame
         # img = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
@@ -54,24 +419,24 @@ class Detector:
         # Определение размеров для ресайза
         h, w = img.shape[:2]
         if h > w:
-            new_h = 640
-            new_w = int(w * 640 / h)
+            new_h = size
+            new_w = int(w * size / h)
         else:
-            new_w = 640
-            new_h = int(h * 640 / w)
+            new_w = size
+            new_h = int(h * size / w)
         
         # Ресайз с сохранением пропорций
         img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
         
         # Добавление серых полей (RGB: 114, 114, 114)
-        border_v = (640 - new_h) // 2
-        border_h = (640 - new_w) // 2
+        border_v = (size - new_h) // 2
+        border_h = (size - new_w) // 2
         img = cv2.copyMakeBorder(
             img,
             top=border_v,
-            bottom=640 - new_h - border_v,
+            bottom=size - new_h - border_v,
             left=border_h,
-            right=640 - new_w - border_h,
+            right=size - new_w - border_h,
             borderType=cv2.BORDER_CONSTANT,
             value=(114, 114, 114)
         )
@@ -79,8 +444,9 @@ class Detector:
     
     @staticmethod
     def preprocess_image(img: np.ndarray) -> np.ndarray:
-        # Расширение до BHWC (добавление размерности batch)
-        img = img[np.newaxis, ...]  # (1, h, w, c)
+        # Расширение до BHWC (добавление размерности batch), если передан один кадр
+        if img.ndim == 3:
+            img = img[np.newaxis, ...]  # (1, h, w, c)
         
         # Транспонирование BHWC -> BCHW
         img = img.transpose((0, 3, 1, 2))  # (n, c, h, w)
@@ -91,47 +457,77 @@ class Detector:
         
         return img
     
+    def postprocess(self, outputs: np.ndarray, conf: float = 0.25, batch_index: int = 0) -> np.ndarray:
+        """
+        Детекции DETECTION_DTYPE из выхода модели: разбор готового выхода NMS
+        или векторизованная постобработка сырого выхода YOLO.
+        """
+        if self.embedded_nms:
+            return self.nms_output_to_detections(outputs, batch_index)
+        return self.postprocess_output(outputs, conf_thres=conf)
+
+    @staticmethod
+    def nms_output_to_detections(outputs: np.ndarray, batch_index: int = 0) -> np.ndarray:
+        """
+        Переводит выход встроенного NMS [M, 7] (batch, x1, y1, x2, y2, confidence, class_id),
+        уже отсортированный по уверенности, в массив DETECTION_DTYPE для одного кадра.
+        """
+        rows = outputs[outputs[:, 0] == batch_index]
+        detections = np.empty(len(rows), dtype=DETECTION_DTYPE)
+        detections["x1"], detections["y1"], detections["x2"], detections["y2"], detections["confidence"] = rows[:, 1:6].T
+        detections["class_id"] = rows[:, 6]
+        logger.debug(f"Найдено {len(detections)} объектов (NMS в графе)")
+        return detections
+
     @staticmethod
     def postprocess_output(
         outputs: np.ndarray, 
         conf_thres: float = 0.25,
-        iou_thres: float = 0.45
+        iou_thres: float = 0.45,
+        max_det: int = 300
     ) -> np.ndarray:
         """
-        Постобработка выходов модели YOLO для одного класса (индекс 0).
+        Векторизованная постобработка выходов модели YOLO.
+
+        Класс бокса - класс с наибольшей оценкой; NMS выполняется по классам,
+        так что телефон в руке не подавляет планшет под ним.
 
         Args:
-            outputs: Выход модели [batch, num_boxes, 4 + num_classes].
+            outputs: Выход модели [batch, 4 + num_classes, num_boxes].
             conf_thres: Порог уверенности.
             iou_thres: Порог IoU для NMS.
+            max_det: Максимальное число детекций после NMS.
 
         Returns:
-            Список детекций: [(x1, y1, x2, y2, confidence, class_id), ...].
-        """
-        boxes = outputs[0]  # [num_boxes, 5] (x, y, w, h, conf)
-        detections = []
-
-        for i in range(boxes.shape[-1]):
-            box = boxes[:, i]
-            x, y, w, h, conf = box[:5]
-            if conf > 1:
-                logger.debug("what!? conf more than 1?")
-            if conf < conf_thres:
-                continue
-
-            x1 = x - w / 2
-            y1 = y - h / 2
-            x2 = x + w / 2
-            y2 = y + h / 2
-            class_id = 0  # Один класс с индексом 0
-
-            detections.append((x1, y1, x2, y2, conf, class_id))
-
-        if detections:
-            boxes = np.array([[x1, y1, x2, y2] for x1, y1, x2, y2, _, _ in detections])
-            scores = np.array([conf for _, _, _, _, conf, _ in detections])
-            indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(), conf_thres, iou_thres)
-            detections = [detections[i] for i in indices.flatten()]
+            Структурированный массив DETECTION_DTYPE, отсортированный по уверенности:
+            [(x1, y1, x2, y2, confidence, class_id), ...]. Строки распаковываются
+            так же, как кортежи прежней реализации.
+        """
+        preds = outputs[0]  # [4 + num_classes, num_boxes] (x, y, w, h, оценки классов)
+        if preds.shape[0] == 5:
+            scores = preds[4]
+            class_ids = None
+        else:
+            class_ids = preds[4:].argmax(axis=0)
+            scores = np.take_along_axis(preds[4:], class_ids[np.newaxis], axis=0)[0]
+        mask = scores >= conf_thres
+        if not mask.any():
+            logger.debug("Найдено 0 объектов")
+            return np.empty(0, dtype=DETECTION_DTYPE)
+
+        x, y, w, h = preds[:4, mask]
+        scores = scores[mask]
+        boxes = np.stack((x - w / 2, y - h / 2, x + w / 2, y + h / 2), axis=1)
+        if class_ids is None:
+            keep = nms_boxes(boxes, scores, iou_thres, max_det)
+        else:
+            class_ids = class_ids[mask]
+            keep = nms_boxes(boxes + (class_ids * CLASS_OFFSET)[:, np.newaxis], scores, iou_thres, max_det)
+
+        detections = np.empty(keep.size, dtype=DETECTION_DTYPE)
+        detections["x1"], detections["y1"], detections["x2"], detections["y2"] = boxes[keep].T
+        detections["confidence"] = scores[keep]
+        detections["class_id"] = 0 if class_ids is None else class_ids[keep]
 
         logger.debug(f"Найдено {len(detections)} объектов")
         return detections
@@ -0,0 +1,319 @@
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import onnx
+import psutil
+
+from src.core.detector import DETECTION_DTYPE, Detections, Detector, resolve_model_path
+from src.core.preprocessing import LetterboxPreprocessor
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+# Заголовок слота (float64): номер запроса, conf, swap_rb, номер ответа, число детекций
+HEADER_FIELDS = 5
+REQ_SEQ, REQ_CONF, REQ_SWAP, RES_SEQ, RES_COUNT = range(5)
+# Детекций DETECTION_DTYPE в слоте после заголовка; лишние (наименее уверенные) отбрасываются
+MAX_RESULTS = 32
+
+
+class DetectorUnavailable(RuntimeError):
+    """Процесс детектора не обработал кадр (перезапуск, сбой или зависание)."""
+
+
+def model_input_size(model_path: str) -> int:
+    """Сторона квадратного входа модели по описанию графа (без создания сессии)."""
+    model = onnx.load(model_path, load_external_data=False)
+    initializers = {init.name for init in model.graph.initializer}
+    model_input = next(value for value in model.graph.input if value.name not in initializers)
+    tensor_type = model_input.type.tensor_type
+    dims = [dim.dim_value if dim.HasField("dim_value") else None for dim in tensor_type.shape.dim]
+    height = dims[1] if tensor_type.elem_type == onnx.TensorProto.UINT8 else dims[2]
+    return height or 640
+
+
+def _slot_layout(size: int):
+    """Размер слота и смещение заголовка в нём (выровнено на 8 байт); детекции - сразу за заголовком."""
+    frame_bytes = size * size * 3
+    header_offset = (frame_bytes + 7) // 8 * 8
+    return header_offset + HEADER_FIELDS * 8 + MAX_RESULTS * DETECTION_DTYPE.itemsize, header_offset
+
+
+def _slot_views(buffer, slots: int, size: int):
+    """Представления NumPy кадров, заголовков и детекций всех слотов поверх разделяемой памяти."""
+    slot_bytes, header_offset = _slot_layout(size)
+    frames, headers, results = [], [], []
+    for slot in range(slots):
+        base = slot * slot_bytes
+        frames.append(np.ndarray((size, size, 3), dtype=np.uint8, buffer=buffer, offset=base))
+        headers.append(np.ndarray((HEADER_FIELDS,), dtype=np.float64, buffer=buffer, offset=base + header_offset))
+        results.append(np.ndarray(
+            (MAX_RESULTS,), dtype=DETECTION_DTYPE, buffer=buffer, offset=base + header_offset + HEADER_FIELDS * 8
+        ))
+    return frames, headers, results
+
+
+def _worker_main(model_path, inference_config, shm_name, slots, size, pending, done, stop,
+                 ready, cold_ms, warm_ms, restart_after_requests, max_rss_mb) -> None:
+    """
+    Процесс детектора: по сигналу pending обрабатывает слоты с запросом
+    без ответа и пишет результат в заголовок того же слота.
+
+    Синхронизация только семафорами: в отличие от очередей и блокировок,
+    они не остаются захваченными, если процесс убит посреди операции.
+    """
+    detector = Detector(model_path, inference_config)
+    detector.warmup(runs=inference_config.get("warmup_runs", 3), frame_shape=(size, size, 3))
+    cold_ms.value = detector.cold_latency_ms or 0.0
+    warm_ms.value = detector.warm_latency_ms or 0.0
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames, headers, results = _slot_views(shm.buf, slots, size)
+    ready.set()
+    process = psutil.Process()
+    served = 0
+    try:
+        while not stop.value:
+            # Слоты просматриваются и по таймауту: сигнал, забранный убитым процессом, не теряет запрос
+            pending.acquire(timeout=0.5)
+            waiting = [slot for slot in range(slots) if headers[slot][REQ_SEQ] != headers[slot][RES_SEQ]]
+            for slot in sorted(waiting, key=lambda s: headers[s][REQ_SEQ]):
+                header = headers[slot]
+                seq = header[REQ_SEQ]
+                detections = detector.detect_phone(
+                    frames[slot], conf=float(header[REQ_CONF]), swap_rb=bool(header[REQ_SWAP])
+                ).array[:MAX_RESULTS]
+                results[slot][:len(detections)] = detections
+                header[RES_COUNT] = len(detections)
+                header[RES_SEQ] = seq  # номер ответа пишется последним
+                done[slot].release()
+                served += 1
+            # Плановый выход: сервис перезапустит процесс и освободит накопленную память
+            if restart_after_requests and served >= restart_after_requests:
+                break
+            if max_rss_mb and waiting and served % 100 < len(waiting) and process.memory_info().rss > max_rss_mb * 2 ** 20:
+                break
+    finally:
+        del frames, headers, results
+        shm.close()
+
+
+class DetectorClient:
+    """
+    Клиент DetectorService с интерфейсом Detector: letterbox выполняется
+    на своём холсте в процессе клиента, detect_phone передаёт холст через
+    слот разделяемой памяти и ждёт результат там же.
+
+    Каждая камера или сессия создаёт своего клиента; клиенты делят кольцо
+    слотов одного процесса детектора. Клиент можно передать в дочерний процесс.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, service_state: dict) -> None:
+        self._state = service_state
+        self.input_size = service_state["size"]
+        self.preprocessor = LetterboxPreprocessor(size=self.input_size)
+        # Номер запроса уникален среди клиентов: старшие разряды - номер клиента
+        self._seq = itertools.count((os.getpid() % 1024 * 1024 + next(self._ids)) << 24)
+        self._shm = None
+        self._frames = self._headers = self._results = None
+
+    def __getstate__(self):
+        return {"_state": self._state}
+
+    def __setstate__(self, state):
+        self.__init__(state["_state"])
+
+    def _attach(self) -> None:
+        if self._shm is None:
+            state = self._state
+            self._shm = shared_memory.SharedMemory(name=state["shm_name"])
+            self._frames, self._headers, self._results = _slot_views(self._shm.buf, state["slots"], state["size"])
+
+    @property
+    def cold_latency_ms(self):
+        return self._state["cold_ms"].value if self.is_warm() else None
+
+    @property
+    def warm_latency_ms(self):
+        return self._state["warm_ms"].value if self.is_warm() else None
+
+    def warmup(self, runs: int = 3, frame_shape=None) -> None:
+        """Прогрев делает процесс детектора; клиент только ждёт готовности."""
+        self.wait_warm(self._state["timeout"] * 10)
+
+    def is_warm(self) -> bool:
+        return self._state["ready"].is_set()
+
+    def wait_warm(self, timeout: float = None) -> bool:
+        return self._state["ready"].wait(timeout)
+
+    def begin_frame(self) -> None:
+        """Размер входа процесса детектора не меняется (см. AdaptiveDetector)."""
+
+    def letterbox(self, frame: np.ndarray):
+        return self.preprocessor.letterbox(frame)
+
+    def detect_phone(self, image, conf=0.5, swap_rb=False):
+        """
+        Детекция на кадре размера входа модели в процессе детектора.
+
+        Raises:
+            DetectorUnavailable: Нет свободного слота или процесс не ответил за timeout;
+                кадр не проверен, и пустой результат означал бы "телефона нет".
+        """
+        state = self._state
+        try:
+            self._attach()
+            slot = state["free_slots"].get(timeout=state["timeout"])
+        except (queue.Empty, FileNotFoundError) as e:
+            raise DetectorUnavailable(f"нет свободного слота детектора за {state['timeout']} с") from e
+        try:
+            seq = next(self._seq)
+            done = state["done"][slot]
+            while done.acquire(False):
+                pass  # сигналы запросов, брошенных по таймауту
+            header = self._headers[slot]
+            np.copyto(self._frames[slot], image[..., :3])
+            header[REQ_CONF], header[REQ_SWAP] = conf, swap_rb
+            header[REQ_SEQ] = seq  # номер запроса пишется последним
+            state["pending"].release()
+            deadline = time.monotonic() + state["timeout"]
+            while done.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                if header[RES_SEQ] == seq:
+                    # Копия: слот перезапишет следующий запрос
+                    return Detections(self._results[slot][:int(header[RES_COUNT])].copy())
+            raise DetectorUnavailable(f"процесс детектора не ответил за {state['timeout']} с")
+        finally:
+            state["free_slots"].put(slot)
+
+
+class DetectorService:
+    """
+    Detector в отдельном процессе.
+
+    Кадры и результаты передаются через кольцо слотов multiprocessing.shared_memory,
+    по очередям ходят только номера слотов. Инференс не делит GIL с потоками
+    журнала, уведомлений и камеры, а упавший или разросшийся процесс
+    перезапускается (ensure_alive) без остановки камеры.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        inference_config: dict = None,
+        slots: int = 4,
+        timeout: float = 2.0,
+        restart_after_requests: int = 0,
+        max_rss_mb: int = 0,
+    ) -> None:
+        """
+        :param model_path: Путь к модели ONNX
+        :param inference_config: Секция "inference" конфига (передаётся Detector в процессе)
+        :param slots: Число слотов кольца (одновременных запросов всех клиентов)
+        :param timeout: Ожидание свободного слота и ответа процесса, секунд
+        :param restart_after_requests: Перезапускать процесс после N запросов (0 - нет)
+        :param max_rss_mb: Перезапускать процесс, если его память превысила порог (0 - нет)
+        """
+        self.model_path = model_path
+        self.inference_config = dict(inference_config or {})
+        self.restart_after_requests = restart_after_requests
+        self.max_rss_mb = max_rss_mb
+        self.restarts = 0
+        size = model_input_size(resolve_model_path(model_path, self.inference_config.get("model_variant", "fp32")))
+        slot_bytes, _ = _slot_layout(size)
+        # spawn - как на Windows, где работает приложение
+        self._context = mp.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_bytes * slots)
+        self._state = {
+            "shm_name": self._shm.name,
+            "slots": slots,
+            "size": size,
+            "timeout": timeout,
+            "pending": self._context.Semaphore(0),
+            "free_slots": self._context.Queue(),
+            "done": [self._context.Semaphore(0) for _ in range(slots)],
+            "stop": self._context.Value("b", 0, lock=False),
+            "ready": self._context.Event(),
+            "cold_ms": self._context.Value("d", 0.0),
+            "warm_ms": self._context.Value("d", 0.0),
+        }
+        for slot in range(slots):
+            self._state["free_slots"].put(slot)
+        self._process = None
+        self._lock = threading.Lock()
+
+    @property
+    def input_size(self) -> int:
+        return self._state["size"]
+
+    def client(self) -> DetectorClient:
+        """Новый клиент для камеры или сессии."""
+        return DetectorClient(self._state)
+
+    def start(self) -> None:
+        state = self._state
+        state["ready"].clear()
+        state["stop"].value = 0
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(
+                self.model_path, self.inference_config, state["shm_name"], state["slots"], state["size"],
+                state["pending"], state["done"], state["stop"], state["ready"], state["cold_ms"], state["warm_ms"],
+                self.restart_after_requests, self.max_rss_mb,
+            ),
+            daemon=True,
+            name="detector service",
+        )
+        self._process.start()
+        logger.debug(f"Процесс детектора запущен: pid={self._process.pid}, слотов {state['slots']}, вход {state['size']}")
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def restart(self) -> None:
+        """Останавливает процесс (если жив) и запускает новый на том же кольце слотов."""
+        with self._lock:
+            if self._process is not None:
+                self._process.terminate()
+                self._process.join(5)
+            self.restarts += 1
+            self.start()
+
+    def wait_ready(self, timeout: float, step: float = 1.0) -> bool:
+        """
+        Ждёт прогрева процесса шагами по step секунд; процесс, завершившийся
+        до готовности (например, при ошибке загрузки модели), перезапускается.
+        Возвращает True, если процесс готов, и False, если не успел за timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while not self._state["ready"].wait(min(step, max(0.0, deadline - time.monotonic()))):
+            self.ensure_alive()
+            if time.monotonic() >= deadline:
+                return False
+        return True
+
+    def ensure_alive(self) -> bool:
+        """Перезапускает процесс, если он завершился; True, если был перезапуск."""
+        if self._process is None or self.is_alive():
+            return False
+        logger.warning(f"Процесс детектора завершился (код {self._process.exitcode}), перезапуск")
+        self.restart()
+        return True
+
+    def stop(self) -> None:
+        if self.is_alive():
+            self._state["stop"].value = 1
+            self._process.join(2)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._process = None
+        self._shm.close()
+        self._shm.unlink()
@@ -22,6 +22,8 @@ class Logger:
         # Словарь для преобразования событий в slug
         self.event_slugs = {
             "Обнаружен мобильный телефон": "phone_detected",
+            "Обнаружен планшет": "tablet_detected",
+            "Обнаружена камера": "camera_detected",
             "Однотонное изображение": "uniform_image",
             "После однотонного изображения": "after_uniform_image",
             "Потеря связи с камерой": "camera_lost",
@@ -29,6 +31,7 @@ class Logger:
             "Попытка закрыть приложение": "attempt_to_close",
             "Зависшее изображение": "static_img",
             "Изображение отвисло": "after_static_img",
+            "Детектор недоступен": "detector_unavailable",
         }
 
         try:
@@ -82,7 +85,9 @@ class Logger:
                     confidence TEXT,
                     active_apps TEXT,
                     username TEXT,
-                    device TEXT
+                    device TEXT,
+                    track_id INTEGER,
+                    detections_count INTEGER
                 )
             """)
             self.cursor.execute("PRAGMA table_info(logs)")
@@ -100,6 +105,12 @@ class Logger:
             if "device" not in columns:
                 self.cursor.execute("ALTER TABLE logs ADD COLUMN device TEXT")
                 logger.debug("Added device column")
+            if "track_id" not in columns:
+                self.cursor.execute("ALTER TABLE logs ADD COLUMN track_id INTEGER")
+                logger.debug("Added track_id column")
+            if "detections_count" not in columns:
+                self.cursor.execute("ALTER TABLE logs ADD COLUMN detections_count INTEGER")
+                logger.debug("Added detections_count column")
             self.conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Error creating/migrating table: {e}")
@@ -113,17 +124,17 @@ class Logger:
         while not self._stop_event.is_set():
             try:
                 task = self.queue.get(timeout=1.0)
-                timestamp, event, frame_path, screen_path, username, confidence, active_apps, device = task
+                timestamp, event, frame_path, screen_path, username, confidence, active_apps, device, track_id, detections_count = task
 
                 confidence_json = json.dumps(confidence) if confidence is not None else None
                 active_apps_json = json.dumps(active_apps) if active_apps is not None else None
 
-                logger.debug(f"Logging event: event={event}, frame_path={frame_path}, screen_path={screen_path}, confidence={confidence_json}, active_apps={active_apps_json}, username={username}, device={device}")
+                logger.debug(f"Logging event: event={event}, frame_path={frame_path}, screen_path={screen_path}, confidence={confidence_json}, active_apps={active_apps_json}, username={username}, device={device}, track_id={track_id}, detections_count={detections_count}")
 
                 try:
                     cursor.execute(
-                        "INSERT INTO logs (timestamp, event, frame_path, screen_path, confidence, active_apps, username, device) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                        (timestamp.replace("_", " "), event, frame_path, screen_path, confidence_json, active_apps_json, username, device)
+                        "INSERT INTO logs (timestamp, event, frame_path, screen_path, confidence, active_apps, username, device, track_id, detections_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (timestamp.replace("_", " "), event, frame_path, screen_path, confidence_json, active_apps_json, username, device, track_id, detections_count)
                     )
                     conn.commit()
                     logger.debug(f"Event successfully logged to database: id={cursor.lastrowid}, username={username} on device={device}")
@@ -144,9 +155,10 @@ class Logger:
     def log_event(
         self, event, frame, screen, username,
         timestamp: str, confidence=None, active_apps=None,
-        device: str = None):
+        device: str = None, track_id: int = None, detections_count: int = None):
         """
         Логирование события: сохраняет изображения на диск и передает задачу в очередь.
+        detections_count - число объектов в кадре для событий детекции.
         """
         logger.debug(f"Logging event={event}")
 
@@ -186,7 +198,7 @@ class Logger:
         # Помещаем задачу в очередь
         try:
             self.queue.put(
-                (timestamp, event, frame_path, screen_path, username, confidence, active_apps, device),
+                (timestamp, event, frame_path, screen_path, username, confidence, active_apps, device, track_id, detections_count),
                 timeout=2.0
             )
         except queue.Full:
@@ -213,7 +225,7 @@ class Logger:
             logs = cursor.fetchall()
             logger.debug(f"Loaded {len(logs)} logs from database")
             for log in logs:
-                logger.debug(f"Log: id={log[0]}, timestamp={log[1]}, event={log[2]}, frame_path={log[3]}, screen_path={log[4]}, confidence={log[5]}, active_apps={log[6]}, username={log[7]}, device={log[8]}")
+                logger.debug(f"Log: id={log[0]}, timestamp={log[1]}, event={log[2]}, frame_path={log[3]}, screen_path={log[4]}, confidence={log[5]}, active_apps={log[6]}, username={log[7]}, device={log[8]}, track_id={log[9]}, detections_count={log[10]}")
             return logs
         except sqlite3.Error as e:
             logger.error(f"Error reading logs from database: {e}")
@@ -0,0 +1,144 @@
+import logging
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+class MotionDetector:
+    """
+    Межкадровая разность на уменьшенной серой копии кадра.
+    Возвращает общий бокс области движения в координатах исходного кадра.
+    """
+
+    def __init__(self, width: int = 160, threshold: int = 25, min_area: float = 0.002) -> None:
+        """
+        :param width: Ширина уменьшенной копии кадра
+        :param threshold: Порог разности яркости (0–255)
+        :param min_area: Минимальная доля изменившихся пикселей, чтобы считать, что движение есть
+        """
+        self.width = width
+        self.threshold = threshold
+        self.min_area = min_area
+        self._previous: Optional[np.ndarray] = None
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """Уменьшенная размытая серая копия кадра."""
+        h, w = frame.shape[:2]
+        height = max(1, round(h * self.width / w))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def detect(self, frame: np.ndarray) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Сравнивает кадр с предыдущим.
+
+        Returns:
+            Бокс движения (x1, y1, x2, y2) в координатах кадра или None, если движения нет.
+        """
+        gray = self.thumbnail(frame)
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return None
+
+        _, mask = cv2.threshold(cv2.absdiff(gray, previous), self.threshold, 255, cv2.THRESH_BINARY)
+        if cv2.countNonZero(mask) < self.min_area * mask.size:
+            return None
+        mask = cv2.dilate(mask, None, iterations=2)
+        x, y, w, h = cv2.boundingRect(mask)
+        scale = frame.shape[1] / self.width
+        return x * scale, y * scale, (x + w) * scale, (y + h) * scale
+
+    def reset(self) -> None:
+        self._previous = None
+
+
+class MotionGate:
+    """
+    Пропуск инференса на неизменной сцене.
+
+    Миниатюра кадра сравнивается с миниатюрой кадра, на котором детектор
+    запускался в последний раз (а не с предыдущим кадром), поэтому медленные
+    изменения накапливаются и в итоге тоже открывают затвор. Пока сцена не
+    меняется, вызывающий берёт последний результат детектора (last_result).
+    Раз в max_skip_seconds инференс выполняется принудительно.
+    """
+
+    def __init__(
+        self,
+        thumbnail_width: int = 64,
+        threshold: int = 15,
+        min_area: float = 0.002,
+        max_skip_seconds: float = 5.0,
+    ) -> None:
+        """
+        :param thumbnail_width: Ширина серой миниатюры для сравнения
+        :param threshold: Порог разности яркости (0–255)
+        :param min_area: Доля изменившихся пикселей, при которой сцена считается изменившейся
+        :param max_skip_seconds: Не дольше стольких секунд подряд без инференса
+        """
+        self.max_skip_seconds = max_skip_seconds
+        self._motion = MotionDetector(width=thumbnail_width, threshold=threshold, min_area=min_area)
+        self._reference: Optional[np.ndarray] = None
+        self._reference_time = 0.0
+        # Миниатюра кадра, для которого запрошен инференс; опорной становится в update()
+        self._candidate: Optional[Tuple[np.ndarray, float]] = None
+        self.last_result = None
+        self.executed = 0
+        self.skipped = 0
+
+    def should_run(self, frame: np.ndarray, now: float = None) -> bool:
+        """
+        Нужно ли запускать детектор на кадре. При True результат инференса
+        передаётся в update(): только тогда кадр становится опорным. Если
+        детектор упал, опорным остаётся кадр, которому соответствует last_result.
+        """
+        now = time.monotonic() if now is None else now
+        gray = self.thumbnail(frame)
+        run = (
+            self._reference is None
+            or self.last_result is None
+            or gray.shape != self._reference.shape
+            or now - self._reference_time >= self.max_skip_seconds
+            or self._changed(gray)
+        )
+        if run:
+            self._candidate = (gray, now)
+        else:
+            self.skipped += 1
+        return run
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Миниатюра как у MotionDetector, но кадр сначала прореживается срезом:
+        INTER_AREA по полному кадру 1280x720 занимает больше миллисекунды.
+        """
+        step = max(1, frame.shape[1] // (2 * self._motion.width))
+        return self._motion.thumbnail(frame[::step, ::step])
+
+    def _changed(self, gray: np.ndarray) -> bool:
+        _, mask = cv2.threshold(cv2.absdiff(gray, self._reference), self._motion.threshold, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(mask) >= self._motion.min_area * mask.size
+
+    def update(self, result) -> None:
+        """Результат детектора на кадре из should_run; возвращается вместо пропущенных инференсов."""
+        if self._candidate is not None:
+            self._reference, self._reference_time = self._candidate
+            self._candidate = None
+        self.last_result = result
+        self.executed += 1
+
+    @property
+    def skip_ratio(self) -> float:
+        total = self.executed + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def reset(self) -> None:
+        self._reference = None
+        self._candidate = None
+        self.last_result = None
@@ -0,0 +1,197 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+class LatestQueue:
+    """
+    Ограниченная очередь передачи между стадиями: если она заполнена,
+    put() вытесняет самый старый элемент (побеждает свежий кадр),
+    поэтому медленная стадия не копит отставание.
+    """
+
+    def __init__(self, maxsize: int = 1) -> None:
+        self.maxsize = max(1, maxsize)
+        self._items = deque()
+        self._not_empty = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item) -> bool:
+        """Кладёт элемент; возвращает False, если ради него вытеснен старый."""
+        with self._not_empty:
+            evicted = len(self._items) >= self.maxsize
+            if evicted:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._not_empty.notify()
+            return not evicted
+
+    def get(self, timeout: float = None):
+        """Забирает самый старый элемент; queue.Empty, если за timeout ничего не пришло."""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+    def clear(self) -> None:
+        with self._not_empty:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class BlockingQueue(queue.Queue):
+    """
+    Ограниченная очередь без вытеснения: если она заполнена, put() ждёт,
+    пока стадия заберёт элемент. Для событий (блокировка, журнал,
+    оповещение), которые нельзя терять ради свежести.
+    """
+
+    dropped = 0
+
+    def put(self, item, block: bool = True, timeout: float = None) -> bool:
+        super().put(item, block, timeout)
+        return True
+
+    def __len__(self) -> int:
+        return self.qsize()
+
+
+class StageStats:
+    """Счётчики одной стадии: обработано элементов, занятое время, пропускная способность."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_processed = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.processed += 1
+            self._window_processed += 1
+            self.busy_seconds += seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Статистика с прошлого снимка: throughput - элементов в секунду,
+        mean_ms - среднее время обработки элемента за всё время.
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(now - self._window_start, 1e-9)
+            throughput = self._window_processed / elapsed
+            self._window_start, self._window_processed = now, 0
+            mean_ms = self.busy_seconds / self.processed * 1000 if self.processed else 0.0
+            return {"processed": self.processed, "throughput": throughput, "mean_ms": mean_ms}
+
+
+class Stage:
+    """
+    Стадия конвейера: поток, который берёт элементы из inbox, обрабатывает
+    handler и передаёт непустой результат в outbox следующей стадии.
+    """
+
+    def __init__(self, name: str, handler: Callable, inbox: LatestQueue, outbox: Optional[LatestQueue] = None) -> None:
+        self.name = name
+        self.handler = handler
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stats = StageStats(name)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"pipeline {self.name}")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self.inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                logger.warning(f"Ошибка на стадии {self.name}: {e}")
+                result = None
+            self.stats.record(time.perf_counter() - start)
+            if result is not None and self.outbox is not None:
+                self.outbox.put(result)
+
+
+class Pipeline:
+    """
+    Цепочка стадий, соединённых очередями LatestQueue (или BlockingQueue
+    для стадий, которые не должны терять элементы).
+
+    Источник (например, поток захвата кадров) вызывает submit() и сам
+    отмечает своё время через source_stats.record(); каждая стадия
+    работает в своём потоке, поэтому медленная стадия не останавливает
+    захват и проверки следующего кадра.
+    """
+
+    def __init__(self, source_name: str = "capture") -> None:
+        self.source_stats = StageStats(source_name)
+        self.stages: List[Stage] = []
+
+    def add_stage(self, name: str, handler: Callable, queue_size: int = 1, evict: bool = True) -> Stage:
+        """
+        Добавляет стадию после последней; queue_size - ёмкость её входной очереди.
+        evict=False - очередь BlockingQueue: предыдущая стадия ждёт места, а не вытесняет.
+        """
+        inbox = LatestQueue(queue_size) if evict else BlockingQueue(max(1, queue_size))
+        if self.stages:
+            self.stages[-1].outbox = inbox
+        stage = Stage(name, handler, inbox)
+        self.stages.append(stage)
+        return stage
+
+    def submit(self, item) -> bool:
+        """Передаёт элемент первой стадии; False, если вытеснен необработанный."""
+        return self.stages[0].inbox.put(item)
+
+    def start(self) -> None:
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        for stage in self.stages:
+            stage.stop(timeout)
+
+    def stats(self) -> List[Dict[str, object]]:
+        """Статистика по источнику и стадиям: пропускная способность, время, глубина очереди, вытеснения."""
+        rows = [{"stage": self.source_stats.name, **self.source_stats.snapshot(), "queue": 0, "dropped": 0}]
+        for stage in self.stages:
+            rows.append({
+                "stage": stage.name,
+                **stage.stats.snapshot(),
+                "queue": len(stage.inbox),
+                "dropped": stage.inbox.dropped,
+            })
+        return rows
+
+    def format_stats(self) -> str:
+        return "; ".join(
+            f"{row['stage']}: {row['throughput']:.1f}/с, {row['mean_ms']:.1f} мс, "
+            f"очередь {row['queue']}, вытеснено {row['dropped']}"
+            for row in self.stats()
+        )
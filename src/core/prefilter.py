@@ -0,0 +1,144 @@
+import logging
+import os
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def thumbnail(frame: np.ndarray, width: int, height: int, gray: bool = True) -> np.ndarray:
+    """
+    Миниатюра кадра размером width x height. Кадр сначала прореживается срезом,
+    чтобы INTER_AREA не обходил все пиксели полного кадра.
+    """
+    step = max(1, min(frame.shape[1] // (2 * width), frame.shape[0] // (2 * height)))
+    small = cv2.resize(frame[::step, ::step], (width, height), interpolation=cv2.INTER_AREA)
+    if gray and small.ndim == 3:
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small
+
+
+class HogPrefilter:
+    """
+    HOG на серой миниатюре кадра и логистическая регрессия.
+    Модель (models/prefilter.npz) обучается src.tools.train_prefilter.
+    """
+
+    def __init__(self, model_path: str) -> None:
+        data = np.load(model_path)
+        self.width, self.height = int(data["width"]), int(data["height"])
+        self.weights = data["weights"].astype(np.float32)
+        self.bias = float(data["bias"])
+        self.threshold = float(data["threshold"])
+        self.hog = self.create_hog(self.width, self.height)
+
+    @staticmethod
+    def create_hog(width: int, height: int) -> cv2.HOGDescriptor:
+        """HOG с ячейками 8x8 и блоками 16x16 на всё окно миниатюры."""
+        return cv2.HOGDescriptor((width, height), (16, 16), (8, 8), (8, 8), 9)
+
+    @staticmethod
+    def features(hog: cv2.HOGDescriptor, frame: np.ndarray) -> np.ndarray:
+        width, height = hog.winSize
+        return hog.compute(thumbnail(frame, width, height)).ravel()
+
+    def score(self, frame: np.ndarray) -> float:
+        """Вероятность того, что на кадре есть телефон."""
+        logit = float(self.features(self.hog, frame) @ self.weights) + self.bias
+        return 1.0 / (1.0 + np.exp(-logit))
+
+
+class OnnxPrefilter:
+    """
+    Маленький классификатор ONNX: вход [1, 3, H, W] float32 RGB в [0, 1],
+    выход - вероятность телефона. Порог берётся из метаданных модели
+    "prefilter_threshold" (по умолчанию 0.5).
+    """
+
+    def __init__(self, model_path: str) -> None:
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.height, self.width = model_input.shape[2], model_input.shape[3]
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.threshold = float(metadata.get("prefilter_threshold", 0.5))
+
+    def score(self, frame: np.ndarray) -> float:
+        small = thumbnail(frame, self.width, self.height, gray=False)
+        tensor = cv2.dnn.blobFromImage(small, 1 / 255.0, swapRB=True)
+        return float(np.max(self.session.run(None, {self.input_name: tensor})[0]))
+
+
+def load_prefilter(model_path: str):
+    """HogPrefilter для .npz, OnnxPrefilter для .onnx."""
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Модель предфильтра не найдена: {model_path}")
+    if model_path.endswith(".onnx"):
+        return OnnxPrefilter(model_path)
+    return HogPrefilter(model_path)
+
+
+class PrefilterCascade:
+    """
+    Первая ступень перед Detector: полный detect_phone запускается, только если
+    классификатор считает телефон возможным, если подошло время страховочного
+    полного прогона (safety_interval) или если детектор видел телефон на прошлом
+    запуске - тогда трек подтверждается без пропусков.
+    """
+
+    def __init__(self, classifier, safety_interval: float = 2.0) -> None:
+        """
+        :param classifier: HogPrefilter или OnnxPrefilter (см. load_prefilter)
+        :param safety_interval: Полный прогон детектора не реже раза в столько секунд
+        """
+        self.classifier = classifier
+        self.safety_interval = safety_interval
+        self._last_detect = float("-inf")
+        # Время запуска, разрешённого should_detect(); засчитывается в update()
+        self._pending_detect: Optional[float] = None
+        self._last_found = False
+        self.executed = 0  # запусков детектора всего
+        self.fired = 0  # из них по срабатыванию классификатора
+        self.safety_scans = 0  # из них страховочных
+        self.rejected = 0
+
+    def should_detect(self, frame: np.ndarray, now: float = None) -> bool:
+        """
+        Нужен ли полный прогон детектора. При True результат передаётся в
+        update(): если детектор упал, страховочный интервал не сбрасывается.
+        """
+        now = time.monotonic() if now is None else now
+        if self._last_found:
+            run = True
+        elif self.classifier.score(frame) >= self.classifier.threshold:
+            self.fired += 1
+            run = True
+        elif now - self._last_detect >= self.safety_interval:
+            self.safety_scans += 1
+            run = True
+        else:
+            self.rejected += 1
+            run = False
+        if run:
+            self._pending_detect = now
+        return run
+
+    def update(self, found: bool) -> None:
+        """Результат детектора после should_detect() == True."""
+        if self._pending_detect is not None:
+            self._last_detect = self._pending_detect
+            self._pending_detect = None
+        self._last_found = bool(found)
+        self.executed += 1
+
+    @property
+    def reject_ratio(self) -> float:
+        total = self.executed + self.rejected
+        return self.rejected / total if total else 0.0
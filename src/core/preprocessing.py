@@ -0,0 +1,165 @@
+import cv2
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+class LetterboxTransform:
+    """
+    Геометрия одного letterbox: как исходный кадр h x w вписан в холст.
+
+    Неизменяемый объект: его можно хранить вместе с детекцией, пока
+    препроцессор обрабатывает следующие кадры.
+    """
+
+    __slots__ = ("src_shape", "scale", "offset", "content_size", "size", "canvas_size")
+
+    def __init__(self, src_shape, scale: float, offset, content_size, size: int, canvas_size=None) -> None:
+        self.src_shape = tuple(src_shape)  # (h, w) исходного кадра
+        self.scale = scale
+        self.offset = tuple(offset)  # (left, top) кадра на холсте
+        self.content_size = tuple(content_size)  # (w, h) кадра на холсте
+        self.size = size
+        self.canvas_size = tuple(canvas_size or (size, size))  # (w, h) холста
+
+    @property
+    def content(self):
+        """Срезы (строки, столбцы) области холста с кадром, без серых полей."""
+        left, top = self.offset
+        new_w, new_h = self.content_size
+        return slice(top, top + new_h), slice(left, left + new_w)
+
+    def to_source(self, box):
+        """Переводит бокс (x1, y1, x2, y2) с холста в координаты исходного кадра."""
+        left, top = self.offset
+        return tuple(
+            (v - (left if i % 2 == 0 else top)) / self.scale for i, v in enumerate(box)
+        )
+
+    def to_source_int(self, box):
+        """to_source с округлением до целых пикселей и обрезкой по границам кадра."""
+        h, w = self.src_shape
+        x1, y1, x2, y2 = self.to_source(box)
+        return (
+            int(min(max(x1, 0), w)), int(min(max(y1, 0), h)),
+            int(min(max(x2, 0), w)), int(min(max(y2, 0), h)),
+        )
+
+    def to_canvas(self, box):
+        """Переводит бокс (x1, y1, x2, y2) из координат исходного кадра на холст."""
+        left, top = self.offset
+        return tuple(
+            v * self.scale + (left if i % 2 == 0 else top) for i, v in enumerate(box)
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"LetterboxTransform(src_shape={self.src_shape}, scale={self.scale:.4f}, "
+            f"offset={self.offset}, canvas_size={self.canvas_size})"
+        )
+
+
+class LetterboxPreprocessor:
+    """
+    Letterbox и нормализация кадра без выделения памяти на каждом кадре.
+
+    Кадр масштабируется прямо в область постоянного холста size x size с серыми
+    полями, а нормализованный тензор BCHW float32 пишется в постоянный входной буфер.
+    Холст и буфер перезаписываются следующим вызовом: тот, кому кадр нужен дольше
+    (или кто рисует на нём), должен сделать копию. Экземпляр не потокобезопасен.
+
+    С stride > 0 холст прямоугольный (для модели с динамическими H и W): длинная
+    сторона равна size, короткая - длине кадра на холсте, округлённой вверх до
+    кратного stride. Кадр 1280x720 даёт холст 640x384 вместо 640x640.
+    """
+
+    def __init__(self, size: int = 640, pad_value: int = 114, stride: int = 0) -> None:
+        self.size = size
+        self.pad_value = pad_value
+        self.stride = stride
+        self.canvas = np.full((size, size, 3), pad_value, dtype=np.uint8)
+        self.tensor = np.empty((1, 3, size, size), dtype=np.float32)
+        self._src_shape = None
+        self._dsize = (size, size)
+        self._roi = (slice(0, size), slice(0, size))
+        # Геометрия последнего letterbox
+        self.transform = LetterboxTransform((size, size), 1.0, (0, 0), (size, size), size)
+
+    def _set_geometry(self, h: int, w: int) -> None:
+        """Пересчитывает размер и положение кадра на холсте (как в Detector.prepreprocess)."""
+        if h > w:
+            new_h = self.size
+            new_w = int(w * self.size / h)
+        else:
+            new_w = self.size
+            new_h = int(h * self.size / w)
+        canvas_w = canvas_h = self.size
+        if self.stride:
+            canvas_w = -(-new_w // self.stride) * self.stride
+            canvas_h = -(-new_h // self.stride) * self.stride
+        top = (canvas_h - new_h) // 2
+        left = (canvas_w - new_w) // 2
+        self._src_shape = (h, w)
+        self._dsize = (new_w, new_h)
+        self.transform = LetterboxTransform(
+            (h, w), new_w / w if h <= w else new_h / h, (left, top), (new_w, new_h), self.size, (canvas_w, canvas_h)
+        )
+        self._roi = self.transform.content
+        if self.canvas.shape[:2] != (canvas_h, canvas_w):
+            self.canvas = np.empty((canvas_h, canvas_w, 3), dtype=np.uint8)
+        self.canvas.fill(self.pad_value)
+        logger.debug(f"Геометрия letterbox: {w}x{h} -> {new_w}x{new_h} на холсте {canvas_w}x{canvas_h}, отступы ({left}, {top})")
+
+    def letterbox(self, frame: np.ndarray):
+        """
+        Вписывает кадр в постоянный холст с сохранением пропорций.
+
+        Args:
+            frame: Кадр HWC uint8 (3 или 4 канала, 4-й отбрасывается).
+
+        Returns:
+            (холст size x size x 3 (с stride - прямоугольный) - общий буфер,
+            действителен до следующего вызова;
+            LetterboxTransform для перевода боксов обратно в координаты кадра).
+        """
+        if frame.shape[-1] == 4:
+            frame = frame[:, :, :3]
+        h, w = frame.shape[:2]
+        if (h, w) != self._src_shape:
+            self._set_geometry(h, w)
+        roi = self.canvas[self._roi]
+        if (w, h) == self._dsize:
+            np.copyto(roi, frame)
+        else:
+            resized = cv2.resize(frame, self._dsize, dst=roi, interpolation=cv2.INTER_LINEAR)
+            if resized is not roi:
+                # OpenCV не смог писать в область холста напрямую
+                np.copyto(roi, resized)
+        return self.canvas, self.transform
+
+    def to_tensor(self, image: np.ndarray, swap_rb: bool = False) -> np.ndarray:
+        """
+        Пишет нормализованный тензор BCHW float32 во входной буфер.
+
+        Args:
+            image: Кадр HWC uint8, уже приведённый к размеру входа модели.
+            swap_rb: Поменять местами каналы R и B (вместо отдельного cv2.cvtColor).
+
+        Returns:
+            Входной буфер (1, 3, h, w) (общий, действителен до следующего вызова).
+        """
+        h, w = image.shape[:2]
+        if self.tensor.shape[2:] != (h, w):
+            self.tensor = np.empty((1, 3, h, w), dtype=np.float32)
+        chw = image[:, :, :3].transpose(2, 0, 1)
+        if swap_rb:
+            chw = chw[::-1]
+        np.divide(chw, np.float32(255.0), out=self.tensor[0], dtype=np.float32)
+        return self.tensor
+
+    def __call__(self, frame: np.ndarray, swap_rb: bool = False) -> np.ndarray:
+        """Letterbox и нормализация за один вызов."""
+        canvas, _ = self.letterbox(frame)
+        return self.to_tensor(canvas, swap_rb=swap_rb)
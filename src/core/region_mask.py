@@ -0,0 +1,99 @@
+import logging
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+class RegionMask:
+    """
+    Зона интереса, заданная администратором (секция "roi_mask" конфига).
+
+    Многоугольники задаются в долях кадра [[x, y], ...], поэтому не зависят
+    от разрешения камеры; прямоугольник - многоугольник из четырёх точек.
+    include - области, где ищутся объекты (пусто - весь кадр), exclude -
+    области, которые детектор не видит (подставка, окно).
+
+    Кадр вырезается по ограничивающему прямоугольнику include, а пиксели вне
+    include и внутри exclude заливаются серым цветом полей letterbox: вход
+    модели тратится на нужную область, и объект в ней крупнее на холсте.
+    """
+
+    def __init__(self, include=(), exclude=(), pad_value: int = 114) -> None:
+        """
+        :param include: Многоугольники зоны интереса в долях кадра
+        :param exclude: Многоугольники исключённых зон в долях кадра
+        :param pad_value: Цвет заливки (как у полей letterbox)
+        """
+        self.include = [np.asarray(polygon, dtype=np.float64).reshape(-1, 2) for polygon in include if len(polygon) >= 3]
+        self.exclude = [np.asarray(polygon, dtype=np.float64).reshape(-1, 2) for polygon in exclude if len(polygon) >= 3]
+        self.pad_value = pad_value
+        self._shape = None
+        self._rect = None
+        self._mask = None
+        self._buffer = None
+
+    @staticmethod
+    def _to_pixels(polygon: np.ndarray, width: int, height: int) -> np.ndarray:
+        return np.round(polygon.clip(0, 1) * (width, height)).astype(np.int32)
+
+    def _build(self, shape) -> None:
+        """Прямоугольник вырезки, маска и буфер для кадра размера shape."""
+        h, w = shape[:2]
+        self._shape = shape
+        full = np.zeros((h, w), dtype=np.uint8)
+        if self.include:
+            cv2.fillPoly(full, [self._to_pixels(polygon, w, h) for polygon in self.include], 255)
+        else:
+            full[:] = 255
+        if self.exclude:
+            cv2.fillPoly(full, [self._to_pixels(polygon, w, h) for polygon in self.exclude], 0)
+        x, y, rect_w, rect_h = cv2.boundingRect(full)
+        if rect_w == 0 or rect_h == 0:
+            logger.warning("Зона интереса пуста (всё исключено), детекция идёт по всему кадру")
+            x, y, rect_w, rect_h = 0, 0, w, h
+            full[:] = 255
+        self._rect = (x, y, x + rect_w, y + rect_h)
+        mask = full[y:y + rect_h, x:x + rect_w]
+        if cv2.countNonZero(mask) == mask.size:
+            # Зона - прямоугольник без исключений: хватает среза без копии
+            self._mask = self._buffer = None
+        else:
+            self._mask = np.ascontiguousarray(mask)
+            # Пиксели вне маски не перезаписываются copyTo и остаются цвета полей
+            channels = shape[2:] if len(shape) > 2 else ()
+            self._buffer = np.full((rect_h, rect_w, *channels), self.pad_value, dtype=np.uint8)
+        logger.debug(f"Зона интереса для кадра {w}x{h}: вырезка {self._rect}, маска {'есть' if self._mask is not None else 'нет'}")
+
+    def apply(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Вырезка кадра по зоне интереса с залитыми исключёнными зонами.
+
+        Returns:
+            (изображение - срез кадра или постоянный буфер, перезаписываемый
+            следующим вызовом; (x, y) вырезки в кадре для перевода боксов).
+        """
+        if frame.shape != self._shape:
+            self._build(frame.shape)
+        x1, y1, x2, y2 = self._rect
+        crop = frame[y1:y2, x1:x2]
+        if self._mask is None:
+            return crop, (x1, y1)
+        cv2.copyTo(crop, self._mask, self._buffer)
+        return self._buffer, (x1, y1)
+
+    @property
+    def rect(self) -> Optional[Tuple[int, int, int, int]]:
+        """Прямоугольник вырезки (x1, y1, x2, y2) для последнего размера кадра."""
+        return self._rect
+
+    @property
+    def area_fraction(self) -> float:
+        """Доля площади кадра, которую получает детектор."""
+        if self._rect is None:
+            return 1.0
+        x1, y1, x2, y2 = self._rect
+        return (x2 - x1) * (y2 - y1) / (self._shape[0] * self._shape[1])
@@ -0,0 +1,135 @@
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.core.detector import Detections, Detector
+from src.core.motion import MotionDetector
+from src.core.preprocessing import LetterboxPreprocessor
+from src.core.tracking import IoUTracker
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+class RoiInference:
+    """
+    Режим инференса по области интереса.
+
+    Область складывается из прогнозов треков (IoUTracker) и бокса движения
+    (MotionDetector). Детектор запускается на увеличенном до входа модели
+    фрагменте исходного кадра, а полный кадр сканируется раз в
+    full_scan_interval кадров. Если ни треков, ни движения нет, инференс
+    до следующего полного сканирования пропускается.
+    """
+
+    def __init__(
+        self,
+        detector: Detector,
+        full_scan_interval: int = 10,
+        margin: float = 0.3,
+        min_roi_size: int = 320,
+        max_roi_fraction: float = 0.6,
+        motion_threshold: int = 25,
+        motion_min_area: float = 0.002,
+    ) -> None:
+        """
+        :param detector: Детектор, которым обрабатываются фрагменты и полные кадры
+        :param full_scan_interval: Через сколько кадров обязательно сканировать полный кадр
+        :param margin: Расширение боксов треков с каждой стороны (доля размера бокса)
+        :param min_roi_size: Минимальная сторона области в пикселях исходного кадра
+        :param max_roi_fraction: Доля площади кадра, выше которой выгоднее полный кадр
+        :param motion_threshold: Порог разности яркости для детектора движения
+        :param motion_min_area: Минимальная доля изменившихся пикселей
+        """
+        self.detector = detector
+        self.full_scan_interval = max(1, full_scan_interval)
+        self.margin = margin
+        self.min_roi_size = min_roi_size
+        self.max_roi_fraction = max_roi_fraction
+        self.tracker = IoUTracker()
+        self.motion = MotionDetector(threshold=motion_threshold, min_area=motion_min_area)
+        # Собственный холст, чтобы не затирать кадр основного цикла
+        self.preprocessor = LetterboxPreprocessor(size=detector.input_size, stride=detector.preprocessor.stride)
+        self.last_mode = "full"
+        self._frames_since_full = self.full_scan_interval
+
+    def _region(self, frame_shape, track_boxes: np.ndarray, motion_box) -> Optional[Tuple[int, int, int, int]]:
+        """Объединение прогнозов треков и движения, расширенное и обрезанное по кадру."""
+        h, w = frame_shape[:2]
+        boxes = [box for box in track_boxes]
+        if motion_box is not None:
+            boxes.append(np.asarray(motion_box))
+        if not boxes:
+            return None
+        boxes = np.stack(boxes)
+        bw, bh = boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]
+        x1 = (boxes[:, 0] - bw * self.margin).min()
+        y1 = (boxes[:, 1] - bh * self.margin).min()
+        x2 = (boxes[:, 2] + bw * self.margin).max()
+        y2 = (boxes[:, 3] + bh * self.margin).max()
+
+        # Не даём фрагменту быть слишком маленьким, чтобы не растягивать шум
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        half_w = max(x2 - x1, self.min_roi_size) / 2
+        half_h = max(y2 - y1, self.min_roi_size) / 2
+        x1, x2 = int(max(0, cx - half_w)), int(min(w, cx + half_w))
+        y1, y2 = int(max(0, cy - half_h)), int(min(h, cy + half_h))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2, y2
+
+    def detect(self, frame: np.ndarray, conf: float = 0.5, swap_rb: bool = False) -> Detections:
+        """
+        Детекция телефона на исходном кадре.
+
+        Args:
+            frame: Исходный кадр камеры (любое разрешение).
+            conf: Порог уверенности.
+            swap_rb: Передаётся в Detector.detect_phone.
+
+        Returns:
+            Detections в координатах кадра.
+        """
+        h, w = frame.shape[:2]
+        track_boxes = self.tracker.predict()
+        motion_box = self.motion.detect(frame)
+        self._frames_since_full += 1
+
+        region = None
+        if self._frames_since_full < self.full_scan_interval:
+            region = self._region(frame.shape, track_boxes, motion_box)
+            if region is None:
+                self.last_mode = "skip"
+                self.tracker.update([], [])
+                return Detections()
+            x1, y1, x2, y2 = region
+            if (x2 - x1) * (y2 - y1) > self.max_roi_fraction * w * h:
+                region = None
+
+        if region is None:
+            self.last_mode = "full"
+            self._frames_since_full = 0
+            region = (0, 0, w, h)
+        else:
+            self.last_mode = "roi"
+
+        x1, y1, x2, y2 = region
+        # Холст свой, поэтому смену варианта модели (AdaptiveDetector) запускаем сами
+        self.detector.begin_frame()
+        if (self.preprocessor.size, self.preprocessor.stride) != (self.detector.input_size, self.detector.preprocessor.stride):
+            # Детектор переключился на модель другого размера входа
+            self.preprocessor = LetterboxPreprocessor(
+                size=self.detector.input_size, stride=self.detector.preprocessor.stride
+            )
+        image, transform = self.preprocessor.letterbox(frame[y1:y2, x1:x2])
+        detections = self.detector.detect_phone(image, conf=conf, swap_rb=swap_rb)
+        if not detections.found:
+            self.tracker.update([], [])
+            return detections
+
+        detections = detections.to_source(transform, offset=(x1, y1))
+        # Область следующего кадра накрывает все найденные объекты
+        self.tracker.update(detections.boxes, detections.confs)
+        logger.debug(f"ROI-инференс ({self.last_mode}, область {region}): {detections}")
+        return detections
@@ -0,0 +1,97 @@
+import itertools
+import logging
+import os
+import platform
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+from src.core.detector import Detector
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def host_signature() -> str:
+    """Идентификатор хоста, для которого подобраны настройки инференса."""
+    return f"{platform.node()}|{platform.processor()}|{os.cpu_count()}|ort-{ort.__version__}"
+
+
+def needs_autotune(inference_config: dict) -> bool:
+    """Нужно ли запускать самобенчмарк при старте на этом хосте."""
+    # Перебираются настройки сессии ONNX Runtime, для других движков они не действуют
+    return bool(inference_config.get("autotune_on_start")) and \
+        inference_config.get("backend", "onnxruntime") == "onnxruntime" and \
+        inference_config.get("autotuned_for") != host_signature()
+
+
+def _candidate_configs(base_config: dict):
+    """Перебираемые комбинации настроек: потоки ORT, спиннинг и потоки OpenCV."""
+    cpu_count = os.cpu_count() or 1
+    thread_options = sorted({1, 2, max(1, cpu_count // 2), cpu_count} & set(range(1, cpu_count + 1)))
+    for intra, spinning, cv2_threads in itertools.product(thread_options, (True, False), (1, -1)):
+        config = dict(base_config)
+        config.update({
+            "intra_op_num_threads": intra,
+            "inter_op_num_threads": 1,
+            "execution_mode": "sequential",
+            "graph_optimization_level": "all",
+            "allow_spinning": spinning,
+            "cv2_num_threads": cv2_threads,
+        })
+        yield config
+
+
+def _measure_config(model_path: str, config: dict, frame: np.ndarray, runs: int, warmup: int) -> float:
+    """Медианное время кадра (letterbox + детекция) в мс для одной комбинации."""
+    detector = Detector(model_path, inference_config=config)
+    timings = []
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        image, _ = detector.letterbox(frame)
+        detector.detect_phone(image, swap_rb=True)
+        if i >= warmup:
+            timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def autotune_session(model_path: str, base_config: dict, runs: int = 10, warmup: int = 3) -> Optional[dict]:
+    """
+    Подбирает самую быструю комбинацию настроек сессии для текущего хоста.
+
+    Args:
+        model_path: Путь к модели ONNX.
+        base_config: Текущая секция "inference" конфига.
+        runs: Количество замеров на комбинацию.
+        warmup: Количество прогревочных прогонов на комбинацию.
+
+    Returns:
+        Новая секция "inference" с лучшими настройками и отметкой autotuned_for
+        или None, если ни одна комбинация не запустилась (отметка не ставится,
+        и подбор повторится при следующем запуске).
+    """
+    frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    default_cv2_threads = cv2.getNumThreads()
+    best_config, best_ms = dict(base_config), float("inf")
+    for config in _candidate_configs(base_config):
+        try:
+            latency_ms = _measure_config(model_path, config, frame, runs, warmup)
+        except Exception as e:
+            logger.warning(f"Комбинация {config} не запустилась: {e}")
+            continue
+        finally:
+            # Возвращаем настройку OpenCV, чтобы комбинации не влияли друг на друга
+            cv2.setNumThreads(default_cv2_threads)
+        logger.debug(f"Автоподбор: {config} -> {latency_ms:.2f} мс")
+        if latency_ms < best_ms:
+            best_config, best_ms = config, latency_ms
+
+    if best_ms == float("inf"):
+        logger.warning("Автоподбор настроек инференса: ни одна комбинация не запустилась")
+        return None
+    best_config["autotuned_for"] = host_signature()
+    logger.info(f"Автоподбор настроек инференса: {best_config}, {best_ms:.2f} мс/кадр")
+    return best_config
@@ -0,0 +1,220 @@
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Попарный IoU боксов (x1, y1, x2, y2).
+
+    Args:
+        boxes_a: Боксы [N, 4].
+        boxes_b: Боксы [M, 4].
+
+    Returns:
+        Матрица IoU [N, M].
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(1, -1, 4)
+    inter_w = (np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])).clip(0)
+    inter_h = (np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])).clip(0)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter + 1e-7)
+
+
+class Track:
+    """
+    Один трек с фильтром Калмана постоянной скорости по состоянию
+    (cx, cy, w, h, vx, vy, vw, vh). Шаг времени - один кадр детекции.
+    """
+
+    _ids = itertools.count(1)
+
+    # Матрица перехода и шумы процесса/измерения
+    _F = np.eye(8) + np.eye(8, k=4)
+    _Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.01, 0.01])
+    _R = np.diag([4.0, 4.0, 16.0, 16.0])
+
+    def __init__(self, box, score: float) -> None:
+        self.track_id = next(Track._ids)
+        self.x = np.zeros(8)
+        self.x[:4] = self._to_cxcywh(box)
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 1000.0, 1000.0])
+        self.score = float(score)
+        self.age = 0  # кадров с момента создания
+        self.hits = 1  # всего сопоставлений
+        self.hit_streak = 1  # сопоставлений подряд
+        self.missed = 0  # кадров подряд без сопоставления
+
+    @staticmethod
+    def _to_cxcywh(box) -> np.ndarray:
+        x1, y1, x2, y2 = box
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=np.float64)
+
+    @property
+    def box(self) -> np.ndarray:
+        """Текущая оценка бокса (x1, y1, x2, y2)."""
+        cx, cy, w, h = self.x[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+    def predict(self) -> np.ndarray:
+        """Прогноз положения на следующий кадр."""
+        self.x = self._F @ self.x
+        self.x[2:4] = self.x[2:4].clip(1.0)
+        self.P = self._F @ self.P @ self._F.T + self._Q
+        self.age += 1
+        self.missed += 1
+        if self.missed > 1:
+            self.hit_streak = 0
+        return self.box
+
+    def update(self, box, score: float) -> None:
+        """Коррекция состояния по сопоставленной детекции."""
+        residual = self._to_cxcywh(box) - self.x[:4]
+        S = self.P[:4, :4] + self._R
+        K = self.P[:, :4] @ np.linalg.inv(S)
+        self.x = self.x + K @ residual
+        self.P = self.P - K @ self.P[:4, :]
+        self.score = float(score)
+        self.hits += 1
+        self.hit_streak += 1
+        self.missed = 0
+
+
+class IoUTracker:
+    """
+    Лёгкий многообъектный трекер: прогноз треков фильтром Калмана
+    и жадное сопоставление с детекциями по IoU.
+
+    Порядок вызовов на кадр: predict() -> детекция -> update().
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 5) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks: List[Track] = []
+
+    def predict(self) -> np.ndarray:
+        """Сдвигает все треки на кадр вперёд и возвращает прогнозные боксы [N, 4]."""
+        if not self.tracks:
+            return np.empty((0, 4))
+        return np.stack([track.predict() for track in self.tracks])
+
+    def update(self, boxes, scores) -> List[Track]:
+        """
+        Сопоставляет детекции текущего кадра с треками.
+
+        Args:
+            boxes: Боксы детекций [M, 4] (x1, y1, x2, y2).
+            scores: Уверенности [M].
+
+        Returns:
+            Треки, обновлённые или созданные на этом кадре.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        matched: List[Track] = []
+        unmatched = set(range(len(boxes)))
+
+        if self.tracks and len(boxes):
+            ious = iou_matrix(np.stack([track.box for track in self.tracks]), boxes)
+            # Жадное сопоставление по убыванию IoU
+            for flat in np.argsort(ious, axis=None)[::-1]:
+                t, d = np.unravel_index(flat, ious.shape)
+                if ious[t, d] < self.iou_threshold:
+                    break
+                track = self.tracks[t]
+                if d not in unmatched or track in matched:
+                    continue
+                track.update(boxes[d], scores[d])
+                matched.append(track)
+                unmatched.discard(d)
+
+        for d in sorted(unmatched):
+            track = Track(boxes[d], scores[d])
+            self.tracks.append(track)
+            matched.append(track)
+            logger.debug(f"Новый трек {track.track_id}: {boxes[d]}")
+
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        return matched
+
+    def best(self) -> Optional[Track]:
+        """Трек, сопоставленный на последнем кадре, с наибольшей уверенностью."""
+        current = [track for track in self.tracks if track.missed == 0]
+        return max(current, key=lambda track: track.score) if current else None
+
+    def reset(self) -> None:
+        self.tracks = []
+
+
+class TrackManager(IoUTracker):
+    """
+    Трекер с подтверждением k-of-n.
+
+    Трек подтверждён, если он сопоставлен с детекцией хотя бы в confirm_hits
+    из последних confirm_window кадров и эти попадания уложились в
+    window_seconds. Один пропущенный кадр не сбрасывает подтверждение,
+    в отличие от счётчика подряд идущих кадров.
+    """
+
+    def __init__(
+        self,
+        confirm_hits: int = 2,
+        confirm_window: int = 3,
+        window_seconds: float = 10.0,
+        iou_threshold: float = 0.1,
+        max_missed: int = 3,
+    ) -> None:
+        super().__init__(iou_threshold=iou_threshold, max_missed=max_missed)
+        self.confirm_hits = max(1, confirm_hits)
+        self.confirm_window = max(self.confirm_hits, confirm_window)
+        self.window_seconds = window_seconds
+        # track_id -> последние confirm_window кадров: (время, было ли сопоставление)
+        self._history: Dict[int, deque] = {}
+
+    def step(self, boxes, scores, now: float = None) -> List[Track]:
+        """
+        Обрабатывает детекции очередного кадра.
+
+        Args:
+            boxes: Боксы детекций [M, 4] (x1, y1, x2, y2).
+            scores: Уверенности [M].
+            now: Время кадра (по умолчанию time.monotonic()).
+
+        Returns:
+            Подтверждённые треки, сопоставленные на этом кадре, по убыванию уверенности.
+        """
+        now = time.monotonic() if now is None else now
+        self.predict()
+        self.update(boxes, scores)
+
+        confirmed = []
+        for track in self.tracks:
+            history = self._history.setdefault(track.track_id, deque(maxlen=self.confirm_window))
+            history.append((now, track.missed == 0))
+            if track.missed == 0 and self.is_confirmed(track, now):
+                confirmed.append(track)
+        alive = {track.track_id for track in self.tracks}
+        self._history = {track_id: h for track_id, h in self._history.items() if track_id in alive}
+        return sorted(confirmed, key=lambda track: track.score, reverse=True)
+
+    def is_confirmed(self, track: Track, now: float = None) -> bool:
+        """Набрал ли трек confirm_hits попаданий в окне."""
+        now = time.monotonic() if now is None else now
+        history = self._history.get(track.track_id, ())
+        hits = sum(1 for t, hit in history if hit and now - t <= self.window_seconds)
+        return hits >= self.confirm_hits
+
+    def reset(self) -> None:
+        super().reset()
+        self._history = {}
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from typing import Tuple
+
+import numpy as np
+
+from src.core.detector import Detector
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+class Verifier:
+    """
+    Второе мнение по срабатыванию быстрого детектора.
+
+    Бокс кандидата расширяется на margin и вырезается из кадра камеры в
+    исходном разрешении; на вырезке запускается более крупная модель
+    (models/verifier.onnx, любой YOLO ONNX, который понимает Detector).
+    Кандидат подтверждён, если модель нашла объект класса кандидата с
+    уверенностью не ниже conf.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        inference_config: dict = None,
+        conf: float = 0.5,
+        margin: float = 0.5,
+        min_crop: int = 160,
+    ) -> None:
+        """
+        :param model_path: Путь к модели проверки
+        :param inference_config: Секция "inference" конфига (потоки, движок)
+        :param conf: Порог уверенности модели проверки
+        :param margin: Расширение бокса кандидата с каждой стороны (доля размера бокса)
+        :param min_crop: Минимальная сторона вырезки в пикселях кадра
+        """
+        # Варианты и автоподбор размера входа относятся к основной модели
+        self.detector = Detector(model_path, {**(inference_config or {}), "model_variant": "fp32"})
+        self.conf = conf
+        self.margin = margin
+        self.min_crop = min_crop
+        self.runs = 0
+        self.agreed = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def crop_region(self, frame_shape, bbox) -> Tuple[int, int, int, int]:
+        """Расширенный бокс кандидата; у края кадра окно сдвигается внутрь, а не обрезается."""
+        h, w = frame_shape[:2]
+        x1, y1, x2, y2 = bbox
+        crop_w = min(w, max((x2 - x1) * (1 + 2 * self.margin), self.min_crop))
+        crop_h = min(h, max((y2 - y1) * (1 + 2 * self.margin), self.min_crop))
+        left = int(np.clip((x1 + x2 - crop_w) / 2, 0, w - crop_w))
+        top = int(np.clip((y1 + y2 - crop_h) / 2, 0, h - crop_h))
+        return left, top, left + int(crop_w), top + int(crop_h)
+
+    def verify(self, frame: np.ndarray, bbox, class_id: int = 0, swap_rb: bool = False) -> Tuple[bool, float, float]:
+        """
+        Проверяет кандидата.
+
+        Args:
+            frame: Кадр камеры в исходном разрешении.
+            bbox: Бокс кандидата (x1, y1, x2, y2) в координатах кадра.
+            class_id: Класс кандидата; объект другого класса на вырезке не подтверждает его.
+            swap_rb: Передаётся в Detector.detect_phone.
+
+        Returns:
+            (подтверждён ли, уверенность модели проверки или 0, задержка в мс).
+        """
+        start = time.perf_counter()
+        x1, y1, x2, y2 = self.crop_region(frame.shape, bbox)
+        with self._lock:
+            image, _ = self.detector.letterbox(frame[y1:y2, x1:x2])
+            detections = self.detector.detect_phone(image, conf=self.conf, swap_rb=swap_rb)
+        latency_ms = (time.perf_counter() - start) * 1000
+        # Детекции отсортированы по уверенности: первая подходящая - самая уверенная
+        confs = detections.array["confidence"][detections.array["class_id"] == class_id]
+        found = len(confs) > 0
+        self.runs += 1
+        self.agreed += found
+        self.total_ms += latency_ms
+        return found, float(confs[0]) if found else 0.0, latency_ms
+
+    def warmup(self, runs: int = 3) -> None:
+        """Прогрев модели проверки, чтобы первая проверка не задержала блокировку."""
+        self.detector.warmup(runs=runs, frame_shape=(self.detector.input_size, self.detector.input_size, 3))
+
+    @property
+    def agreement_rate(self) -> float:
+        """Доля кандидатов быстрого детектора, подтверждённых проверкой."""
+        return self.agreed / self.runs if self.runs else 0.0
+
+    @property
+    def mean_latency_ms(self) -> float:
+        return self.total_ms / self.runs if self.runs else 0.0
@@ -0,0 +1,104 @@
+"""
+Сравнение движков инференса (ONNX Runtime, OpenCV DNN) на установленной модели
+и запись самого быстрого в config.json.
+
+Каждый движок прогоняет letterbox + detect_phone на одних и тех же кадрах.
+Движок, чьи детекции расходятся с ONNX Runtime, в выбор не попадает.
+
+Запуск из корня проекта:
+    python -m src.tools.benchmark_backends --model models/model.onnx
+
+Победитель записывается в "backend" секции "inference" config.json
+(--dry-run - только показать таблицу).
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+from src.core.backends import BACKENDS
+from src.core.config import Config
+from src.core.detector import Detector
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def _same_result(a, b, tolerance: float = 4.0) -> bool:
+    """Совпадают ли результаты detect_phone с точностью до tolerance пикселей."""
+    if a.found != b.found:
+        return False
+    return not a.found or np.abs(np.subtract(a.bbox, b.bbox)).max() <= tolerance
+
+
+def benchmark_backend(name: str, model_path: str, inference_config: dict, frames: list, runs: int, conf: float):
+    """
+    Замеряет один движок.
+
+    Returns:
+        (медиана мс, p90 мс, результаты detect_phone по кадрам) или None, если движок не поднялся.
+    """
+    try:
+        detector = Detector(model_path, inference_config={**inference_config, "backend": name})
+    except Exception as e:
+        print(f"{name}: недоступен ({e})")
+        return None
+    results = []
+    for frame in frames:
+        image, _ = detector.letterbox(frame)
+        results.append(detector.detect_phone(image, conf=conf, swap_rb=True))
+    timings = []
+    for i in range(runs):
+        image, _ = detector.letterbox(frames[i % len(frames)])
+        start = time.perf_counter()
+        detector.detect_phone(image, conf=conf, swap_rb=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), float(np.percentile(timings, 90)), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.path.join(BASE_PATH, "models", "model.onnx"))
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--dry-run", action="store_true", help="Не сохранять результат в config.json")
+    args = parser.parse_args()
+
+    config = Config()
+    inference_config = config.get("inference")
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) for _ in range(5)]
+
+    measured = {}
+    for name in BACKENDS:
+        result = benchmark_backend(name, args.model, inference_config, frames, args.runs, args.conf)
+        if result is not None:
+            measured[name] = result
+    if not measured:
+        raise SystemExit("Ни один движок не смог загрузить модель")
+
+    reference = measured.get("onnxruntime", next(iter(measured.values())))[2]
+    print(f"\n{'Движок':<12}  {'медиана, мс':>11}  {'p90, мс':>8}  совпадает с ORT")
+    candidates = {}
+    for name, (median_ms, p90_ms, results) in measured.items():
+        agrees = all(_same_result(a, b) for a, b in zip(results, reference))
+        print(f"{name:<12}  {median_ms:>11.2f}  {p90_ms:>8.2f}  {'да' if agrees else 'нет'}")
+        if agrees:
+            candidates[name] = median_ms
+
+    winner = min(candidates, key=candidates.get)
+    print(f"\nБыстрейший движок: {winner}")
+    if args.dry_run:
+        return
+    updated = config.config.copy()
+    updated["inference"] = {**inference_config, "backend": winner}
+    config.save_config(updated)
+    print(f"Записано в config.json: inference.backend = {winner}")
+
+
+if __name__ == "__main__":
+    main()
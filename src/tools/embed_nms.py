@@ -0,0 +1,167 @@
+"""
+Встраивание постобработки (NonMaxSuppression + TopK) в граф ONNX.
+
+После выхода YOLO [B, 4 + num_classes, N] добавляются выбор класса бокса
+(ReduceMax/ArgMax по оценкам классов, как в Detector.postprocess_output),
+NonMaxSuppression по наибольшей оценке (боксы в формате центр/размер, сдвинутые
+на CLASS_OFFSET * класс, чтобы боксы разных классов не подавляли друг друга),
+сбор выбранных боксов с переводом в (x1, y1, x2, y2) и TopK по уверенности.
+Модель возвращает не больше max_det итоговых детекций, по одной на бокс, и
+постобработка в Python сводится к разбору готового массива.
+
+Выход "detections" [M, 7]: (batch, x1, y1, x2, y2, confidence, class_id).
+Пороги уверенности и IoU - дополнительные входы модели "conf_threshold" и
+"iou_threshold" (float32 [1]), их передаёт Detector.
+
+Запуск из корня проекта:
+    python -m src.tools.embed_nms --model models/model.onnx
+
+Результат сохраняется в models/model_nms.onnx; чтобы детектор его использовал,
+установите "model_variant": "nms" в секции "inference" config.json. Инструмент
+можно применить и к модели со встроенной предобработкой (model_uint8.onnx ->
+model_uint8_nms.onnx, вариант "uint8_nms").
+"""
+import argparse
+import logging
+import os
+
+import numpy as np
+import onnx
+import onnxslim
+from onnx import TensorProto, helper, numpy_helper
+
+from src.core.detector import CLASS_OFFSET, Detector
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+# Ключ метаданных модели, по которому Detector узнаёт встроенный NMS
+METADATA_KEY = "embedded_nms"
+OUTPUT_NAME = "detections"
+CONF_INPUT = "conf_threshold"
+IOU_INPUT = "iou_threshold"
+
+
+def embed_nms(model: onnx.ModelProto, max_det: int = 300) -> onnx.ModelProto:
+    """
+    Добавляет выбор класса, NonMaxSuppression и TopK после выхода YOLO.
+
+    Args:
+        model: Модель с выходом [B, 4 + num_classes, N] (x, y, w, h, уверенности классов).
+        max_det: Максимальное число детекций на выходе.
+
+    Returns:
+        Изменённая модель (та же ModelProto).
+    """
+    graph = model.graph
+    raw = graph.output[0]
+    raw_name = raw.name
+    opset = next((o.version for o in model.opset_import if o.domain in ("", "ai.onnx")), 17)
+
+    def const(name, value, dtype=np.int64):
+        graph.initializer.append(numpy_helper.from_array(np.array(value, dtype=dtype), f"nms_{name}"))
+        return f"nms_{name}"
+
+    # Начиная с opset 18 оси ReduceMax передаются входом, а не атрибутом
+    if opset >= 18:
+        reduce_max = helper.make_node("ReduceMax", ["nms_scores", const("axes_class", [1])], ["nms_max_scores"], keepdims=1)
+    else:
+        reduce_max = helper.make_node("ReduceMax", ["nms_scores"], ["nms_max_scores"], axes=[1], keepdims=1)
+
+    nodes = [
+        # Боксы [B, N, 4] и уверенности классов [B, C, N]
+        helper.make_node("Slice", [raw_name, const("box_start", [0]), const("box_end", [4]), const("axis1", [1])], ["nms_xywh_t"]),
+        helper.make_node("Transpose", ["nms_xywh_t"], ["nms_xywh"], perm=[0, 2, 1]),
+        helper.make_node("Slice", [raw_name, const("score_start", [4]), const("score_end", [2 ** 62]), "nms_axis1"], ["nms_scores"]),
+        # Класс бокса - класс с наибольшей оценкой: [B, 1, N] оценок и [B, N] классов
+        reduce_max,
+        helper.make_node("ArgMax", ["nms_scores"], ["nms_class"], axis=1, keepdims=0),
+        # Центры боксов сдвигаются на CLASS_OFFSET * класс: NMS одного класса
+        # не подавляет боксы других классов
+        helper.make_node("Cast", ["nms_class"], ["nms_class_float"], to=TensorProto.FLOAT),
+        helper.make_node("Unsqueeze", ["nms_class_float", const("axis2", [2])], ["nms_class_col"]),
+        helper.make_node("Mul", ["nms_class_col", const("class_shift", [CLASS_OFFSET, CLASS_OFFSET, 0, 0], np.float32)], ["nms_shift"]),
+        helper.make_node("Add", ["nms_xywh", "nms_shift"], ["nms_xywh_shifted"]),
+        # Выбранные индексы [K, 3]: (batch, 0, box)
+        helper.make_node(
+            "NonMaxSuppression",
+            ["nms_xywh_shifted", "nms_max_scores", const("max_per_class", [max_det]), IOU_INPUT, CONF_INPUT],
+            ["nms_selected"],
+            center_point_box=1,
+        ),
+        helper.make_node("Gather", ["nms_selected", const("col_batch", 0)], ["nms_batch_idx"], axis=1),
+        helper.make_node("Slice", ["nms_selected", const("bb_start", [0]), const("bb_end", [1]), "nms_axis1"], ["nms_batch_col"]),
+        helper.make_node("Slice", ["nms_selected", const("box_col_start", [2]), const("box_col_end", [3]), "nms_axis1"], ["nms_box_col"]),
+        helper.make_node("Concat", ["nms_batch_col", "nms_box_col"], ["nms_batch_box"], axis=1),
+        # Несдвинутые боксы [K, 4] (x, y, w, h) -> (x1, y1, x2, y2), уверенности и классы [K]
+        helper.make_node("GatherND", ["nms_xywh", "nms_batch_box"], ["nms_sel_xywh"]),
+        helper.make_node("GatherND", ["nms_max_scores", "nms_selected"], ["nms_sel_scores"]),
+        helper.make_node("GatherND", ["nms_class", "nms_batch_box"], ["nms_class_idx"]),
+        helper.make_node("Split", ["nms_sel_xywh", const("split", [2, 2])], ["nms_xy", "nms_wh"], axis=1),
+        helper.make_node("Div", ["nms_wh", const("two", 2.0, np.float32)], ["nms_half_wh"]),
+        helper.make_node("Sub", ["nms_xy", "nms_half_wh"], ["nms_xy1"]),
+        helper.make_node("Add", ["nms_xy", "nms_half_wh"], ["nms_xy2"]),
+        # TopK: не больше max_det детекций по всем классам
+        helper.make_node("Shape", ["nms_sel_scores"], ["nms_count"]),
+        helper.make_node("Min", ["nms_count", const("max_det", [max_det])], ["nms_k"]),
+        helper.make_node("TopK", ["nms_sel_scores", "nms_k"], ["nms_top_scores", "nms_top_idx"], axis=0, largest=1, sorted=1),
+        helper.make_node("Unsqueeze", ["nms_batch_idx", "nms_axis1"], ["nms_batch_2d"]),
+        helper.make_node("Unsqueeze", ["nms_class_idx", "nms_axis1"], ["nms_class_2d"]),
+        helper.make_node("Unsqueeze", ["nms_sel_scores", "nms_axis1"], ["nms_scores_2d"]),
+        helper.make_node("Cast", ["nms_batch_2d"], ["nms_batch_f"], to=TensorProto.FLOAT),
+        helper.make_node("Cast", ["nms_class_2d"], ["nms_class_f"], to=TensorProto.FLOAT),
+        helper.make_node(
+            "Concat", ["nms_batch_f", "nms_xy1", "nms_xy2", "nms_scores_2d", "nms_class_f"], ["nms_all"], axis=1
+        ),
+        helper.make_node("Gather", ["nms_all", "nms_top_idx"], [OUTPUT_NAME], axis=0),
+    ]
+    graph.node.extend(nodes)
+    graph.input.append(helper.make_tensor_value_info(CONF_INPUT, TensorProto.FLOAT, [1]))
+    graph.input.append(helper.make_tensor_value_info(IOU_INPUT, TensorProto.FLOAT, [1]))
+    graph.output.remove(raw)
+    graph.output.append(helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.FLOAT, ["num_detections", 7]))
+    helper.set_model_props(model, {
+        **{prop.key: prop.value for prop in model.metadata_props},
+        METADATA_KEY: str(max_det),
+    })
+    onnx.checker.check_model(model)
+    return model
+
+
+def check_equivalence(model_path: str, output_path: str, conf: float = 0.25) -> bool:
+    """Совпадают ли детекции исходной модели с NumPy-постобработкой и новой модели."""
+    source = Detector(model_path)
+    embedded = Detector(output_path)
+    frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    expected = source.postprocess(source._run(source.make_input(source.letterbox(frame)[0], swap_rb=True), conf), conf)
+    actual = embedded.postprocess(embedded._run(embedded.make_input(embedded.letterbox(frame)[0], swap_rb=True), conf), conf)
+    print(f"Детекций: NumPy {len(expected)}, в графе {len(actual)}")
+    if len(expected) != len(actual):
+        return False
+    return all(
+        np.allclose(expected[field], actual[field], atol=1e-3)
+        for field in ("x1", "y1", "x2", "y2", "confidence")
+    ) and np.array_equal(expected["class_id"], actual["class_id"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--output", default=None, help="По умолчанию <model>_nms.onnx")
+    parser.add_argument("--max-det", type=int, default=300)
+    parser.add_argument("--no-slim", action="store_true", help="Не упрощать граф onnxslim")
+    args = parser.parse_args()
+
+    root, ext = os.path.splitext(args.model)
+    output_path = args.output or f"{root}_nms{ext}"
+
+    model = embed_nms(onnx.load(args.model), max_det=args.max_det)
+    if not args.no_slim:
+        model = onnxslim.slim(model)
+    onnx.save(model, output_path)
+    print(f"Сохранено: {output_path}")
+    print(f"Детекции совпадают с NumPy-постобработкой: {check_equivalence(args.model, output_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Встраивание предобработки кадра в граф ONNX.
+
+Перед входом модели добавляются узлы Transpose -> Slice (перестановка каналов) ->
+Cast -> Div, и модель принимает сырой кадр после letterbox: uint8
+[1, H, W, 3]. Детектор передаёт холст LetterboxPreprocessor без нормализации
+в NumPy, а приведение типа, транспонирование и деление выполняют ядра ORT.
+
+Запуск из корня проекта:
+    python -m src.tools.embed_preprocessing --model models/model.onnx
+
+Результат сохраняется в models/model_uint8.onnx; чтобы детектор его использовал,
+установите "model_variant": "uint8" в секции "inference" config.json.
+Квантизацию (quantize_model) нужно делать до встраивания, на float-модели.
+"""
+import argparse
+import logging
+import os
+
+import numpy as np
+import onnx
+import onnxslim
+from onnx import TensorProto, helper, numpy_helper
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+# Ключ метаданных модели, по которому Detector узнаёт встроенную предобработку
+METADATA_KEY = "embedded_preprocessing"
+
+
+def embed_preprocessing(model: onnx.ModelProto, swap_rb: bool = True) -> onnx.ModelProto:
+    """
+    Заменяет float-вход BCHW модели на uint8-вход BHWC с предобработкой в графе.
+
+    Args:
+        model: Исходная модель с входом [1, 3, H, W] float32.
+        swap_rb: Поменять местами каналы R и B (как detect_phone(swap_rb=True)).
+
+    Returns:
+        Изменённая модель (та же ModelProto).
+    """
+    graph = model.graph
+    old_input = graph.input[0]
+    if old_input.type.tensor_type.elem_type != TensorProto.FLOAT:
+        raise ValueError(f"Ожидался float-вход, получен {old_input.type}")
+    batch, _, height, width = [
+        dim.dim_value if dim.HasField("dim_value") else dim.dim_param
+        for dim in old_input.type.tensor_type.shape.dim
+    ]
+    name = old_input.name
+    new_input = helper.make_tensor_value_info(f"{name}_uint8", TensorProto.UINT8, [batch, height, width, 3])
+
+    # Транспонирование и перестановка каналов идут по uint8 (вчетверо меньше данных),
+    # а каналы переставляются срезом по оси C: Gather по последней оси HWC в ORT в разы медленнее
+    nodes = [helper.make_node("Transpose", [new_input.name], [f"{name}_chw"], perm=[0, 3, 1, 2])]
+    chw = f"{name}_chw"
+    if swap_rb:
+        for suffix, value in (("starts", -1), ("ends", -(2 ** 62)), ("axes", 1), ("steps", -1)):
+            graph.initializer.append(numpy_helper.from_array(np.array([value], dtype=np.int64), f"{name}_swap_{suffix}"))
+        nodes.append(helper.make_node(
+            "Slice",
+            [chw] + [f"{name}_swap_{suffix}" for suffix in ("starts", "ends", "axes", "steps")],
+            [f"{name}_swapped_chw"],
+        ))
+        chw = f"{name}_swapped_chw"
+    nodes.append(helper.make_node("Cast", [chw], [f"{name}_float_chw"], to=TensorProto.FLOAT))
+    graph.initializer.append(numpy_helper.from_array(np.array(255.0, dtype=np.float32), f"{name}_scale"))
+    # Выход Div получает имя старого входа, поэтому остальной граф не меняется
+    nodes.append(helper.make_node("Div", [f"{name}_float_chw", f"{name}_scale"], [name]))
+
+    graph.input.remove(old_input)
+    graph.input.insert(0, new_input)
+    for node in reversed(nodes):
+        graph.node.insert(0, node)
+    helper.set_model_props(model, {
+        **{prop.key: prop.value for prop in model.metadata_props},
+        METADATA_KEY: "swap_rb" if swap_rb else "none",
+    })
+    onnx.checker.check_model(model)
+    return model
+
+
+def check_equivalence(model_path: str, output_path: str, swap_rb: bool) -> float:
+    """Максимальное расхождение выходов исходной и новой модели на случайном кадре."""
+    from src.core.detector import Detector
+
+    source = Detector(model_path, inference_config={"use_io_binding": False})
+    embedded = Detector(output_path, inference_config={"use_io_binding": False})
+    frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    image, _ = source.letterbox(frame)
+    expected = source.backend.run(source.preprocessor.to_tensor(image, swap_rb=swap_rb))
+    actual = embedded.backend.run(image[np.newaxis])
+    return float(np.abs(expected - actual).max())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--output", default=None, help="По умолчанию <model>_uint8.onnx")
+    parser.add_argument("--no-swap-rb", action="store_true", help="Не переставлять каналы в графе")
+    parser.add_argument("--no-slim", action="store_true", help="Не упрощать граф onnxslim")
+    args = parser.parse_args()
+
+    root, ext = os.path.splitext(args.model)
+    output_path = args.output or f"{root}_uint8{ext}"
+    swap_rb = not args.no_swap_rb
+
+    model = embed_preprocessing(onnx.load(args.model), swap_rb=swap_rb)
+    if not args.no_slim:
+        model = onnxslim.slim(model)
+    onnx.save(model, output_path)
+    print(f"Сохранено: {output_path}")
+    print(f"Максимальное расхождение с исходной моделью: {check_equivalence(args.model, output_path, swap_rb):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Перевод модели на динамические высоту и ширину входа.
+
+Оси H и W входа и ось якорей выхода YOLO становятся символьными ("height",
+"width", "anchors"), сохранённые формы промежуточных тензоров удаляются.
+Detector распознаёт такую модель и подаёт ей прямоугольный холст, кратный
+шагу сетки (inference.rect_stride): кадр 16:9 даёт вход 640x384 вместо
+640x640, и серые поля letterbox не сворачиваются впустую.
+
+Запуск из корня проекта:
+    python -m src.tools.make_dynamic_shape --model models/model.onnx
+
+Результат сохраняется в models/model_dyn.onnx; чтобы детектор его использовал,
+установите "model_variant": "dyn" в секции "inference" config.json.
+
+Если в графе зашиты формы (например, Reshape с числом якорей для 640x640),
+прямоугольный вход не пройдёт проверку - тогда модель нужно заново
+экспортировать с динамическими осями (Ultralytics: yolo export format=onnx dynamic=True).
+"""
+import argparse
+import logging
+import os
+
+import numpy as np
+import onnx
+import onnxslim
+from onnx import TensorProto
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def make_dynamic_shape(model: onnx.ModelProto) -> onnx.ModelProto:
+    """
+    Делает оси H и W входа и ось якорей выхода символьными.
+
+    Args:
+        model: Модель с входом [B, 3, H, W] float (или [B, H, W, 3] uint8
+            со встроенной предобработкой) и выходом YOLO [B, 4 + C, N].
+
+    Returns:
+        Изменённая модель (та же ModelProto).
+    """
+    graph = model.graph
+    initializers = {init.name for init in graph.initializer}
+    model_input = next(value for value in graph.input if value.name not in initializers)
+    tensor_type = model_input.type.tensor_type
+    spatial = (1, 2) if tensor_type.elem_type == TensorProto.UINT8 else (2, 3)
+    for axis, name in zip(spatial, ("height", "width")):
+        tensor_type.shape.dim[axis].dim_param = name
+    for output in graph.output:
+        dims = output.type.tensor_type.shape.dim
+        if len(dims) == 3:
+            dims[2].dim_param = "anchors"
+    # Формы промежуточных тензоров были выведены для квадратного входа
+    del graph.value_info[:]
+    onnx.checker.check_model(model)
+    return model
+
+
+def check_rect_input(model_path: str, output_path: str, frame_shape=(720, 1280, 3)) -> bool:
+    """
+    Прогоняет кадр через исходную модель (квадратный холст) и новую
+    (прямоугольный холст). True, если новая модель приняла прямоугольный вход
+    и нашла то же, что исходная.
+    """
+    from src.core.detector import Detector
+
+    source = Detector(model_path)
+    dynamic = Detector(output_path)
+    frame = np.random.default_rng(0).integers(0, 256, frame_shape, dtype=np.uint8)
+    square, square_transform = source.letterbox(frame)
+    rect, rect_transform = dynamic.letterbox(frame)
+    try:
+        dynamic._run(dynamic.make_input(rect, swap_rb=True))
+    except Exception as e:
+        print(f"Прямоугольный вход {rect.shape[1]}x{rect.shape[0]} не прошёл: {e}")
+        return False
+    expected = source.detect_phone(square, conf=0.25, swap_rb=True)
+    actual = dynamic.detect_phone(rect, conf=0.25, swap_rb=True)
+    print(f"Холст: {square.shape[1]}x{square.shape[0]} -> {rect.shape[1]}x{rect.shape[0]}")
+    if expected.found != actual.found:
+        print(f"Решения расходятся: квадрат {expected.found}, прямоугольник {actual.found}")
+        return False
+    if expected.found:
+        # Разные холсты - разные входы сети, поэтому сравниваем боксы в координатах кадра
+        a = square_transform.to_source(expected.bbox)
+        b = rect_transform.to_source(actual.bbox)
+        print(f"Бокс в кадре: квадрат {tuple(round(v) for v in a)}, прямоугольник {tuple(round(v) for v in b)}")
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.onnx")
+    parser.add_argument("--output", default=None, help="По умолчанию <model>_dyn.onnx")
+    parser.add_argument("--no-slim", action="store_true", help="Не упрощать граф onnxslim")
+    args = parser.parse_args()
+
+    root, ext = os.path.splitext(args.model)
+    output_path = args.output or f"{root}_dyn{ext}"
+
+    model = make_dynamic_shape(onnx.load(args.model))
+    if not args.no_slim:
+        model = onnxslim.slim(model)
+    onnx.save(model, output_path)
+    print(f"Сохранено: {output_path}")
+    if not check_rect_input(args.model, output_path):
+        os.remove(output_path)
+        raise SystemExit(
+            "Граф не поддерживает прямоугольный вход; экспортируйте модель заново с динамическими осями"
+        )
+    print('Готово: "model_variant": "dyn" в секции "inference" config.json')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Профиль detect_phone по операторам ONNX Runtime и стадиям Python.
+
+Detector запускается с профилированием ORT (enable_profiling) на наборе кадров.
+Из JSON-трассировки собирается таблица операторов: суммарное и среднее время,
+доля от инференса, объём выходов и активаций. Отдельно замеряются стадии
+Python вокруг инференса (letterbox с cv2.resize, нормализация во входной
+тензор, postprocess, выбор бокса) и выделения памяти в них (tracemalloc).
+
+Запуск из корня проекта:
+    python -m src.tools.profile_model --model models/model.onnx --video desk.mp4
+
+Без --video и --logs используются синтетические кадры 1280x720. Трассировка
+сохраняется (--keep-trace) и открывается в chrome://tracing или Perfetto.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+
+from src.core.config import Config
+from src.core.detector import Detector
+from src.tools.train_prefilter import collect_frames
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+STAGES = ("letterbox", "make_input", "inference", "postprocess", "select")
+
+
+def profile_frames(detector: Detector, frames: list, conf: float, warmup: int = 3):
+    """
+    Прогоняет кадры по стадиям detect_phone с отдельными замерами.
+
+    Returns:
+        (время стадий в мс по кадрам {стадия: [мс]}, пик tracemalloc на стадию в байтах {стадия: [байт]}).
+    """
+    for frame in frames[:warmup]:
+        image, _ = detector.letterbox(frame)
+        detector.detect_phone(image, conf=conf, swap_rb=True)
+
+    timings = defaultdict(list)
+    allocations = defaultdict(list)
+
+    def stage(name, fn, *args, **kwargs):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[name].append((time.perf_counter() - start) * 1000)
+        allocations[name].append(tracemalloc.get_traced_memory()[1] - base)
+        return result
+
+    candidate_conf = detector._candidate_conf(conf)
+    tracemalloc.start()
+    try:
+        for frame in frames:
+            image, _ = stage("letterbox", detector.letterbox, frame)
+            input_data = stage("make_input", detector.make_input, image, swap_rb=True)
+            outputs = stage("inference", detector._run, input_data, candidate_conf)
+            detections = stage("postprocess", detector.postprocess, outputs, candidate_conf)
+            stage("select", detector._select_phone, detections, conf)
+    finally:
+        tracemalloc.stop()
+    return timings, allocations
+
+
+def parse_trace(trace_path: str, skip_runs: int = 0):
+    """
+    Разбирает трассировку ORT.
+
+    Args:
+        trace_path: JSON, который вернул session.end_profiling().
+        skip_runs: Сколько первых model_run (прогрев) не учитывать.
+
+    Returns:
+        (строки по операторам, отсортированные по суммарному времени; суммарное время model_run в мс).
+    """
+    with open(trace_path, encoding="utf-8") as f:
+        events = json.load(f)
+    runs = sorted((e for e in events if e.get("cat") == "Session" and e["name"] == "model_run"), key=lambda e: e["ts"])
+    runs = runs[skip_runs:]
+    if not runs:
+        return [], 0.0
+    first_ts = runs[0]["ts"]
+    run_ms = sum(e["dur"] for e in runs) / 1000
+
+    ops = defaultdict(lambda: {"calls": 0, "total_ms": 0.0, "output_mb": 0.0, "activation_mb": 0.0})
+    for e in events:
+        if e.get("cat") != "Node" or not e["name"].endswith("_kernel_time") or e["ts"] < first_ts:
+            continue
+        args = e.get("args", {})
+        row = ops[args.get("op_name", "?")]
+        row["calls"] += 1
+        row["total_ms"] += e["dur"] / 1000
+        row["output_mb"] += int(args.get("output_size", 0)) / 2 ** 20
+        row["activation_mb"] += int(args.get("activation_size", 0)) / 2 ** 20
+
+    kernel_ms = sum(row["total_ms"] for row in ops.values()) or 1.0
+    rows = [
+        {
+            "op": op,
+            "calls": row["calls"] // len(runs),
+            "ms_per_run": row["total_ms"] / len(runs),
+            "share": row["total_ms"] / kernel_ms,
+            "output_mb_per_run": row["output_mb"] / len(runs),
+            "activation_mb_per_run": row["activation_mb"] / len(runs),
+        }
+        for op, row in ops.items()
+    ]
+    return sorted(rows, key=lambda row: row["ms_per_run"], reverse=True), run_ms / len(runs)
+
+
+def print_rows(title: str, rows: list, columns: list) -> None:
+    print(f"\n{title}")
+    header = "  ".join(f"{name:>{width}}" if i else f"{name:<{width}}" for i, (name, width, _) in enumerate(columns))
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print("  ".join(
+            fmt.format(row[name]).rjust(width) if i else fmt.format(row[name]).ljust(width)
+            for i, (name, width, fmt) in enumerate(columns)
+        ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.path.join(BASE_PATH, "models", "model.onnx"))
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--logs", default=None)
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--top", type=int, default=15, help="Сколько операторов показать")
+    parser.add_argument("--keep-trace", default=None, help="Сохранить трассировку ORT в этот файл")
+    args = parser.parse_args()
+
+    frames = collect_frames(args.video, args.logs, every=1, limit=args.frames)
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) for _ in range(args.frames)]
+        print(f"Кадры не заданы, используются {len(frames)} синтетических 1280x720")
+
+    inference_config = Config().get("inference")
+    if inference_config.get("backend", "onnxruntime") != "onnxruntime":
+        print(f"Профилирование операторов есть только в ONNX Runtime; движок {inference_config['backend']} заменён")
+    trace_dir = tempfile.mkdtemp(prefix="profile_model_")
+    detector = Detector(args.model, inference_config={
+        **inference_config,
+        "backend": "onnxruntime",
+        "enable_profiling": True,
+        "profile_file_prefix": os.path.join(trace_dir, "ort"),
+    })
+    warmup = min(3, len(frames))
+    timings, allocations = profile_frames(detector, frames, args.conf, warmup=warmup)
+    trace_path = detector.backend.session.end_profiling()
+    if args.keep_trace:
+        os.replace(trace_path, args.keep_trace)
+        trace_path = args.keep_trace
+        print(f"Трассировка ORT: {trace_path}")
+
+    op_rows, run_ms = parse_trace(trace_path, skip_runs=warmup)
+    shutil.rmtree(trace_dir, ignore_errors=True)
+    print_rows(f"Операторы ONNX Runtime ({detector.model_path}, {len(frames)} кадров, на один прогон)", op_rows[:args.top], [
+        ("op", 24, "{}"), ("calls", 6, "{}"), ("ms_per_run", 10, "{:.3f}"), ("share", 6, "{:.1%}"),
+        ("output_mb_per_run", 17, "{:.2f}"), ("activation_mb_per_run", 21, "{:.2f}"),
+    ])
+    if len(op_rows) > args.top:
+        rest = sum(row["share"] for row in op_rows[args.top:])
+        print(f"... ещё {len(op_rows) - args.top} операторов, {rest:.1%} времени")
+
+    total_ms = sum(np.mean(timings[name]) for name in STAGES)
+    stage_rows = [
+        {
+            "stage": name,
+            "mean_ms": float(np.mean(timings[name])),
+            "p90_ms": float(np.percentile(timings[name], 90)),
+            "share": float(np.mean(timings[name])) / total_ms,
+            "alloc_kb": float(np.mean(allocations[name])) / 1024,
+        }
+        for name in STAGES
+    ]
+    print_rows("Стадии detect_phone (Python, на кадр)", stage_rows, [
+        ("stage", 12, "{}"), ("mean_ms", 8, "{:.3f}"), ("p90_ms", 8, "{:.3f}"), ("share", 6, "{:.1%}"),
+        ("alloc_kb", 9, "{:.1f}"),
+    ])
+    inference_ms = float(np.mean(timings["inference"]))
+    print(f"\nmodel_run в ORT: {run_ms:.3f} мс; накладные расходы вызова из Python: {inference_ms - run_ms:.3f} мс")
+    print(f"Предобработка и постобработка: {1 - inference_ms / total_ms:.1%} времени кадра")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Статическая INT8-квантизация (QDQ) модели с калибровкой на кадрах из logs/.
+
+Запуск из корня проекта:
+    python -m src.tools.quantize_model --model models/model.onnx --logs logs
+
+Результат сохраняется в models/model_int8.onnx; чтобы детектор его использовал,
+установите "model_variant": "int8" в секции "inference" config.json.
+"""
+import argparse
+import glob
+import logging
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from onnxruntime.quantization import (
+    CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quant_pre_process, quantize_static
+)
+
+from src.core.detector import Detector
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def find_log_frames(logs_dir: str, limit: int = 0) -> list:
+    """Кадры камеры, сохранённые Logger.log_event (снимки экрана пропускаются)."""
+    paths = sorted(
+        path for path in glob.glob(os.path.join(logs_dir, "*.jpg"))
+        if not path.endswith("_screen.jpg")
+    )
+    return paths[-limit:] if limit else paths
+
+
+def load_frame(path: str) -> np.ndarray:
+    """Загружает кадр и приводит его к виду, в котором его получает detect_phone."""
+    frame = cv2.imread(path)
+    if frame is None:
+        return None
+    # В основном цикле перед детекцией каналы меняются местами (см. _main_loop)
+    return cv2.cvtColor(Detector.prepreprocess(frame), cv2.COLOR_RGB2BGR)
+
+
+class LogFramesDataReader(CalibrationDataReader):
+    """Отдаёт калибровочные тензоры из кадров журнала событий."""
+
+    def __init__(self, paths: list, input_name: str) -> None:
+        self.paths = paths
+        self.input_name = input_name
+        self._iterator = iter(self.paths)
+
+    def get_next(self):
+        for path in self._iterator:
+            frame = load_frame(path)
+            if frame is not None:
+                return {self.input_name: Detector.preprocess_image(frame)}
+        return None
+
+    def rewind(self) -> None:
+        self._iterator = iter(self.paths)
+
+
+def quantize(model_path: str, output_path: str, paths: list, per_channel: bool = True) -> None:
+    """Квантизует модель в INT8 (QDQ) с калибровкой на переданных кадрах."""
+    input_name = Detector(model_path).input_name
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prepared_path = os.path.join(tmp_dir, "model_prepared.onnx")
+        quant_pre_process(model_path, prepared_path)
+        quantize_static(
+            prepared_path,
+            output_path,
+            LogFramesDataReader(paths, input_name),
+            quant_format=QuantFormat.QDQ,
+            per_channel=per_channel,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=CalibrationMethod.MinMax,
+        )
+
+
+def _box_iou(a, b) -> float:
+    inter_w = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    inter_h = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = inter_w * inter_h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def evaluate(detector: Detector, frames: list, conf: float) -> tuple:
+    """Прогоняет кадры через детектор, возвращает результаты и задержки в мс."""
+    results, timings = [], []
+    detector.detect_phone(frames[0], conf=conf)  # прогрев
+    for frame in frames:
+        start = time.perf_counter()
+        results.append(detector.detect_phone(frame, conf=conf))
+        timings.append((time.perf_counter() - start) * 1000)
+    return results, np.array(timings)
+
+
+def print_report(fp32_path: str, int8_path: str, paths: list, conf: float) -> None:
+    """Печатает сравнение задержки и точности INT8 относительно FP32."""
+    loaded = [(path, load_frame(path)) for path in paths]
+    loaded = [(path, frame) for path, frame in loaded if frame is not None]
+    if not loaded:
+        print("Нет кадров для оценки")
+        return
+    frames = [frame for _, frame in loaded]
+    is_phone_event = np.array([path.endswith("_phone_detected.jpg") for path, _ in loaded])
+
+    fp32_results, fp32_ms = evaluate(Detector(fp32_path), frames, conf)
+    int8_results, int8_ms = evaluate(Detector(int8_path), frames, conf)
+
+    fp32_found = np.array([result.found for result in fp32_results])
+    int8_found = np.array([result.found for result in int8_results])
+    both = [
+        (fp32.bbox, int8.bbox, fp32.confs[0], int8.confs[0])
+        for fp32, int8 in zip(fp32_results, int8_results) if fp32.found and int8.found
+    ]
+    mean_iou = np.mean([_box_iou(a, b) for a, b, _, _ in both]) if both else float("nan")
+    mean_conf_diff = np.mean([abs(ca - cb) for _, _, ca, cb in both]) if both else float("nan")
+
+    def phone_recall(found):
+        return found[is_phone_event].mean() if is_phone_event.any() else float("nan")
+
+    rows = [
+        ("Медиана задержки, мс", f"{np.median(fp32_ms):.2f}", f"{np.median(int8_ms):.2f}"),
+        ("p90 задержки, мс", f"{np.percentile(fp32_ms, 90):.2f}", f"{np.percentile(int8_ms, 90):.2f}"),
+        ("Кадров с телефоном", str(fp32_found.sum()), str(int8_found.sum())),
+        ("Полнота на событиях phone_detected", f"{phone_recall(fp32_found):.3f}", f"{phone_recall(int8_found):.3f}"),
+        ("Совпадение решений с FP32", "1.000", f"{(fp32_found == int8_found).mean():.3f}"),
+        ("Средний IoU бокса с FP32", "1.000", f"{mean_iou:.3f}"),
+        ("Среднее |Δconf| с FP32", "0.000", f"{mean_conf_diff:.3f}"),
+        ("Размер файла, МБ", f"{os.path.getsize(fp32_path) / 2**20:.1f}", f"{os.path.getsize(int8_path) / 2**20:.1f}"),
+    ]
+    print(f"\nОтчёт по {len(frames)} кадрам, conf={conf}")
+    width = max(len(name) for name, _, _ in rows)
+    print(f"{'Метрика'.ljust(width)}  {'FP32':>8}  {'INT8':>8}")
+    for name, fp32_value, int8_value in rows:
+        print(f"{name.ljust(width)}  {fp32_value:>8}  {int8_value:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.path.join(BASE_PATH, "models", "model.onnx"))
+    parser.add_argument("--output", default=None, help="По умолчанию <model>_int8.onnx")
+    parser.add_argument("--logs", default=os.path.join(BASE_PATH, "logs"))
+    parser.add_argument("--max-frames", type=int, default=300, help="0 - все кадры")
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--per-tensor", action="store_true", help="Квантизация весов по тензору, а не по каналам")
+    parser.add_argument("--report-only", action="store_true", help="Только сравнить уже готовую INT8-модель")
+    args = parser.parse_args()
+
+    output_path = args.output or "{}_int8{}".format(*os.path.splitext(args.model))
+    paths = find_log_frames(args.logs, args.max_frames)
+    if not paths:
+        raise SystemExit(f"В {args.logs} нет кадров для калибровки")
+
+    if not args.report_only:
+        print(f"Калибровка на {len(paths)} кадрах из {args.logs}...")
+        quantize(args.model, output_path, paths, per_channel=not args.per_tensor)
+        print(f"INT8-модель сохранена: {output_path}")
+    print_report(args.model, output_path, paths, args.conf)
+
+
+if __name__ == "__main__":
+    main()
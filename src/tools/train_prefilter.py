@@ -0,0 +1,135 @@
+"""
+Обучение предфильтра "телефон возможен": HOG на серой миниатюре кадра и
+логистическая регрессия. Разметку делает основной детектор (Detector).
+
+Кадры берутся из записи камеры (--video, каждый --every-й кадр) и/или из logs/.
+На сохранённых кадрах phone_detected нарисован бокс - по возможности учите
+на записи камеры, иначе классификатор может выучить рамку.
+
+Запуск из корня проекта:
+    python -m src.tools.train_prefilter --video desk.mp4 --model models/model.onnx
+
+Классификатор учится на 80% кадров, порог выбирается по всем кадрам
+с телефоном так, чтобы полнота была не ниже --target-recall. Результат -
+models/prefilter.npz; включение: "enabled": true в секции "prefilter"
+config.json. Полнота на новых кадрах проверяется benchmarks.bench_prefilter.
+"""
+import argparse
+import logging
+import os
+
+import cv2
+import numpy as np
+from scipy.optimize import minimize
+
+from src.core.detector import Detector
+from src.core.prefilter import HogPrefilter
+from src.tools.quantize_model import find_log_frames
+
+logging.basicConfig(level=logging.CRITICAL+1, format='%(asctime)s %(levelname)s:%(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def collect_frames(video: str = None, logs_dir: str = None, every: int = 10, limit: int = 0) -> list:
+    """Кадры камеры (BGR, как их получает приложение) из записи и журнала."""
+    frames = []
+    if video:
+        capture = cv2.VideoCapture(video)
+        index = 0
+        while not limit or len(frames) < limit:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if index % every == 0:
+                frames.append(frame)
+            index += 1
+        capture.release()
+    if logs_dir and os.path.isdir(logs_dir):
+        for path in find_log_frames(logs_dir, limit):
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+    return frames[:limit] if limit else frames
+
+
+def label_frames(detector: Detector, frames: list, conf: float) -> np.ndarray:
+    """Разметка детектором: True, если на кадре найден телефон."""
+    labels = []
+    for frame in frames:
+        image, _ = detector.letterbox(frame)
+        labels.append(detector.detect_phone(image, conf=conf, swap_rb=True).found)
+    return np.array(labels, dtype=bool)
+
+
+def fit_logistic(features: np.ndarray, labels: np.ndarray, l2: float = 1.0):
+    """Логистическая регрессия с весами классов (классы несбалансированы) и L2."""
+    y = labels.astype(np.float64)
+    positive = max(y.sum(), 1.0)
+    negative = max(len(y) - y.sum(), 1.0)
+    sample_weight = np.where(labels, len(y) / (2 * positive), len(y) / (2 * negative))
+
+    def loss(params):
+        w, b = params[:-1], params[-1]
+        z = features @ w + b
+        # log(1 + e^z) - y*z в устойчивой форме
+        per_sample = np.logaddexp(0, z) - y * z
+        p = 1.0 / (1.0 + np.exp(-z))
+        grad_z = sample_weight * (p - y) / len(y)
+        value = (sample_weight * per_sample).mean() + 0.5 * l2 * w @ w / len(y)
+        grad = np.append(features.T @ grad_z + l2 * w / len(y), grad_z.sum())
+        return value, grad
+
+    result = minimize(loss, np.zeros(features.shape[1] + 1), jac=True, method="L-BFGS-B", options={"maxiter": 500})
+    return result.x[:-1], float(result.x[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.path.join(BASE_PATH, "models", "model.onnx"))
+    parser.add_argument("--video", default=None, help="Запись камеры")
+    parser.add_argument("--logs", default=os.path.join(BASE_PATH, "logs"))
+    parser.add_argument("--every", type=int, default=10, help="Брать каждый N-й кадр записи")
+    parser.add_argument("--max-frames", type=int, default=3000, help="0 - все кадры")
+    parser.add_argument("--output", default=os.path.join(BASE_PATH, "models", "prefilter.npz"))
+    parser.add_argument("--width", type=int, default=128)
+    parser.add_argument("--height", type=int, default=72)
+    parser.add_argument("--conf", type=float, default=0.25, help="Порог детектора при разметке (ниже рабочего - запас полноты)")
+    parser.add_argument("--target-recall", type=float, default=1.0)
+    parser.add_argument("--l2", type=float, default=1.0)
+    args = parser.parse_args()
+
+    frames = collect_frames(args.video, args.logs, args.every, args.max_frames)
+    if not frames:
+        raise SystemExit("Нет кадров для обучения: укажите --video или --logs")
+    labels = label_frames(Detector(args.model), frames, args.conf)
+    print(f"Кадров: {len(frames)}, с телефоном: {labels.sum()}")
+    if labels.sum() < 2 or labels.all():
+        raise SystemExit("Нужны кадры и с телефоном, и без него")
+
+    hog = HogPrefilter.create_hog(args.width, args.height)
+    features = np.stack([HogPrefilter.features(hog, frame) for frame in frames]).astype(np.float64)
+
+    rng = np.random.default_rng(0)
+    is_val = rng.random(len(frames)) < 0.2
+    weights, bias = fit_logistic(features[~is_val], labels[~is_val], args.l2)
+    scores = 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+
+    # Порог по всем кадрам с телефоном: пропуск телефона дороже лишнего прогона детектора
+    threshold = float(np.quantile(scores[labels], 1.0 - args.target_recall, method="lower"))
+    fired = scores >= threshold
+    print(f"Порог: {threshold:.4f}")
+    print(f"Полнота на кадрах с телефоном: {fired[labels].mean():.3f} (отложенные: {fired[labels & is_val].mean():.3f})")
+    print(f"Доля отсеянных кадров без телефона: {(~fired[~labels]).mean():.3f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    np.savez(
+        args.output, weights=weights.astype(np.float32), bias=bias, threshold=threshold,
+        width=args.width, height=args.height,
+    )
+    print(f"Предфильтр сохранён: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,18 @@ import threading
 
 import platform
 import getpass
-from src.core.detector import Detector
+from src.core.detector import Detections, Detector
+from src.core.adaptive_detector import AdaptiveDetector
+from src.core.detector_service import DetectorService, DetectorUnavailable
+from src.core.session_tuning import autotune_session, needs_autotune
+from src.core.roi_inference import RoiInference
+from src.core.region_mask import RegionMask
+from src.core.motion import MotionGate
+from src.core.prefilter import PrefilterCascade, load_prefilter
+from src.core.verifier import Verifier
+from src.core.tracking import TrackManager
+from src.core.pipeline import Pipeline
+from src.core.preprocessing import LetterboxPreprocessor
 from src.core.lock_screen import lock_screen, is_screen_locked, wait_for_unlock
 from src.core.logger import Logger
 from src.core.config import Config
@@ -224,13 +235,94 @@ class ApplicationController:
             self.camera_id = self.config.get("camera_id")
             self.confidence_threshold = self.config.get("confidence_threshold")
             self.min_step_time = 0.5 / self.fps
-            self.detector = Detector(model_path=model_path)
+            self.model_path = model_path
+            inference_config = self.config.get("inference")
+            # Отслеживаемые классы модели: номер -> событие и его правила (один прогон на все классы)
+            self.detection_classes = {
+                int(class_id): rules
+                for class_id, rules in self.config.get("detection_classes").items()
+                if rules["enabled"]
+            }
+            inference_config = {
+                **inference_config,
+                "classes": {class_id: rules["confidence"] for class_id, rules in self.detection_classes.items()},
+            }
+            service_config = dict(self.config.get("detector_service"))
+            self.detector_startup_timeout = service_config.pop("startup_timeout")
+            self.detector_unavailable_seconds = service_config.pop("unavailable_seconds")
+            # Начало текущего перебоя детектора (monotonic) и отправлено ли по нему событие
+            self._detector_down_since = None
+            self._detector_down_reported = False
+            if service_config.pop("enabled"):
+                # Инференс в отдельном процессе; self.detector - клиент с тем же интерфейсом
+                if inference_config.get("latency_budget_ms"):
+                    logger.warning("latency_budget_ms не используется, когда детектор работает в отдельном процессе")
+                self.detector_service = DetectorService(model_path, inference_config, **service_config)
+                self.detector = self.detector_service.client()
+            elif inference_config.get("latency_budget_ms"):
+                self.detector_service = None
+                self.detector = AdaptiveDetector(
+                    model_path,
+                    inference_config,
+                    latency_budget_ms=inference_config["latency_budget_ms"],
+                    sizes=inference_config["model_sizes"],
+                    recheck_seconds=inference_config["latency_recheck_seconds"],
+                )
+            else:
+                self.detector_service = None
+                self.detector = Detector(model_path=model_path, inference_config=inference_config)
+            # Свой трекер на класс: телефон не продолжает трек планшета
+            self.track_managers = {
+                class_id: TrackManager(confirm_hits=self.phone_limit, **self.config.get("tracking"))
+                for class_id in self.detection_classes
+            }
+            verifier_config = dict(self.config.get("verifier"))
+            self.verifier = None
+            if verifier_config.pop("enabled"):
+                # Путь модели проверки - относительно папки основной модели
+                verifier_path = os.path.join(os.path.dirname(model_path), verifier_config.pop("model"))
+                self.verifier_retry_seconds = verifier_config.pop("retry_seconds")
+                self.verifier = Verifier(verifier_path, inference_config, **verifier_config)
+            # track_id -> уверенность модели проверки для подтверждённых ею треков
+            self._verified_tracks = {}
+            # track_id -> время (monotonic) последнего отказа модели проверки
+            self._rejected_tracks = {}
+            mask_config = self.config.get("roi_mask")
+            self.region_mask = None
+            if mask_config["enabled"]:
+                self.region_mask = RegionMask(mask_config["include"], mask_config["exclude"])
+            roi_config = dict(self.config.get("roi_inference"))
+            self.roi_inference = RoiInference(self.detector, **roi_config) if roi_config.pop("enabled") else None
+            gate_config = dict(self.config.get("motion_gate"))
+            self.motion_gate = MotionGate(**gate_config) if gate_config.pop("enabled") else None
+            prefilter_config = self.config.get("prefilter")
+            self.prefilter = None
+            if prefilter_config["enabled"]:
+                # Путь модели предфильтра - относительно папки основной модели
+                prefilter_path = os.path.join(os.path.dirname(model_path), prefilter_config["model"])
+                self.prefilter = PrefilterCascade(
+                    load_prefilter(prefilter_path),
+                    safety_interval=prefilter_config["safety_interval"],
+                )
             self.camera = CameraStream(
                 source=self.camera_id,
                 warmup_seconds=2,
                 max_fps=self.fps,
             )
             set_admin_only_access("logs")
+            # Захват и проверки кадра идут в _main_loop, детекция и реакция на события -
+            # в отдельных стадиях, чтобы медленная стадия не задерживала остальные
+            pipeline_config = self.config.get("pipeline")
+            self.stats_interval = pipeline_config["stats_interval"]
+            self.pipeline = Pipeline(source_name="capture")
+            self.pipeline.add_stage("inference", self._inference_stage, queue_size=1)
+            # События не вытесняются: при полной очереди инференс и захват ждут стадию реакции
+            self.pipeline.add_stage(
+                "actions", self._action_stage, queue_size=pipeline_config["action_queue_size"], evict=False
+            )
+            # Собственный холст для сравнения кадров: холст детектора занят стадией инференса
+            self.similarity_preprocessor = LetterboxPreprocessor(size=self.detector.input_size)
+            self._last_lock_done = 0.0
             self._loop_thread = threading.Thread(target=self._main_loop, daemon=True)
             self._stop_event = threading.Event()
             signal.signal(signal.SIGTERM, self.handle_termination)
@@ -264,8 +356,9 @@ class ApplicationController:
         notifications_enabled: bool,
         log_enable: bool,
         lock_enable: bool,
-        bbox=None, confs=None,
+        detections: Detections = None,
         notification_data: dict = {},
+        track_id: int = None,
     ) -> None:
         logger.debug(event)
         active_apps = get_active_apps()
@@ -277,13 +370,23 @@ class ApplicationController:
         timestamp = str(datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
         
         logger.debug("before log enable")
-        if frame is not None and bbox is not None and event == "Обнаружен мобильный телефон":
-            x1, y1, x2, y2 = bbox
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(frame, "Phone", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        # frame - собственный кадр камеры в исходном разрешении (CameraStream.get_frame
+        # отдаёт копию), поэтому рамки всех найденных объектов рисуются прямо на нём
+        if frame is not None and detections is not None:
+            for (x1, y1, x2, y2), class_id, conf in zip(
+                detections.boxes.tolist(), detections.array["class_id"].tolist(), detections.confs
+            ):
+                label = self.detection_classes[class_id]["label"]
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                cv2.putText(frame, f"{label} {conf:.2f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        confs = detections.confs if detections is not None else None
+        detections_count = detections.count if detections is not None else None
         if log_enable:
             logger.debug("log_enable - true")
-            self.logger.log_event(event, frame, screen, username, timestamp, confs, active_apps=active_apps, device=pc_name)
+            self.logger.log_event(
+                event, frame, screen, username, timestamp, confs, active_apps=active_apps,
+                device=pc_name, track_id=track_id, detections_count=detections_count,
+            )
         else:
             logger.debug("log_enable - false")
         
@@ -317,6 +420,24 @@ class ApplicationController:
             
     def start(self) -> None:
         logger.debug("[App] Запуск камеры и логики анализа...")
+        if needs_autotune(self.config.get("inference")):
+            self._autotune()
+        if self.detector_service is not None:
+            self.detector_service.start()
+        # Модель прогревается параллельно с открытием и прогревом камеры
+        threading.Thread(
+            target=self.detector.warmup,
+            kwargs={"runs": self.config.get("inference").get("warmup_runs", 3)},
+            daemon=True,
+            name="detector warmup",
+        ).start()
+        if self.verifier is not None:
+            threading.Thread(
+                target=self.verifier.warmup,
+                kwargs={"runs": self.config.get("inference").get("warmup_runs", 3)},
+                daemon=True,
+                name="verifier warmup",
+            ).start()
         self.camera.start()
 
         if self.camera.is_camera_lost():
@@ -330,32 +451,252 @@ class ApplicationController:
                 lock_enable=self.config.get("lock_events")["camera_lost"],
             )
 
+        self.pipeline.start()
         self._loop_thread.start()
 
     def stop(self) -> None:
         logger.debug("[App] Остановка приложения...")
         self._stop_event.set()
         self.camera.stop()
+        self.pipeline.stop()
+        if self.detector_service is not None:
+            self.detector_service.stop()
         
+    def _autotune(self) -> None:
+        """
+        Автоподбор настроек ONNX Runtime для этого хоста. Выполняется один раз
+        на хосте до прогрева и запуска конвейера: замеры не делят процессор с
+        живым инференсом, а cv2.setNumThreads меняет глобальную настройку
+        процесса, пока её никто не использует. Настройки сохраняются в конфиг
+        и применяются со следующего запуска.
+        """
+        logger.debug("Автоподбор настроек ONNX Runtime для этого хоста...")
+        inference_config = autotune_session(self.model_path, self.config.get("inference"))
+        if inference_config is None:
+            return
+        config = self.config.config.copy()
+        config["inference"] = inference_config
+        self.config.save_config(config)
+        logger.info("Настройки инференса подобраны и будут применены при следующем запуске")
+
     def sleep_remain(self, step_start) -> None:
         elapsed = time.perf_counter() - step_start
         remaining = self.min_step_time - elapsed
         if remaining > 0:
             time.sleep(remaining)
 
+    def _emit_action(self, captured_at: float, **kwargs) -> None:
+        """Передаёт событие (аргументы prepare_logging) стадии реакции."""
+        self.pipeline.stages[-1].inbox.put({"captured_at": captured_at, "kwargs": kwargs})
+
+    def _detect(self, frame: np.ndarray) -> Detections:
+        """Детекция отслеживаемых классов на кадре камеры; боксы в координатах кадра."""
+        if self.prefilter is not None and not self.prefilter.should_detect(frame):
+            # Предфильтр уверен, что телефона нет, и страховочный прогон ещё не нужен
+            return Detections()
+        if self.roi_inference is not None:
+            detections = self.roi_inference.detect(
+                frame,
+                conf=self.confidence_threshold,
+                swap_rb=True
+            )
+        else:
+            image, transform = self.detector.letterbox(frame)
+            detections = self.detector.detect_phone(
+                image,
+                conf=self.confidence_threshold,
+                swap_rb=True
+            )
+            if detections.found:
+                # Боксы с холста переводим в координаты кадра камеры: журнал и
+                # уведомления получают кадр в исходном разрешении
+                detections = detections.to_source(transform)
+        if self.prefilter is not None:
+            self.prefilter.update(detections.found)
+        return detections
+
+    def _inference_stage(self, item: dict) -> Optional[dict]:
+        """Стадия инференса: детекция отслеживаемых классов и подтверждение треками."""
+        frame = item["frame"]
+        # Зона интереса: затвор движения, предфильтр и детектор видят только её вырезку,
+        # исключённые зоны залиты; кадр журнала остаётся полным
+        image, offset = self.region_mask.apply(frame) if self.region_mask is not None else (frame, (0, 0))
+        if self.motion_gate is not None and not self.motion_gate.should_run(image):
+            # Сцена не изменилась с последнего инференса - берём его результат
+            detections = self.motion_gate.last_result
+        else:
+            try:
+                detections = self._detect(image)
+            except DetectorUnavailable as e:
+                # Кадр не проверен: пустой результат состарил бы треки, как будто телефона нет
+                logger.warning(f"[App] Кадр не проверен: {e}")
+                return self._detector_failed(item["captured_at"], frame, str(e))
+            self._detector_available()
+            if offset != (0, 0):
+                detections = detections.translate(*offset)
+            if self.motion_gate is not None:
+                self.motion_gate.update(detections)
+        # Подтверждение треками своего класса (phone_limit попаданий из последних кадров);
+        # трекер класса без объектов в кадре получает пустой кадр, и его треки стареют
+        boxes, confs, class_ids = detections.boxes, detections.array["confidence"], detections.array["class_id"]
+        confirmed = []
+        for track_class, track_manager in self.track_managers.items():
+            mask = class_ids == track_class
+            confirmed.extend((track, track_class) for track in track_manager.step(boxes[mask], confs[mask]))
+        if not confirmed:
+            return None
+        # Событие - по самому уверенному подтверждённому треку; блокировка, журнал и
+        # оповещение - если они включены хотя бы для одного из подтверждённых классов
+        track, class_id = max(confirmed, key=lambda item: item[0].score)
+        rules = self.detection_classes[class_id]
+        events = {self.detection_classes[track_class]["event"] for _, track_class in confirmed}
+        notification_data = {"Трек": track.track_id, "Объектов в кадре": detections.count}
+        if self.verifier is not None:
+            bbox = tuple(int(v) for v in track.box)
+            if not self._verify_track(frame, bbox, track.track_id, class_id):
+                return None
+            notification_data["Проверка"] = f"{self._verified_tracks[track.track_id]:.2f}"
+        logger.debug(f"[App] {rules['title']}: {detections}, трек {track.track_id} (hits={track.hits}, age={track.age})")
+        return {
+            "captured_at": item["captured_at"],
+            "kwargs": dict(
+                event=rules["title"],
+                frame=frame,
+                notification_status="CRITICAL",
+                notifications_enabled=any(self.config.get("notifications").get(event, False) for event in events),
+                log_enable=any(self.config.get("log_events").get(event, False) for event in events),
+                lock_enable=any(self.config.get("lock_events").get(event, False) for event in events),
+                detections=detections,
+                notification_data=notification_data,
+                track_id=track.track_id,
+            ),
+        }
+
+    def _detector_failed(self, captured_at: float, frame: np.ndarray, reason: str) -> Optional[dict]:
+        """
+        Отмечает кадр, не проверенный детектором. Если перебой длится дольше
+        unavailable_seconds, один раз за перебой возвращает событие для стадии реакции.
+        """
+        now = time.monotonic()
+        if self._detector_down_since is None:
+            self._detector_down_since = now
+        if self._detector_down_reported or now - self._detector_down_since < self.detector_unavailable_seconds:
+            return None
+        return self._detector_unavailable_action(captured_at, frame, reason)
+
+    def _detector_unavailable_action(self, captured_at: float, frame: Optional[np.ndarray], reason: str) -> dict:
+        """
+        Событие "Детектор недоступен": без детектора кадры не проверяются,
+        и приложение не должно молча пропускать телефон.
+        """
+        self._detector_down_reported = True
+        logger.critical(f"[App] Детектор недоступен: {reason}")
+        return {
+            "captured_at": captured_at,
+            "kwargs": dict(
+                event="Детектор недоступен",
+                frame=frame,
+                notification_status="CRITICAL",
+                notifications_enabled=self.config.get("notifications")["detector_unavailable"],
+                log_enable=self.config.get("log_events")["detector_unavailable"],
+                lock_enable=self.config.get("lock_events")["detector_unavailable"],
+                notification_data={"Причина": reason},
+            ),
+        }
+
+    def _detector_available(self) -> None:
+        """Детектор ответил: перебой, если он был, закончился."""
+        if self._detector_down_since is not None:
+            logger.info(f"[App] Детектор снова отвечает после {time.monotonic() - self._detector_down_since:.1f} с")
+            self._detector_down_since = None
+            self._detector_down_reported = False
+
+    def _wait_detector(self) -> None:
+        """
+        Ждёт прогрева детектора шагами по секунде, перезапуская упавший процесс
+        детектора. Если детектор не готов за startup_timeout, срабатывает событие
+        "Детектор недоступен", а ожидание продолжается.
+        """
+        self._detector_down_since = time.monotonic()
+        deadline = self._detector_down_since + self.detector_startup_timeout
+        while not self._stop_event.is_set():
+            if self.detector_service is not None:
+                ready = self.detector_service.wait_ready(timeout=1.0)
+            else:
+                ready = self.detector.wait_warm(1.0)
+            if ready:
+                if self._detector_down_reported:
+                    self._detector_available()
+                self._detector_down_since = None
+                return
+            if time.monotonic() >= deadline and not self._detector_down_reported:
+                action = self._detector_unavailable_action(
+                    time.monotonic(), None, f"детектор не прогрелся за {self.detector_startup_timeout} с"
+                )
+                self._emit_action(action["captured_at"], **action["kwargs"])
+
+    def _verify_track(self, frame: np.ndarray, bbox, track_id: int, class_id: int) -> bool:
+        """
+        Второе мнение модели проверки по вырезке кадра в исходном разрешении.
+        Подтверждённый трек больше не проверяется; отклонённый проверяется снова
+        не раньше чем через retry_seconds, а до того считается отклонённым:
+        иначе тяжёлая модель запускалась бы на каждом кадре его жизни.
+        """
+        alive = {track.track_id for manager in self.track_managers.values() for track in manager.tracks}
+        self._verified_tracks = {tid: c for tid, c in self._verified_tracks.items() if tid in alive}
+        self._rejected_tracks = {tid: t for tid, t in self._rejected_tracks.items() if tid in alive}
+        if track_id in self._verified_tracks:
+            return True
+        rejected_at = self._rejected_tracks.get(track_id)
+        if rejected_at is not None and time.monotonic() - rejected_at < self.verifier_retry_seconds:
+            return False
+        verified, verifier_conf, latency_ms = self.verifier.verify(frame, bbox, class_id=class_id, swap_rb=True)
+        logger.info(
+            f"[App] Проверка трека {track_id}: {'подтверждён' if verified else 'отклонён'} "
+            f"(conf {verifier_conf:.2f}) за {latency_ms:.1f} мс; согласие с быстрой моделью "
+            f"{self.verifier.agreement_rate:.0%} из {self.verifier.runs}"
+        )
+        if verified:
+            self._verified_tracks[track_id] = verifier_conf
+            self._rejected_tracks.pop(track_id, None)
+        else:
+            self._rejected_tracks[track_id] = time.monotonic()
+        return verified
+
+    def _action_stage(self, item: dict) -> None:
+        """Стадия реакции: журнал, блокировка и уведомления по событию."""
+        if item["captured_at"] < self._last_lock_done:
+            # Кадр снят до окончания предыдущей блокировки - в последовательном цикле
+            # он бы не обрабатывался
+            logger.debug(f"[App] Пропущено устаревшее событие: {item['kwargs']['event']}")
+            return None
+        self.prepare_logging(**item["kwargs"])
+        if item["kwargs"]["lock_enable"]:
+            self._last_lock_done = time.monotonic()
+        return None
+
     def _main_loop(self) -> None:
-        """Главный цикл: обработка кадров и реакция на блокировку экрана"""
+        """Главный цикл: захват кадров, проверки камеры и реакция на блокировку экрана"""
         status_continued = {
             "uniform_image": False,
             "static_img": False,
             "camera_lost": False,
         }
-        phone_count: int = 0  # считаем число подряд идущих кадров телефонов, чтобы вызвать события на это
-        # phone_limit: int = 2  # порог по которому вызываем события
+        frame = None
         last_frame = None
         last_unique_frame_time = time.time()
+        last_stats_time = time.monotonic()
+        # Первый кадр не должен попасть на холодную сессию
+        self._wait_detector()
+        if self.detector.cold_latency_ms is not None:
+            logger.info(
+                f"[App] Детектор прогрет: первый прогон {self.detector.cold_latency_ms:.1f} мс, "
+                f"после прогрева {self.detector.warm_latency_ms:.1f} мс"
+            )
         while not self._stop_event.is_set():
             step_start = time.perf_counter()
+            if self.detector_service is not None:
+                self.detector_service.ensure_alive()
             if is_screen_locked():
                 logger.debug("is_screen_locked", is_screen_locked())
                 logger.debug("[App] Обнаружена блокировка экрана. Ставим на паузу.")
@@ -378,15 +719,17 @@ class ApplicationController:
                 #     self.camera.resume()
             
             if self.camera.is_camera_lost():
+                captured_at = time.monotonic()
                 if not status_continued["camera_lost"]:
                     logger.warning("Camera connection lost")
-                    self.prepare_logging(
-                        "Потеря связи с камерой",
-                        frame,
-                        "CRITICAL",
-                        self.config.get("notifications")["camera_lost"],
-                        self.config.get("log_events")["camera_lost"],
-                        self.config.get("lock_events")["camera_lost"],
+                    self._emit_action(
+                        captured_at,
+                        event="Потеря связи с камерой",
+                        frame=frame,
+                        notification_status="CRITICAL",
+                        notifications_enabled=self.config.get("notifications")["camera_lost"],
+                        log_enable=self.config.get("log_events")["camera_lost"],
+                        lock_enable=self.config.get("lock_events")["camera_lost"],
                     )
                     status_continued["camera_lost"] = True
                 self.sleep_remain(step_start)
@@ -414,6 +757,7 @@ class ApplicationController:
             #     continue
 
             frame = self.camera.get_frame(timeout=1.0)
+            captured_at = time.monotonic()
             self.start_time = time.perf_counter()
             if frame is None:
                 self.sleep_remain(step_start)
@@ -422,13 +766,14 @@ class ApplicationController:
             if is_uniform(frame):
                 if not status_continued["uniform_image"]:
                     logger.debug("Uniform image detected")
-                    self.prepare_logging(
-                        "Однотонное изображение",
-                        frame,
-                        "CRITICAL",
-                        self.config.get("notifications")["uniform_image"],
-                        self.config.get("log_events")["uniform_image"],
-                        self.config.get("lock_events")["uniform_image"],
+                    self._emit_action(
+                        captured_at,
+                        event="Однотонное изображение",
+                        frame=frame,
+                        notification_status="CRITICAL",
+                        notifications_enabled=self.config.get("notifications")["uniform_image"],
+                        log_enable=self.config.get("log_events")["uniform_image"],
+                        lock_enable=self.config.get("lock_events")["uniform_image"],
                     )
                     status_continued["uniform_image"] = True
                     self.sleep_remain(step_start)
@@ -436,72 +781,75 @@ class ApplicationController:
             elif status_continued["uniform_image"]:
                 if status_continued["uniform_image"]:
                     logger.debug("Uniform image detected - cancel.")
-                    self.prepare_logging(
-                        "После однотонного изображения",
-                        frame,
-                        "RECOVERY",
-                        self.config.get("notifications")["uniform_image"],
-                        self.config.get("log_events")["uniform_image"],
-                        False,
+                    self._emit_action(
+                        captured_at,
+                        event="После однотонного изображения",
+                        frame=frame,
+                        notification_status="RECOVERY",
+                        notifications_enabled=self.config.get("notifications")["uniform_image"],
+                        log_enable=self.config.get("log_events")["uniform_image"],
+                        lock_enable=False,
                     )
                     status_continued["uniform_image"] = False
             
-            frame = self.detector.prepreprocess(frame=frame)
+            image, transform = self.similarity_preprocessor.letterbox(frame)
+            # Кадры сравниваются по уменьшенной области холста без серых полей
+            content = image[transform.content]
             now = time.time()
-            if last_frame is not None and is_similar_frame(frame, last_frame):
+            if last_frame is not None and is_similar_frame(content, last_frame):
                 if not status_continued["static_img"]:
                     if now - last_unique_frame_time > 30:
                         logger.debug("Frame frozen for >30s, triggering lock")
-                        self.prepare_logging(
-                            "Зависшее изображение",
-                            frame,
-                            "CRITICAL",
-                            self.config.get("notifications")["static_img"],
-                            self.config.get("log_events")["static_img"],
-                            self.config.get("lock_events")["static_img"],
+                        self._emit_action(
+                            captured_at,
+                            event="Зависшее изображение",
+                            frame=frame,
+                            notification_status="CRITICAL",
+                            notifications_enabled=self.config.get("notifications")["static_img"],
+                            log_enable=self.config.get("log_events")["static_img"],
+                            lock_enable=self.config.get("lock_events")["static_img"],
                         )
                         status_continued["static_img"] = True
                         self.sleep_remain(step_start)
                         continue
             else:
                 last_unique_frame_time = now
-                last_frame = frame.copy()
+                last_frame = content.copy()
                 if status_continued["static_img"]:
                     logger.debug("Frame frozen for >30s, triggering lock - cancel.")
-                    self.prepare_logging(
-                        "После однотонного изображения",
-                        frame,
-                        "RECOVERY",
-                        self.config.get("notifications")["static_img"],
-                        self.config.get("log_events")["static_img"],
-                        False,
+                    self._emit_action(
+                        captured_at,
+                        event="После однотонного изображения",
+                        frame=frame,
+                        notification_status="RECOVERY",
+                        notifications_enabled=self.config.get("notifications")["static_img"],
+                        log_enable=self.config.get("log_events")["static_img"],
+                        lock_enable=False,
                     )
                     status_continued["static_img"] = False
 
-            # Обработка YOLO
-            found, bbox, confs = self.detector.detect_phone(
-                cv2.cvtColor(frame, cv2.COLOR_RGB2BGR),
-                conf=self.confidence_threshold
-            )
-            if found:
-                phone_count += 1
-                if phone_count >= self.phone_limit:
-                    logger.debug(f"[App] Телефон обнаружен: {bbox}, conf: {confs[0]:.2f}")
-                    self.prepare_logging(
-                        "Обнаружен мобильный телефон",
-                        frame,
-                        "CRITICAL",
-                        self.config.get("notifications")["phone_detected"],
-                        self.config.get("log_events")["phone_detected"],
-                        self.config.get("lock_events")["phone_detected"],
-                        bbox,
-                        confs,
+            # Детекция идёт в стадии инференса, пока здесь захватывается следующий кадр
+            self.pipeline.submit({"frame": frame, "captured_at": captured_at})
+            self.pipeline.source_stats.record(time.perf_counter() - step_start)
+            if self.stats_interval and time.monotonic() - last_stats_time > self.stats_interval:
+                logger.info(f"[App] Конвейер: {self.pipeline.format_stats()}")
+                if self.motion_gate is not None:
+                    logger.info(
+                        f"[App] Затвор движения: инференс {self.motion_gate.executed}, "
+                        f"пропущено {self.motion_gate.skipped} ({self.motion_gate.skip_ratio:.0%})"
                     )
-                    self.sleep_remain(step_start)
-                    continue
-            else:
-                phone_count = 0
-                
+                if self.verifier is not None and self.verifier.runs:
+                    logger.info(
+                        f"[App] Проверка: {self.verifier.runs} кандидатов, согласие {self.verifier.agreement_rate:.0%}, "
+                        f"средняя задержка {self.verifier.mean_latency_ms:.1f} мс"
+                    )
+                if self.prefilter is not None:
+                    logger.info(
+                        f"[App] Предфильтр: детектор {self.prefilter.executed} "
+                        f"(срабатываний {self.prefilter.fired}, страховочных {self.prefilter.safety_scans}), "
+                        f"отсеяно {self.prefilter.rejected} ({self.prefilter.reject_ratio:.0%})"
+                    )
+                last_stats_time = time.monotonic()
             self.sleep_remain(step_start)
 
 
@@ -0,0 +1,55 @@
+"""
+Адаптивный выбор размера входа: выбор после прогрева и пошаговая перепроверка.
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import onnx
+
+from benchmarks.common import synthetic_yolo_output
+from src.core.adaptive_detector import AdaptiveDetector
+from tests.test_postprocess import constant_output_model
+
+FRAME = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+class AdaptiveDetectorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.model_path = os.path.join(self.tmp.name, "model.onnx")
+        for size, path in ((640, self.model_path), (320, os.path.join(self.tmp.name, "model_320.onnx"))):
+            outputs = synthetic_yolo_output(num_boxes=100, num_objects=1, seed=7)
+            onnx.save(constant_output_model(outputs, size=size), path)
+
+    def make(self, budget_ms: float, **kwargs) -> AdaptiveDetector:
+        return AdaptiveDetector(self.model_path, {"model_cache": False}, latency_budget_ms=budget_ms, sizes=[320], **kwargs)
+
+    def test_selects_after_warmup(self):
+        detector = self.make(budget_ms=0.0)
+        self.assertFalse(detector.is_warm())
+        self.assertEqual(detector.input_size, 640)
+        detector.warmup(runs=1)
+        self.assertTrue(detector.wait_warm(0))
+        self.assertEqual(detector.input_size, 320)
+        self.assertIsNotNone(detector.cold_latency_ms)
+
+    def test_recheck_one_run_per_frame(self):
+        detector = self.make(budget_ms=1e6, recheck_seconds=0.0, probe_runs=3)
+        detector.warmup(runs=1)
+        detector._activate(320)
+        for _ in range(4):
+            detector.letterbox(FRAME)
+            self.assertEqual(detector.input_size, 320)
+        self.assertEqual(len(detector._probe_timings), 3)
+        detector.letterbox(FRAME)
+        self.assertEqual(detector.input_size, 640)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Затвор движения: пропуск инференса на неизменной сцене.
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+
+from src.core.motion import MotionGate
+
+
+def scene(brightness: int) -> np.ndarray:
+    return np.full((720, 1280, 3), brightness, dtype=np.uint8)
+
+
+class MotionGateTest(unittest.TestCase):
+    def test_skips_unchanged_scene(self):
+        gate = MotionGate(max_skip_seconds=5.0)
+        self.assertTrue(gate.should_run(scene(50), now=0.0))
+        gate.update("A")
+        self.assertFalse(gate.should_run(scene(50), now=1.0))
+        self.assertEqual(gate.last_result, "A")
+        self.assertTrue(gate.should_run(scene(50), now=5.0))
+        gate.update("A")
+        self.assertEqual((gate.executed, gate.skipped), (2, 1))
+
+    def test_changed_scene_runs(self):
+        gate = MotionGate()
+        gate.should_run(scene(50), now=0.0)
+        gate.update("A")
+        self.assertTrue(gate.should_run(scene(200), now=0.1))
+
+    def test_detector_outage(self):
+        # Детектор упал на изменившейся сцене: update() не вызван, и после
+        # восстановления результат пустой сцены не должен подставляться
+        gate = MotionGate(max_skip_seconds=60.0)
+        gate.should_run(scene(50), now=0.0)
+        gate.update("пустая сцена")
+        self.assertTrue(gate.should_run(scene(200), now=1.0))
+        self.assertTrue(gate.should_run(scene(200), now=2.0))
+        gate.update("телефон")
+        self.assertFalse(gate.should_run(scene(200), now=3.0))
+        self.assertEqual(gate.last_result, "телефон")
+        self.assertEqual(gate.executed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
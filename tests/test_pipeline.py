@@ -0,0 +1,78 @@
+"""
+Очереди конвейера: LatestQueue вытесняет старые кадры, BlockingQueue ничего не теряет.
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import queue
+import threading
+import time
+import unittest
+
+from src.core.pipeline import BlockingQueue, LatestQueue, Pipeline
+
+
+class LatestQueueTest(unittest.TestCase):
+    def test_evicts_oldest(self):
+        q = LatestQueue(2)
+        self.assertTrue(q.put(1))
+        self.assertTrue(q.put(2))
+        self.assertFalse(q.put(3))
+        self.assertEqual(q.dropped, 1)
+        self.assertEqual([q.get(), q.get()], [2, 3])
+
+    def test_get_timeout(self):
+        with self.assertRaises(queue.Empty):
+            LatestQueue(1).get(timeout=0.01)
+
+    def test_get_wakes_on_put(self):
+        q = LatestQueue(1)
+        threading.Timer(0.05, q.put, args=("frame",)).start()
+        self.assertEqual(q.get(timeout=1.0), "frame")
+
+
+class BlockingQueueTest(unittest.TestCase):
+    def test_put_waits_instead_of_evicting(self):
+        q = BlockingQueue(1)
+        q.put("lock")
+        with self.assertRaises(queue.Full):
+            q.put("log", timeout=0.01)
+        self.assertEqual((len(q), q.dropped), (1, 0))
+        self.assertEqual(q.get(timeout=0.1), "lock")
+
+
+class PipelineTest(unittest.TestCase):
+    def test_events_are_not_dropped(self):
+        handled = []
+        pipeline = Pipeline()
+        pipeline.add_stage("inference", lambda item: item, queue_size=1)
+        actions = pipeline.add_stage("actions", lambda item: handled.append(item) or time.sleep(0.001), queue_size=2, evict=False)
+        pipeline.start()
+        try:
+            for i in range(30):
+                actions.inbox.put(i)
+            deadline = time.monotonic() + 5
+            while len(handled) < 30 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            pipeline.stop()
+        self.assertEqual(handled, list(range(30)))
+        self.assertEqual(pipeline.stats()[-1]["dropped"], 0)
+
+    def test_stale_frames_are_dropped(self):
+        release = threading.Event()
+        pipeline = Pipeline()
+        pipeline.add_stage("inference", lambda item: release.wait(1.0) and None, queue_size=1)
+        pipeline.start()
+        try:
+            pipeline.submit(0)
+            time.sleep(0.05)  # стадия занята первым кадром
+            results = [pipeline.submit(i) for i in range(1, 4)]
+        finally:
+            release.set()
+            pipeline.stop()
+        self.assertEqual(results, [True, False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Постобработка YOLO: nms_boxes, postprocess_output и NMS, встроенный в граф.
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+from benchmarks.common import synthetic_yolo_output
+from src.core.detector import Detector, nms_boxes
+from src.tools.embed_nms import embed_nms
+
+
+def reference_postprocess(outputs: np.ndarray, conf_thres: float, iou_thres: float = 0.45):
+    """Построчная постобработка: argmax класса, порог и cv2.dnn.NMSBoxes по каждому классу."""
+    preds = outputs[0]
+    detections = []
+    for class_id in range(preds.shape[0] - 4):
+        boxes, scores = [], []
+        for i in range(preds.shape[1]):
+            column = preds[4:, i]
+            if column.argmax() != class_id or column[class_id] < conf_thres:
+                continue
+            x, y, w, h = preds[:4, i]
+            boxes.append([x - w / 2, y - h / 2, w, h])
+            scores.append(float(column[class_id]))
+        if not boxes:
+            continue
+        for i in np.asarray(cv2.dnn.NMSBoxes(boxes, scores, conf_thres, iou_thres)).flatten():
+            x1, y1, w, h = boxes[i]
+            detections.append((x1, y1, x1 + w, y1 + h, scores[i], class_id))
+    return sorted(detections, key=lambda d: d[4], reverse=True)
+
+
+def constant_output_model(outputs: np.ndarray, size: int = 640) -> onnx.ModelProto:
+    """Модель, которая на любой вход [1, 3, size, size] возвращает заданный выход YOLO."""
+    nodes = [
+        helper.make_node("ReduceMean", ["images"], ["mean"], keepdims=0),
+        helper.make_node("Mul", ["mean", "zero"], ["zero_scalar"]),
+        helper.make_node("Add", ["raw", "zero_scalar"], ["output0"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "constant_yolo",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, size, size])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, list(outputs.shape))],
+        [numpy_helper.from_array(outputs, "raw"), numpy_helper.from_array(np.array(0.0, dtype=np.float32), "zero")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    return model
+
+
+class NmsBoxesTest(unittest.TestCase):
+    def test_matches_opencv(self):
+        outputs = synthetic_yolo_output(num_boxes=2000, num_objects=5, seed=1)
+        preds = outputs[0]
+        mask = preds[4] >= 0.5
+        x, y, w, h = preds[:4, mask]
+        scores = preds[4, mask]
+        boxes = np.stack((x - w / 2, y - h / 2, x + w / 2, y + h / 2), axis=1)
+        keep = nms_boxes(boxes, scores, 0.45)
+        expected = cv2.dnn.NMSBoxes(np.stack((x - w / 2, y - h / 2, w, h), axis=1).tolist(), scores.tolist(), 0.5, 0.45)
+        self.assertEqual(sorted(keep.tolist()), sorted(np.asarray(expected).flatten().tolist()))
+        self.assertTrue(np.all(np.diff(scores[keep]) <= 0))
+
+    def test_max_det(self):
+        boxes = np.array([[0, 0, 10, 10], [20, 20, 30, 30], [40, 40, 50, 50]], dtype=np.float32)
+        scores = np.array([0.5, 0.9, 0.7], dtype=np.float32)
+        self.assertEqual(nms_boxes(boxes, scores, 0.45, max_det=2).tolist(), [1, 2])
+
+
+class PostprocessOutputTest(unittest.TestCase):
+    def assert_same(self, detections, expected):
+        self.assertEqual(len(detections), len(expected))
+        for row, reference in zip(detections.tolist(), expected):
+            np.testing.assert_allclose(row[:5], reference[:5], atol=1e-3)
+            self.assertEqual(row[5], reference[5])
+
+    def test_single_class(self):
+        outputs = synthetic_yolo_output(num_boxes=1000, num_objects=4, seed=2)
+        self.assert_same(Detector.postprocess_output(outputs, 0.5), reference_postprocess(outputs, 0.5))
+
+    def test_multi_class(self):
+        outputs = synthetic_yolo_output(num_boxes=1000, num_classes=3, num_objects=6, seed=3)
+        self.assert_same(Detector.postprocess_output(outputs, 0.5), reference_postprocess(outputs, 0.5))
+
+    def test_classes_do_not_suppress_each_other(self):
+        outputs = np.zeros((1, 6, 2), dtype=np.float32)
+        outputs[0, :4, :] = [[100, 102], [100, 100], [50, 50], [50, 50]]
+        outputs[0, 4, 0] = 0.9  # телефон
+        outputs[0, 5, 1] = 0.8  # планшет почти в том же месте
+        detections = Detector.postprocess_output(outputs, 0.5)
+        self.assertEqual(detections["class_id"].tolist(), [0, 1])
+
+    def test_nothing_above_threshold(self):
+        outputs = synthetic_yolo_output(num_boxes=100, num_objects=0, seed=4)
+        self.assertEqual(len(Detector.postprocess_output(outputs, 0.5)), 0)
+
+
+class EmbeddedNmsTest(unittest.TestCase):
+    """Модель со встроенным NMS (src.tools.embed_nms) даёт те же детекции, что NumPy-постобработка."""
+
+    def check(self, outputs: np.ndarray, conf: float = 0.5):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_path = os.path.join(tmp, "model.onnx")
+            nms_path = os.path.join(tmp, "model_nms.onnx")
+            onnx.save(constant_output_model(outputs), raw_path)
+            onnx.save(embed_nms(onnx.load(raw_path)), nms_path)
+            config = {"model_cache": False}
+            source, embedded = Detector(raw_path, config), Detector(nms_path, config)
+            self.assertTrue(embedded.embedded_nms)
+            image = np.zeros((640, 640, 3), dtype=np.uint8)
+            expected = source.postprocess(source._run(source.make_input(image), conf), conf)
+            actual = embedded.postprocess(embedded._run(embedded.make_input(image), conf), conf)
+        self.assertEqual(len(actual), len(expected))
+        for field in ("x1", "y1", "x2", "y2", "confidence"):
+            np.testing.assert_allclose(actual[field], expected[field], atol=1e-3)
+        self.assertEqual(actual["class_id"].tolist(), expected["class_id"].tolist())
+
+    def test_single_class(self):
+        self.check(synthetic_yolo_output(num_boxes=500, num_objects=3, seed=5))
+
+    def test_multi_class(self):
+        # Оценки всех классов выше порога: NMS по классам дал бы по строке на класс
+        outputs = synthetic_yolo_output(num_boxes=500, num_classes=3, num_objects=4, seed=6)
+        outputs[0, 4:] = np.maximum(outputs[0, 4:], 0.55 * (outputs[0, 4:].max(axis=0) > 0.6))
+        self.check(outputs)
+
+
+
+class ClassThresholdsTest(unittest.TestCase):
+    """Собственный порог класса ниже порога вызова не отсекается до _select_phone."""
+
+    def detect(self, classes: dict, conf: float):
+        outputs = np.zeros((1, 6, 2), dtype=np.float32)
+        outputs[0, :4, :] = [[100, 400], [100, 400], [50, 50], [50, 50]]
+        outputs[0, 4, 0] = 0.9  # телефон
+        outputs[0, 5, 1] = 0.4  # планшет в другом месте
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.onnx")
+            onnx.save(constant_output_model(outputs), path)
+            detector = Detector(path, {"model_cache": False, "classes": classes})
+            return detector.detect_phone(np.zeros((640, 640, 3), dtype=np.uint8), conf)
+
+    def test_class_threshold_below_conf(self):
+        detections = self.detect({0: None, 1: 0.3}, conf=0.8)
+        self.assertEqual(detections.array["class_id"].tolist(), [0, 1])
+
+    def test_untracked_class_dropped(self):
+        self.assertEqual(self.detect({0: None}, conf=0.3).count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
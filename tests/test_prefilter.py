@@ -0,0 +1,63 @@
+"""
+Каскад предфильтра: когда запускать полный детектор.
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+
+from src.core.prefilter import PrefilterCascade
+
+
+class ConstantClassifier:
+    """Классификатор с заданной оценкой, чтобы не обучать модель предфильтра."""
+
+    threshold = 0.5
+
+    def __init__(self, score: float = 0.0) -> None:
+        self.value = score
+
+    def score(self, frame: np.ndarray) -> float:
+        return self.value
+
+
+FRAME = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+class PrefilterCascadeTest(unittest.TestCase):
+    def test_safety_interval(self):
+        cascade = PrefilterCascade(ConstantClassifier(), safety_interval=2.0)
+        self.assertTrue(cascade.should_detect(FRAME, now=0.0))
+        cascade.update(False)
+        self.assertFalse(cascade.should_detect(FRAME, now=1.0))
+        self.assertTrue(cascade.should_detect(FRAME, now=2.0))
+        cascade.update(False)
+        self.assertEqual((cascade.executed, cascade.safety_scans, cascade.rejected), (2, 2, 1))
+
+    def test_classifier_fires_and_found_keeps_running(self):
+        classifier = ConstantClassifier(0.9)
+        cascade = PrefilterCascade(classifier, safety_interval=60.0)
+        cascade.should_detect(FRAME, now=0.0)
+        cascade.update(False)
+        self.assertTrue(cascade.should_detect(FRAME, now=0.1))
+        cascade.update(True)
+        classifier.value = 0.0
+        self.assertTrue(cascade.should_detect(FRAME, now=0.2))
+
+    def test_detector_outage(self):
+        # Детектор упал на страховочном прогоне: update() не вызван, и
+        # следующий кадр снова требует прогона, а не ждёт safety_interval
+        cascade = PrefilterCascade(ConstantClassifier(), safety_interval=2.0)
+        cascade.should_detect(FRAME, now=0.0)
+        cascade.update(False)
+        self.assertTrue(cascade.should_detect(FRAME, now=2.0))
+        self.assertTrue(cascade.should_detect(FRAME, now=2.1))
+        cascade.update(False)
+        self.assertFalse(cascade.should_detect(FRAME, now=2.2))
+        self.assertEqual(cascade.executed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Letterbox: геометрия холста и перевод боксов холст <-> кадр.
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+
+from src.core.detector import BOX_FIELDS, DETECTION_DTYPE, Detections, Detector
+from src.core.preprocessing import LetterboxPreprocessor
+
+FRAME_SHAPES = [(720, 1280, 3), (1080, 1920, 3), (480, 640, 3), (1280, 720, 3), (640, 640, 3)]
+
+
+class LetterboxTest(unittest.TestCase):
+    def test_geometry_1280x720(self):
+        canvas, transform = LetterboxPreprocessor(640).letterbox(np.zeros((720, 1280, 3), dtype=np.uint8))
+        self.assertEqual(canvas.shape, (640, 640, 3))
+        self.assertEqual(transform.scale, 0.5)
+        self.assertEqual(transform.offset, (0, 140))
+        self.assertEqual(transform.content_size, (640, 360))
+
+    def test_rect_canvas(self):
+        canvas, transform = LetterboxPreprocessor(640, stride=32).letterbox(np.zeros((720, 1280, 3), dtype=np.uint8))
+        self.assertEqual(canvas.shape, (384, 640, 3))
+        self.assertEqual(transform.offset, (0, 12))
+
+    def assert_round_trip(self, preprocessor):
+        rng = np.random.default_rng(0)
+        for shape in FRAME_SHAPES:
+            _, transform = preprocessor.letterbox(np.zeros(shape, dtype=np.uint8))
+            h, w = shape[:2]
+            for _ in range(20):
+                x1, x2 = sorted(rng.uniform(0, w, 2))
+                y1, y2 = sorted(rng.uniform(0, h, 2))
+                box = (x1, y1, x2, y2)
+                np.testing.assert_allclose(transform.to_source(transform.to_canvas(box)), box, atol=1e-6)
+                canvas_box = transform.to_canvas(box)
+                np.testing.assert_allclose(transform.to_canvas(transform.to_source(canvas_box)), canvas_box, atol=1e-6)
+
+    def test_round_trip(self):
+        self.assert_round_trip(LetterboxPreprocessor(640))
+
+    def test_round_trip_rect_canvas(self):
+        self.assert_round_trip(LetterboxPreprocessor(640, stride=32))
+
+    def test_content_matches_frame(self):
+        # Кадр на холсте лежит ровно в transform.content, вокруг - серые поля
+        frame = np.full((720, 1280, 3), 7, dtype=np.uint8)
+        canvas, transform = LetterboxPreprocessor(640).letterbox(frame)
+        self.assertTrue(np.all(canvas[transform.content] == 7))
+        self.assertEqual(int((canvas != 7).all(axis=2).sum()), 640 * 640 - 640 * 360)
+
+    def test_to_source_int_clips(self):
+        _, transform = LetterboxPreprocessor(640).letterbox(np.zeros((720, 1280, 3), dtype=np.uint8))
+        self.assertEqual(transform.to_source_int((-10, 100, 700, 600)), (0, 0, 1280, 720))
+
+    def test_matches_prepreprocess(self):
+        frame = np.random.default_rng(1).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+        canvas, _ = LetterboxPreprocessor(640).letterbox(frame)
+        np.testing.assert_array_equal(canvas, Detector.prepreprocess(frame, size=640))
+
+
+class DetectionsToSourceTest(unittest.TestCase):
+    def test_matches_to_source_int(self):
+        rng = np.random.default_rng(2)
+        _, transform = LetterboxPreprocessor(640).letterbox(np.zeros((720, 1280, 3), dtype=np.uint8))
+        array = np.zeros(50, dtype=DETECTION_DTYPE)
+        corners = np.sort(rng.uniform(-20, 660, (50, 2, 2)), axis=1)
+        array["x1"], array["x2"] = corners[:, :, 0].T
+        array["y1"], array["y2"] = corners[:, :, 1].T
+        detections = Detections(array).to_source(transform)
+        expected = [transform.to_source_int(box) for box in array[BOX_FIELDS].tolist()]
+        self.assertEqual([tuple(box) for box in detections.boxes.tolist()], expected)
+
+    def test_offset_and_translate(self):
+        array = np.array([(10, 20, 30, 40, 0.9, 0)], dtype=DETECTION_DTYPE)
+        _, transform = LetterboxPreprocessor(640).letterbox(np.zeros((640, 640, 3), dtype=np.uint8))
+        shifted = Detections(array).to_source(transform, offset=(100, 200))
+        self.assertEqual(shifted.bbox, (110, 220, 130, 240))
+        self.assertEqual(Detections(array).translate(100, 200).bbox, shifted.bbox)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Разбор трассировки ONNX Runtime в src.tools.profile_model.
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from src.tools.profile_model import parse_trace
+
+
+def run_event(ts, dur):
+    return {"cat": "Session", "name": "model_run", "ts": ts, "dur": dur}
+
+
+def node_event(ts, dur, op, output_size=0):
+    return {
+        "cat": "Node", "name": f"{op}_{ts}_kernel_time", "ts": ts, "dur": dur,
+        "args": {"op_name": op, "output_size": str(output_size), "activation_size": "0"},
+    }
+
+
+class ParseTraceTest(unittest.TestCase):
+    def parse(self, events, skip_runs=0):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(events, f)
+            return parse_trace(path, skip_runs=skip_runs)
+
+    def test_per_run_totals(self):
+        events = [
+            run_event(0, 3000), node_event(10, 2000, "Conv", 2 ** 20), node_event(20, 1000, "Sigmoid"),
+            run_event(5000, 3000), node_event(5010, 2000, "Conv", 2 ** 20), node_event(5020, 1000, "Sigmoid"),
+        ]
+        rows, run_ms = self.parse(events)
+        self.assertEqual(run_ms, 3.0)
+        self.assertEqual([row["op"] for row in rows], ["Conv", "Sigmoid"])
+        conv = rows[0]
+        self.assertEqual((conv["calls"], conv["ms_per_run"], conv["output_mb_per_run"]), (1, 2.0, 1.0))
+        self.assertAlmostEqual(conv["share"], 2 / 3)
+
+    def test_skip_warmup_runs(self):
+        events = [
+            run_event(0, 9000), node_event(10, 9000, "Conv"),
+            run_event(10000, 1000), node_event(10010, 1000, "Conv"),
+        ]
+        rows, run_ms = self.parse(events, skip_runs=1)
+        self.assertEqual(run_ms, 1.0)
+        self.assertEqual(rows[0]["ms_per_run"], 1.0)
+
+    def test_no_runs(self):
+        self.assertEqual(self.parse([run_event(0, 1000)], skip_runs=1), ([], 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+iou_matrix и подтверждение треков k-of-n (TrackManager).
+
+Запуск из корня проекта:
+    python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+
+from src.core.tracking import TrackManager, iou_matrix
+
+BOX = np.array([[100, 100, 200, 200]], dtype=np.float32)
+SCORE = np.array([0.9], dtype=np.float32)
+EMPTY_BOXES = np.empty((0, 4), dtype=np.float32)
+EMPTY_SCORES = np.empty(0, dtype=np.float32)
+
+
+class IouMatrixTest(unittest.TestCase):
+    def test_values(self):
+        a = np.array([[0, 0, 10, 10], [0, 0, 10, 10]])
+        b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+        expected = [[1.0, 50 / 150, 0.0], [1.0, 50 / 150, 0.0]]
+        np.testing.assert_allclose(iou_matrix(a, b), expected, atol=1e-5)
+
+    def test_empty(self):
+        self.assertEqual(iou_matrix(np.empty((0, 4)), BOX).shape, (0, 1))
+
+
+class TrackManagerTest(unittest.TestCase):
+    def run_frames(self, manager, hits, step=1.0):
+        """Прогоняет кадры (True - объект в кадре); возвращает, подтверждён ли трек на каждом."""
+        confirmed = []
+        for i, hit in enumerate(hits):
+            boxes, scores = (BOX, SCORE) if hit else (EMPTY_BOXES, EMPTY_SCORES)
+            confirmed.append(bool(manager.step(boxes, scores, now=i * step)))
+        return confirmed
+
+    def test_single_hit_confirms_with_k1(self):
+        manager = TrackManager(confirm_hits=1, confirm_window=3)
+        self.assertEqual(self.run_frames(manager, [True]), [True])
+
+    def test_two_of_three(self):
+        manager = TrackManager(confirm_hits=2, confirm_window=3)
+        self.assertEqual(self.run_frames(manager, [True, False, True]), [False, False, True])
+
+    def test_old_hits_leave_window(self):
+        # Первое попадание выпало из трёх последних кадров
+        manager = TrackManager(confirm_hits=2, confirm_window=3)
+        self.assertEqual(self.run_frames(manager, [True, False, False, True]), [False, False, False, False])
+
+    def test_window_seconds(self):
+        manager = TrackManager(confirm_hits=2, confirm_window=3, window_seconds=10)
+        self.assertEqual(self.run_frames(manager, [True, True], step=20.0), [False, False])
+
+    def test_is_confirmed_after_miss(self):
+        manager = TrackManager(confirm_hits=2, confirm_window=3)
+        self.run_frames(manager, [True, True, False])
+        track = manager.tracks[0]
+        # На кадре без объекта step трек не возвращает, но подтверждение не сброшено
+        self.assertTrue(manager.is_confirmed(track, now=2.0))
+
+    def test_track_dropped_after_max_missed(self):
+        manager = TrackManager(confirm_hits=1, confirm_window=3, max_missed=2)
+        self.run_frames(manager, [True, False, False, False])
+        self.assertEqual(manager.tracks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()